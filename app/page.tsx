@@ -7,28 +7,61 @@ import {
   query,
   where,
   orderBy,
+  limit,
+  startAfter,
   getDocs,
+  getCountFromServer,
   deleteDoc,
   doc,
   writeBatch,
   serverTimestamp,
+  QueryConstraint,
+  QueryDocumentSnapshot,
+  DocumentData,
+  Timestamp,
 } from "firebase/firestore";
 import NewsCard from "@/components/NewsCard";
 
 export interface NewsItem {
   id: string;
   category: string;
+  categories?: string[];
   title: string;
   link: string;
   summary: string;
-  pub_date: string;
+  // 移行前の記事は RSS の文字列のまま
+  pub_date: Timestamp | string | null;
   created_at: any;
   status: "unread" | "selected" | "archived";
 }
 
+// 1ページに表示する記事数
+const PAGE_SIZE = 30;
+
+// ステータス・カテゴリで絞り込んだクエリ条件（created_at の新しい順）
+// firestore.indexes.json の複合インデックスを使用
+const buildFilters = (status: string, category: string): QueryConstraint[] => {
+  const filters: QueryConstraint[] = [];
+  if (status !== "all") {
+    filters.push(where("status", "==", status));
+  }
+  if (category !== "すべて") {
+    // 複数カテゴリに掲載された記事はどのカテゴリでも表示
+    filters.push(where("categories", "array-contains", category));
+  }
+  return filters;
+};
+
 export default function HomePage() {
   const [news, setNews] = useState<NewsItem[]>([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [lastDoc, setLastDoc] =
+    useState<QueryDocumentSnapshot<DocumentData> | null>(null);
+  const [hasMore, setHasMore] = useState(false);
+  const [categoryCounts, setCategoryCounts] = useState<Record<string, number>>(
+    {}
+  );
   const [selectedNews, setSelectedNews] = useState<Set<string>>(new Set());
   const [filterCategory, setFilterCategory] = useState<string>("すべて");
   const [filterStatus, setFilterStatus] = useState<string>("unread");
@@ -51,52 +84,109 @@ export default function HomePage() {
     { value: "archived", label: "アーカイブ", color: "bg-gray-500" },
   ];
 
-  // ニュースデータの取得
+  // 1ページ分のニュースを取得（cursor を指定するとその続きから）
+  const fetchPage = async (
+    cursor: QueryDocumentSnapshot<DocumentData> | null
+  ) => {
+    const constraints: QueryConstraint[] = [
+      ...buildFilters(filterStatus, filterCategory),
+      orderBy("created_at", "desc"),
+    ];
+    if (cursor) {
+      constraints.push(startAfter(cursor));
+    }
+    constraints.push(limit(PAGE_SIZE));
+
+    const querySnapshot = await getDocs(
+      query(collection(db, "news"), ...constraints)
+    );
+
+    const newsData: NewsItem[] = querySnapshot.docs.map(
+      (doc) => ({ id: doc.id, ...doc.data() } as NewsItem)
+    );
+    const last = querySnapshot.docs[querySnapshot.docs.length - 1] ?? null;
+
+    return { newsData, last, more: querySnapshot.docs.length === PAGE_SIZE };
+  };
+
+  // Firestore エラーの表示
+  const handleFetchError = (error: unknown) => {
+    console.error("ニュースの取得に失敗しました:", error);
+
+    // Firestore インデックスエラーの場合、リンクを表示
+    if (error instanceof Error && error.message.includes("index")) {
+      console.error(
+        "インデックスが必要です。上記のエラーメッセージ内のリンクをクリックしてインデックスを作成してください。"
+      );
+    }
+
+    // Firebase 設定エラーの詳細を表示
+    if (error instanceof Error) {
+      alert(`Firestore エラー: ${error.message}`);
+    }
+  };
+
+  // カテゴリごとの件数をサーバー側で集計（ドキュメントは読み込まない）
+  const fetchCategoryCounts = async () => {
+    try {
+      const entries = await Promise.all(
+        categories.map(async (cat) => {
+          const snapshot = await getCountFromServer(
+            query(collection(db, "news"), ...buildFilters(filterStatus, cat))
+          );
+          return [cat, snapshot.data().count] as const;
+        })
+      );
+      setCategoryCounts(Object.fromEntries(entries));
+    } catch (error) {
+      console.error("件数の取得に失敗しました:", error);
+    }
+  };
+
+  // ニュースデータの取得（フィルタ変更時は1ページ目から）
   useEffect(() => {
     const fetchNews = async () => {
       setLoading(true);
       try {
-        let q;
-        if (filterStatus === "all") {
-          q = query(collection(db, "news"), orderBy("created_at", "desc"));
-        } else {
-          q = query(
-            collection(db, "news"),
-            where("status", "==", filterStatus),
-            orderBy("created_at", "desc")
-          );
-        }
-        const querySnapshot = await getDocs(q);
-
-        const newsData: NewsItem[] = [];
-        querySnapshot.forEach((doc) => {
-          newsData.push({ id: doc.id, ...doc.data() } as NewsItem);
-        });
-
+        const { newsData, last, more } = await fetchPage(null);
         setNews(newsData);
+        setLastDoc(last);
+        setHasMore(more);
         setSelectedNews(new Set()); // フィルタ変更時は選択をリセット
       } catch (error: unknown) {
-        console.error("ニュースの取得に失敗しました:", error);
-
-        // Firestore インデックスエラーの場合、リンクを表示
-        if (error instanceof Error && error.message.includes("index")) {
-          console.error(
-            "インデックスが必要です。上記のエラーメッセージ内のリンクをクリックしてインデックスを作成してください。"
-          );
-        }
-
-        // Firebase 設定エラーの詳細を表示
-        if (error instanceof Error) {
-          alert(`Firestore エラー: ${error.message}`);
-        }
+        handleFetchError(error);
       } finally {
         setLoading(false);
       }
     };
 
     fetchNews();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [filterStatus, filterCategory]);
+
+  // 件数はステータス変更時のみ再集計
+  useEffect(() => {
+    fetchCategoryCounts();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [filterStatus]);
 
+  // 次のページを読み込む
+  const loadMore = async () => {
+    if (!lastDoc || loadingMore) return;
+
+    setLoadingMore(true);
+    try {
+      const { newsData, last, more } = await fetchPage(lastDoc);
+      setNews([...news, ...newsData]);
+      setLastDoc(last);
+      setHasMore(more);
+    } catch (error: unknown) {
+      handleFetchError(error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // チェックボックスのトグル（制限なし）
   const toggleSelection = (id: string) => {
     const newSelection = new Set(selectedNews);
@@ -135,6 +225,7 @@ export default function HomePage() {
       // ローカル状態を更新
       setNews(news.filter((item) => !selectedNews.has(item.id)));
       setSelectedNews(new Set());
+      fetchCategoryCounts();
       alert("削除が完了しました");
     } catch (error) {
       console.error("削除に失敗しました:", error);
@@ -173,6 +264,7 @@ export default function HomePage() {
         );
       }
       setSelectedNews(new Set());
+      fetchCategoryCounts();
       alert(`${selectedNews.size}件の記事を「選択済」に更新しました`);
     } catch (error) {
       console.error("ステータス更新に失敗しました:", error);
@@ -182,17 +274,11 @@ export default function HomePage() {
     }
   };
 
-  // フィルタリング（カテゴリのみ。ステータスはクエリで）
-  const filteredNews =
-    filterCategory === "すべて"
-      ? news
-      : news.filter((item) => item.category === filterCategory);
+  // ステータス・カテゴリともにクエリで絞り込み済み
+  const filteredNews = news;
 
-  // カテゴリごとの件数を取得
-  const getCategoryCount = (category: string) => {
-    if (category === "すべて") return news.length;
-    return news.filter((item) => item.category === category).length;
-  };
+  // カテゴリごとの件数（集計クエリの結果）
+  const getCategoryCount = (category: string) => categoryCounts[category] ?? "-";
 
   if (loading) {
     return (
@@ -274,7 +360,10 @@ export default function HomePage() {
                   {selectedNews.size}件選択中
                 </span>
               ) : (
-                <span>{filteredNews.length}件の記事</span>
+                <span>
+                  {filteredNews.length}件表示中（全
+                  {getCategoryCount(filterCategory)}件）
+                </span>
               )}
             </div>
 
@@ -347,6 +436,23 @@ export default function HomePage() {
           ))}
         </div>
 
+        {/* 続きを読み込む */}
+        {hasMore && (
+          <div className="mt-6 text-center">
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className={`px-6 py-2 rounded-lg font-medium transition-all ${
+                !loadingMore
+                  ? "bg-indigo-600 text-white hover:bg-indigo-700"
+                  : "bg-gray-300 text-gray-500 cursor-not-allowed"
+              }`}
+            >
+              {loadingMore ? "読み込み中..." : "さらに読み込む"}
+            </button>
+          </div>
+        )}
+
         {filteredNews.length === 0 && (
           <div className="text-center text-gray-500 dark:text-gray-400 py-12">
             <div className="text-4xl mb-4">📭</div>
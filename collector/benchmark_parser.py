@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+RSS パーサーのベンチマーク
+保存した RSS のサンプルで、高速パーサー（parse_fast）と feedparser の
+パース時間・ピークメモリを比較し、結果が一致するかも確認します。
+
+使用方法:
+    python benchmark_parser.py --capture            # 現在の RSS を samples/ に保存
+    python benchmark_parser.py                      # samples/ のファイルで計測
+    python benchmark_parser.py feed1.xml feed2.xml --repeat 50
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from rss_parser import fetch_feed, parse_fast, parse_with_feedparser
+
+
+SAMPLES_DIR = Path(__file__).parent / "samples"
+
+PARSERS = {
+    "fast": parse_fast,
+    "feedparser": parse_with_feedparser,
+}
+
+
+def capture_samples(samples_dir):
+    """RSS_FEEDS の現在の内容をサンプルとして保存"""
+    from collector import RSS_FEEDS
+
+    samples_dir.mkdir(parents=True, exist_ok=True)
+    for category, url in RSS_FEEDS.items():
+        path = samples_dir / Path(urlsplit(url).path).name
+        path.write_bytes(fetch_feed(url))
+        print(f"💾 {category}: {path}")
+
+
+def measure(parser, body, repeat):
+    """パース時間の中央値（ミリ秒）とピークメモリ（KB）"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parser(body)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    parser(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return statistics.median(timings), peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RSS パーサーのベンチマーク")
+    parser.add_argument("files", nargs="*", type=Path, help="RSS のサンプルファイル")
+    parser.add_argument(
+        "--capture", action="store_true", help="現在の RSS を samples/ に保存"
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="計測回数")
+    args = parser.parse_args()
+
+    if args.capture:
+        capture_samples(SAMPLES_DIR)
+
+    files = args.files or sorted(SAMPLES_DIR.glob("*.xml"))
+    if not files:
+        print("📭 サンプルがありません。--capture で保存するかファイルを指定してください")
+        return
+
+    print(
+        f"{'ファイル':<24} {'件数':>4} "
+        + " ".join(f"{name + '(ms)':>16} {name + '(KB)':>16}" for name in PARSERS)
+        + f" {'速度比':>8} 一致"
+    )
+    for path in files:
+        body = path.read_bytes()
+        results = {name: measure(func, body, args.repeat) for name, func in PARSERS.items()}
+        outputs = {name: func(body) for name, func in PARSERS.items()}
+
+        speedup = results["feedparser"][0] / results["fast"][0]
+        same = [
+            (item["title"], item["link"], item["published_ts"])
+            for item in outputs["fast"]
+        ] == [
+            (item["title"], item["link"], item["published_ts"])
+            for item in outputs["feedparser"]
+        ]
+        print(
+            f"{path.name:<24} {len(outputs['fast']):>4} "
+            + " ".join(
+                f"{elapsed:>16.3f} {peak:>16.1f}" for elapsed, peak in results.values()
+            )
+            + f" {speedup:>7.1f}x {'✅' if same else '❌'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
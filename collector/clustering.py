@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+類似記事のクラスタリング
+タイトルと概要の文字 bigram から MinHash 署名を計算し、同じ出来事を扱う
+別 URL の記事に共通の cluster_id を付与します。
+
+検索は署名をバンドに分割した LSH インデックスで行うため、
+新しい記事1件あたりの比較対象はバンドが一致したごく一部の候補だけです。
+インデックスは Firestore の1ドキュメントに保存し、毎時の収集で引き継ぎます。
+"""
+
+import hashlib
+import random
+import re
+import time
+import unicodedata
+
+
+# MinHash の署名長（ハッシュ関数の数）
+NUM_HASHES = 16
+
+# LSH のバンド分割（BANDS × ROWS = NUM_HASHES）
+# Jaccard 類似度 0.5 の記事はおよそ 90% の確率で候補になる
+BANDS = 8
+ROWS = NUM_HASHES // BANDS
+
+# 同じクラスタとみなす推定 Jaccard 類似度の下限
+SIMILARITY_THRESHOLD = 0.5
+
+# インデックスに残す期間（時間）と最大件数（ドキュメント上限 1MB に収まる範囲）
+WINDOW_HOURS = 72
+MAX_ENTRIES = 3000
+
+# インデックスの保存先
+INDEX_COLLECTION = "collector_state"
+INDEX_DOCUMENT = "minhash_index"
+
+# 記号・空白（特徴量から除外）
+_IGNORED = re.compile(r"[\s\W_]+", re.UNICODE)
+
+# 署名用のハッシュ関数 h(x) = (a * x + b) mod p の係数（固定シードで再現可能）
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240601)
+_COEFFICIENTS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_HASHES)
+]
+
+
+def features(text):
+    """テキストを文字 bigram の集合に変換（日本語は分かち書きしない）"""
+    normalized = _IGNORED.sub("", unicodedata.normalize("NFKC", text).lower())
+    return {normalized[i : i + 2] for i in range(len(normalized) - 1)}
+
+
+def minhash(text):
+    """テキストの MinHash 署名（NUM_HASHES 個の 32 ビット整数のタプル）"""
+    values = [
+        int.from_bytes(
+            hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "big"
+        )
+        % _PRIME
+        for gram in features(text)
+    ]
+    if not values:
+        return tuple([0xFFFFFFFF] * NUM_HASHES)
+
+    return tuple(
+        min((a * value + b) % _PRIME for value in values) & 0xFFFFFFFF
+        for a, b in _COEFFICIENTS
+    )
+
+
+def similarity(a, b):
+    """2つの署名から Jaccard 類似度を推定"""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_HASHES
+
+
+def signature_from_hex(text):
+    """16進文字列に連結した署名を復元"""
+    return tuple(int(text[i : i + 8], 16) for i in range(0, len(text), 8))
+
+
+def bands(signature):
+    """署名をバンドに分割した (バンド番号, 値のタプル) のリスト"""
+    return [
+        (band, signature[band * ROWS : (band + 1) * ROWS]) for band in range(BANDS)
+    ]
+
+
+class MinHashIndex:
+    """直近の記事の MinHash 署名を保持する LSH インデックス"""
+
+    def __init__(self, entries=None):
+        """
+        Args:
+            entries: [{"id", "sig", "cluster", "t"}, ...]（保存済みの記事）
+        """
+        self._rebuild(entries or [])
+
+    def assign(self, doc_id, text, now=None):
+        """
+        記事を登録して cluster_id を返す
+
+        推定類似度が閾値以上の記事があれば最も近い記事のクラスタに、
+        なければ自身の doc_id を cluster_id とする新しいクラスタになります。
+
+        Returns:
+            (cluster_id, MinHash 署名)
+        """
+        signature = minhash(text)
+        match = self.nearest(signature)
+        cluster_id = match["cluster"] if match else doc_id
+
+        self._add(
+            {
+                "id": doc_id,
+                "sig": signature,
+                "cluster": cluster_id,
+                "t": int(now if now is not None else time.time()),
+            }
+        )
+        return cluster_id, signature
+
+    def nearest(self, signature):
+        """バンドが一致する候補の中から最も似た記事を返す（閾値未満の場合は None）"""
+        best = None
+        best_similarity = SIMILARITY_THRESHOLD
+        seen = set()
+
+        for key in bands(signature):
+            for entry in self._buckets.get(key, []):
+                if entry["id"] in seen:
+                    continue
+                seen.add(entry["id"])
+                score = similarity(signature, entry["sig"])
+                if score >= best_similarity:
+                    best, best_similarity = entry, score
+
+        return best
+
+    def prune(self, now=None):
+        """保持期間・最大件数を超えた古い記事を削除"""
+        now = now if now is not None else time.time()
+        cutoff = now - WINDOW_HOURS * 60 * 60
+        entries = [entry for entry in self.entries if entry["t"] >= cutoff]
+        entries = sorted(entries, key=lambda entry: entry["t"])[-MAX_ENTRIES:]
+        self._rebuild(entries)
+
+    def to_document(self):
+        """Firestore 保存用の dict（署名は16進文字列に連結して保存）"""
+        return {
+            "entries": [
+                {
+                    "id": entry["id"],
+                    "sig": "".join(format(value, "08x") for value in entry["sig"]),
+                    "cluster": entry["cluster"],
+                    "t": entry["t"],
+                }
+                for entry in self.entries
+            ]
+        }
+
+    @classmethod
+    def from_document(cls, data):
+        """Firestore のドキュメントから復元"""
+        entries = [
+            dict(entry, sig=signature_from_hex(entry["sig"]))
+            for entry in (data or {}).get("entries", [])
+        ]
+        return cls(entries)
+
+    @classmethod
+    def load(cls, db):
+        """Firestore からインデックスを読み込む（未作成なら空）"""
+        snapshot = db.collection(INDEX_COLLECTION).document(INDEX_DOCUMENT).get()
+        return cls.from_document(snapshot.to_dict() if snapshot.exists else None)
+
+    def save(self, db):
+        """古い記事を除いて Firestore に保存"""
+        self.prune()
+        db.collection(INDEX_COLLECTION).document(INDEX_DOCUMENT).set(
+            self.to_document()
+        )
+
+    def _rebuild(self, entries):
+        self.entries = []
+        self._buckets = {}
+        for entry in entries:
+            self._add(entry)
+
+    def _add(self, entry):
+        self.entries.append(entry)
+        for key in bands(entry["sig"]):
+            self._buckets.setdefault(key, []).append(entry)
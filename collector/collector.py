@@ -5,12 +5,18 @@
 Yahoo! ニュース RSS からニュースを収集し、Firestore に保存するスクリプト
 """
 
-import feedparser
 import firebase_admin
 from firebase_admin import credentials, firestore
+import argparse
 import hashlib
 import os
 import json
+import re
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from clustering import MinHashIndex
+from rss_parser import fetch_feed, parse_feed
 
 
 # Firebase Admin SDK の初期化
@@ -43,52 +49,243 @@ RSS_FEEDS = {
 }
 
 
+# 追跡用などで記事の同一性に関係しないクエリパラメータ
+TRACKING_PARAMS = {"source", "fr", "ref", "from", "via", "dv", "mode"}
+TRACKING_PREFIXES = ("utm_",)
+
+# Yahoo! ニュースのピックアップ記事（https://news.yahoo.co.jp/pickup/<ID>）
+PICKUP_PATTERN = re.compile(r"^/pickup/(\d+)")
+
+# 同じ記事が複数カテゴリに出る場合、主カテゴリには「主要」以外を優先
+GENERIC_CATEGORY = "主要"
+
+# 一度に取得・書き込みするドキュメント数（Firestore のバッチ上限は 500）
+BATCH_SIZE = 400
+
+
+def canonicalize_url(url):
+    """
+    記事 URL を正規化
+
+    - スキーム・ホストを小文字化し、フラグメントを除去
+    - 追跡用パラメータ（utm_*, source など）を除去し、残りはキー順に並べ替え
+    - ピックアップ記事は https://news.yahoo.co.jp/pickup/<ID> に統一
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    path = parts.path or "/"
+
+    if host.endswith("news.yahoo.co.jp"):
+        match = PICKUP_PATTERN.match(path)
+        if match:
+            return f"https://news.yahoo.co.jp/pickup/{match.group(1)}"
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS
+        and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
 def generate_doc_id(url):
-    """URL からドキュメント ID を生成（ハッシュ化）"""
-    return hashlib.md5(url.encode("utf-8")).hexdigest()
+    """URL からドキュメント ID を生成（正規化した URL をハッシュ化）"""
+    return hashlib.md5(canonicalize_url(url).encode("utf-8")).hexdigest()
 
 
-def fetch_and_save_news(db):
-    """各カテゴリのニュースを取得して Firestore に保存"""
-    total_saved = 0
+def primary_category(categories):
+    """記事の主カテゴリを決定（「主要」より個別カテゴリを優先）"""
+    specific = [category for category in categories if category != GENERIC_CATEGORY]
+    return specific[0] if specific else categories[0]
+
+
+def to_datetime(timestamp):
+    """UNIX 時間を UTC の datetime に変換（None はそのまま）"""
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+def parse_entries(items, category):
+    """
+    パース済みの RSS（rss_parser.parse_feed の結果）を記事データに変換
+
+    Returns:
+        {ドキュメント ID: ニュースデータ}（categories は [category]）
+    """
+    entries = {}
+    for item in items:
+        link = canonicalize_url(item["link"])
+        entries[generate_doc_id(link)] = {
+            "title": item["title"],
+            "link": link,
+            "summary": item["summary"],
+            # 公開日時（Firestore のタイムスタンプとして保存。解釈できない場合は None）
+            "pub_date": to_datetime(item["published_ts"]),
+            "categories": [category],
+        }
+    return entries
+
+
+def collect_entries():
+    """
+    各カテゴリの RSS を取得し、正規化 URL で重複を除いた記事を返す
+
+    Returns:
+        {ドキュメント ID: ニュースデータ}（categories に掲載カテゴリのリスト）
+    """
+    entries = {}
 
     for category, feed_url in RSS_FEEDS.items():
         print(f"📰 カテゴリ「{category}」を取得中...")
 
-        # RSS フィードをパース
-        feed = feedparser.parse(feed_url)
+        # RSS フィードを取得してパース
+        try:
+            items = parse_feed(fetch_feed(feed_url))
+        except Exception as e:
+            print(f"❌ カテゴリ「{category}」: 取得に失敗しました: {e}")
+            continue
 
-        if not feed.entries:
+        if not items:
             print(f"⚠️  カテゴリ「{category}」: エントリが見つかりませんでした")
             continue
 
-        # 各ニュース記事を処理
-        for entry in feed.entries:
-            # ドキュメント ID を生成
-            doc_id = generate_doc_id(entry.link)
+        duplicates = 0
+        for doc_id, data in parse_entries(items, category).items():
+            if doc_id in entries:
+                # 他カテゴリと重複: 掲載カテゴリだけ追加
+                if category not in entries[doc_id]["categories"]:
+                    entries[doc_id]["categories"].append(category)
+                duplicates += 1
+                continue
+
+            entries[doc_id] = data
+
+        print(
+            f"✅ カテゴリ「{category}」: {len(items)}件 取得"
+            f"（重複 {duplicates}件）"
+        )
+
+    return entries
+
+
+def save_entries(db, entries, index=None):
+    """
+    記事を Firestore に保存
+
+    新しい記事だけを作成し、既存の記事は掲載カテゴリが増えた場合のみ
+    categories に追加します（status・created_at・category は上書きしない）。
+    index を渡すと、新しい記事に類似記事のクラスタ ID（cluster_id）を付与します。
+
+    Returns:
+        (作成件数, 更新件数)
+    """
+    created = updated = 0
+    items = list(entries.items())
+
+    for i in range(0, len(items), BATCH_SIZE):
+        chunk = items[i : i + BATCH_SIZE]
+        refs = [db.collection("news").document(doc_id) for doc_id, _ in chunk]
+        existing = {
+            snapshot.id: snapshot
+            for snapshot in db.get_all(refs, field_paths=["category", "categories"])
+        }
 
-            # ニュースデータを構築
-            news_data = {
-                "category": category,
-                "title": entry.title,
-                "link": entry.link,
-                "summary": entry.get("summary", ""),
-                "pub_date": entry.get("published", ""),
-                "created_at": firestore.SERVER_TIMESTAMP,
-                "status": "unread",  # unread / selected / archived
-            }
+        batch = db.batch()
+        writes = 0
+        for ref, (doc_id, data) in zip(refs, chunk):
+            snapshot = existing.get(doc_id)
 
-            # Firestore に保存（merge: true で重複排除）
-            db.collection("news").document(doc_id).set(news_data, merge=True)
-            total_saved += 1
+            if snapshot is None or not snapshot.exists:
+                news_data = {
+                    **data,
+                    "category": primary_category(data["categories"]),
+                    "created_at": firestore.SERVER_TIMESTAMP,
+                    "status": "unread",  # unread / selected / archived
+                }
+                if index is not None:
+                    news_data["cluster_id"], _ = index.assign(
+                        doc_id, f"{data['title']} {data['summary']}"
+                    )
+                batch.set(ref, news_data)
+                created += 1
+                writes += 1
+                continue
 
-        print(f"✅ カテゴリ「{category}」: {len(feed.entries)}件 保存完了")
+            stored = snapshot.to_dict() or {}
+            known = stored.get("categories") or []
+            # categories のない以前の記事は、元の category も一緒に追加する
+            if not known and stored.get("category"):
+                known = [stored["category"]]
+                new_categories = known + [c for c in data["categories"] if c not in known]
+            else:
+                new_categories = [c for c in data["categories"] if c not in known]
+            if new_categories:
+                batch.update(
+                    ref, {"categories": firestore.ArrayUnion(new_categories)}
+                )
+                updated += 1
+                writes += 1
 
-    print(f"\n🎉 合計 {total_saved} 件のニュースを保存しました")
+        if writes:
+            batch.commit()
+
+    return created, updated
+
+
+def fetch_and_save_news(db):
+    """各カテゴリのニュースを取得して Firestore に保存"""
+    entries = collect_entries()
+
+    # 前回までの実行で登録した記事の署名を読み込み、新しい記事をクラスタリング
+    index = MinHashIndex.load(db)
+    created, updated = save_entries(db, entries, index)
+    index.save(db)
+
+    print(
+        f"\n🎉 {len(entries)} 件のニュースを処理しました"
+        f"（新規 {created}件 / カテゴリ追加 {updated}件）"
+    )
 
 
 def main():
     """メイン処理"""
+    parser = argparse.ArgumentParser(description="NewsCast ニュース収集")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="常駐してフィードごとの間隔でポーリングする",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=None,
+        help="デーモンモードの最初のポーリング間隔（秒、デフォルト: 300）",
+    )
+    parser.add_argument(
+        "--min-interval",
+        type=float,
+        default=None,
+        help="デーモンモードのポーリング間隔の下限（秒、デフォルト: 60）",
+    )
+    parser.add_argument(
+        "--max-interval",
+        type=float,
+        default=None,
+        help="デーモンモードのポーリング間隔の上限（秒、デフォルト: 1800）",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help="デーモンモードのヘルスチェック・メトリクスのポート（デフォルト: 8080）",
+    )
+    args = parser.parse_args()
+
     print("=" * 50)
     print("NewsCast - ニュース収集スクリプト")
     print("=" * 50)
@@ -98,6 +295,18 @@ def main():
     db = initialize_firebase()
     print("✅ Firebase 初期化完了\n")
 
+    if args.daemon:
+        from daemon import run_daemon
+
+        run_daemon(
+            db,
+            interval=args.interval,
+            port=args.port,
+            min_interval=args.min_interval,
+            max_interval=args.max_interval,
+        )
+        return
+
     # ニュース取得・保存
     fetch_and_save_news(db)
 
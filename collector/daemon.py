@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ニュース収集のデーモンモード
+1つの Firestore クライアントと RSS 取得用の keep-alive 接続を保持したまま常駐し、
+フィードごとの間隔（ジッター付き）でポーリングします。
+間隔は新着記事数に応じて AdaptiveScheduler が調整します（scheduler.py 参照）。
+
+使用方法:
+    python collector/collector.py --daemon
+    python collector/collector.py --daemon --interval 180 --port 9000
+    python collector/collector.py --daemon --min-interval 120 --max-interval 3600
+
+ヘルスチェック・メトリクス:
+    GET /healthz   全フィードが直近に取得できていれば 200（JSON）
+    GET /metrics   Prometheus 形式のメトリクス
+"""
+
+import gzip
+import heapq
+import http.client
+import json
+import os
+import random
+import signal
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from collector import RSS_FEEDS, parse_entries, save_entries
+from clustering import MinHashIndex
+from rss_parser import parse_feed
+from scheduler import AdaptiveScheduler, MIN_INTERVAL, MAX_INTERVAL
+
+
+# 最初のポーリング間隔（秒）とジッター（間隔に対する割合）
+DEFAULT_INTERVAL = 300
+JITTER = 0.1
+
+# ヘルスチェック・メトリクスのポート
+DEFAULT_PORT = 8080
+
+# RSS 取得のタイムアウト（秒）
+REQUEST_TIMEOUT = 15
+
+# 保存済みとして覚えておく記事数（Firestore の読み取りを省くため）
+KNOWN_ENTRIES = 5000
+
+# 最後の取得成功からこの回数分の間隔が過ぎたら unhealthy
+HEALTHY_INTERVALS = 3
+
+USER_AGENT = "NewsCast-Collector/1.0"
+
+
+class FeedFetchError(Exception):
+    """RSS の取得に失敗した場合のエラー"""
+
+
+class FeedSession:
+    """ホストごとの HTTP(S) 接続を使い回して RSS を取得するクラス"""
+
+    def __init__(self, timeout: float = REQUEST_TIMEOUT):
+        self.timeout = timeout
+        self._connections = {}
+        # URL ごとの ETag / Last-Modified（条件付き GET 用）
+        self._validators = {}
+
+    def fetch(self, url):
+        """
+        RSS を取得
+
+        前回の ETag / Last-Modified を送り、更新がなければ本文を受け取りません。
+
+        Returns:
+            本文（bytes）。更新がない場合（304）は None
+        """
+        parts = urlsplit(url)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        headers = {
+            "User-Agent": USER_AGENT,
+            "Accept-Encoding": "gzip",
+            **self._validators.get(url, {}),
+        }
+
+        # keep-alive 中にサーバー側で切断されていた場合は1回だけ再接続
+        for attempt in range(2):
+            connection = self._connection(parts.scheme, parts.netloc)
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+                break
+            except (http.client.HTTPException, OSError) as e:
+                connection.close()
+                if attempt:
+                    raise FeedFetchError(f"{url}: {e}") from e
+
+        if response.status == 304:
+            return None
+        if response.status != 200:
+            raise FeedFetchError(f"{url}: HTTP {response.status}")
+
+        validators = {}
+        if response.getheader("ETag"):
+            validators["If-None-Match"] = response.getheader("ETag")
+        if response.getheader("Last-Modified"):
+            validators["If-Modified-Since"] = response.getheader("Last-Modified")
+        self._validators[url] = validators
+
+        if response.getheader("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        return body
+
+    def close(self):
+        for connection in self._connections.values():
+            connection.close()
+        self._connections.clear()
+
+    def _connection(self, scheme, host):
+        key = (scheme, host)
+        if key not in self._connections:
+            connection_class = (
+                http.client.HTTPConnection
+                if scheme == "http"
+                else http.client.HTTPSConnection
+            )
+            self._connections[key] = connection_class(host, timeout=self.timeout)
+        return self._connections[key]
+
+
+class CollectorDaemon:
+    """フィードごとの間隔でポーリングして記事を保存する常駐プロセス"""
+
+    def __init__(
+        self,
+        db,
+        feeds=None,
+        interval: float = DEFAULT_INTERVAL,
+        jitter: float = JITTER,
+        session=None,
+        scheduler=None,
+    ):
+        """
+        Args:
+            db: Firestore クライアント
+            feeds: {カテゴリ: RSS の URL}（デフォルト: RSS_FEEDS）
+            interval: 最初のポーリング間隔（秒）
+            jitter: 間隔に加える揺らぎ（間隔に対する割合）
+            session: RSS 取得に使う FeedSession
+            scheduler: ポーリング間隔を決める AdaptiveScheduler
+        """
+        self.db = db
+        self.feeds = dict(feeds or RSS_FEEDS)
+        self.interval = interval
+        self.jitter = jitter
+        self.session = session or FeedSession()
+        self.scheduler = scheduler or AdaptiveScheduler(self.feeds, interval)
+        self.index = MinHashIndex.load(db)
+        self.started_at = time.time()
+        self.stop_event = threading.Event()
+
+        # 保存済みの記事 {ドキュメント ID: 掲載カテゴリ}（古いものから削除）
+        self._known = OrderedDict()
+        self._lock = threading.Lock()
+        self.metrics = {
+            category: {
+                "polls": 0,
+                "not_modified": 0,
+                "errors": 0,
+                "created": 0,
+                "updated": 0,
+                "last_poll_at": None,
+                "last_success_at": None,
+                "last_latency": None,
+                "last_error": None,
+            }
+            for category in self.feeds
+        }
+
+    def run(self):
+        """stop() が呼ばれるまでポーリングを続ける"""
+        # 起動直後に全フィードが同時に取得されないよう少しずつずらす
+        now = time.monotonic()
+        schedule = [
+            (now + random.uniform(0, self.interval * self.jitter), category)
+            for category in self.feeds
+        ]
+        heapq.heapify(schedule)
+
+        try:
+            while not self.stop_event.is_set():
+                due, category = heapq.heappop(schedule)
+                if self.stop_event.wait(max(due - time.monotonic(), 0)):
+                    break
+
+                self.poll(category)
+                heapq.heappush(
+                    schedule, (time.monotonic() + self.next_interval(category), category)
+                )
+        finally:
+            self.session.close()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def next_interval(self, category):
+        """次のポーリングまでの秒数（ジッター付き）"""
+        interval = self.scheduler.interval(category)
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def poll(self, category):
+        """
+        1つのフィードを取得して新しい記事を保存
+
+        Returns:
+            (作成件数, 更新件数)
+        """
+        started = time.monotonic()
+        self._record(category, polls=1, last_poll_at=time.time())
+
+        try:
+            body = self.session.fetch(self.feeds[category])
+            if body is None:
+                self._record(category, not_modified=1, last_success_at=time.time())
+                self.scheduler.observe(category, 0)
+                return 0, 0
+
+            entries = parse_entries(parse_feed(body), category)
+            fresh = {
+                doc_id: data
+                for doc_id, data in entries.items()
+                if category not in self._known.get(doc_id, ())
+            }
+            created, updated = save_entries(self.db, fresh, self.index)
+            if created:
+                self.index.save(self.db)
+        except Exception as e:
+            self._record(category, errors=1, last_error=f"{type(e).__name__}: {e}")
+            print(f"❌ カテゴリ「{category}」: {e}")
+            return 0, 0
+
+        for doc_id in fresh:
+            self._remember(doc_id, category)
+
+        # このフィードで初めて見つかった記事（他カテゴリで保存済みの記事を含む）
+        self.scheduler.observe(category, created + updated)
+
+        latency = time.monotonic() - started
+        self._record(
+            category,
+            created=created,
+            updated=updated,
+            last_success_at=time.time(),
+            last_latency=round(latency, 3),
+            last_error=None,
+        )
+        if created or updated:
+            print(
+                f"✅ カテゴリ「{category}」: 新規 {created}件 / カテゴリ追加 {updated}件"
+                f"（{latency:.2f}秒）"
+            )
+        return created, updated
+
+    def health(self):
+        """
+        ヘルスチェックの結果
+
+        Returns:
+            (healthy, 詳細の dict)
+        """
+        now = time.time()
+        with self._lock:
+            feeds = {category: dict(values) for category, values in self.metrics.items()}
+        for category, schedule in self.scheduler.snapshot().items():
+            feeds[category].update(schedule)
+
+        stale = [
+            category
+            for category, values in feeds.items()
+            if now - (values["last_success_at"] or self.started_at)
+            > values["interval"] * HEALTHY_INTERVALS
+        ]
+        return not stale, {
+            "status": "ok" if not stale else "stale",
+            "uptime": round(now - self.started_at, 1),
+            "stale_feeds": stale,
+            "feeds": feeds,
+        }
+
+    def prometheus_metrics(self):
+        """Prometheus 形式のメトリクス"""
+        with self._lock:
+            feeds = {category: dict(values) for category, values in self.metrics.items()}
+
+        lines = [f"newscast_collector_uptime_seconds {time.time() - self.started_at:.1f}"]
+        for name in ["polls", "not_modified", "errors", "created", "updated"]:
+            lines.append(f"# TYPE newscast_collector_{name}_total counter")
+            for category, values in feeds.items():
+                lines.append(
+                    f'newscast_collector_{name}_total{{feed="{category}"}} {values[name]}'
+                )
+        lines.append("# TYPE newscast_collector_last_latency_seconds gauge")
+        for category, values in feeds.items():
+            if values["last_latency"] is not None:
+                lines.append(
+                    f'newscast_collector_last_latency_seconds{{feed="{category}"}} '
+                    f'{values["last_latency"]}'
+                )
+        schedule = self.scheduler.snapshot()
+        for name, metric in [
+            ("interval", "newscast_collector_poll_interval_seconds"),
+            ("ewma", "newscast_collector_new_entries_ewma"),
+        ]:
+            lines.append(f"# TYPE {metric} gauge")
+            for category, values in schedule.items():
+                lines.append(f'{metric}{{feed="{category}"}} {values[name]}')
+        return "\n".join(lines) + "\n"
+
+    def _record(self, category, **values):
+        """メトリクスを更新（数値は加算、それ以外は上書き）"""
+        with self._lock:
+            metrics = self.metrics[category]
+            for key, value in values.items():
+                if key.startswith("last_"):
+                    metrics[key] = value
+                else:
+                    metrics[key] += value
+
+    def _remember(self, doc_id, category):
+        categories = self._known.pop(doc_id, set())
+        categories.add(category)
+        self._known[doc_id] = categories
+        while len(self._known) > KNOWN_ENTRIES:
+            self._known.popitem(last=False)
+
+
+def serve_health(daemon, port):
+    """ヘルスチェック・メトリクスの HTTP サーバーをバックグラウンドで起動"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/healthz":
+                healthy, detail = daemon.health()
+                body = json.dumps(detail, ensure_ascii=False).encode("utf-8")
+                self._send(200 if healthy else 503, "application/json", body)
+            elif self.path == "/metrics":
+                body = daemon.prometheus_metrics().encode("utf-8")
+                self._send(200, "text/plain; version=0.0.4", body)
+            else:
+                self._send(404, "text/plain", b"not found\n")
+
+        def _send(self, status, content_type, body):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # アクセスログは出さない
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_daemon(db, interval=None, port=None, min_interval=None, max_interval=None):
+    """デーモンモードで収集を開始（SIGINT / SIGTERM で終了）"""
+    interval = interval or float(os.getenv("COLLECTOR_INTERVAL", DEFAULT_INTERVAL))
+    port = port or int(os.getenv("PORT", DEFAULT_PORT))
+    min_interval = min_interval or float(
+        os.getenv("COLLECTOR_MIN_INTERVAL", MIN_INTERVAL)
+    )
+    max_interval = max_interval or float(
+        os.getenv("COLLECTOR_MAX_INTERVAL", MAX_INTERVAL)
+    )
+
+    scheduler = AdaptiveScheduler(
+        RSS_FEEDS, interval, min_interval=min_interval, max_interval=max_interval
+    )
+    daemon = CollectorDaemon(db, interval=interval, scheduler=scheduler)
+    server = serve_health(daemon, port)
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: daemon.stop())
+
+    print(
+        f"🔁 デーモンモードで起動しました（間隔 {interval:.0f}秒"
+        f"（{min_interval:.0f}〜{max_interval:.0f}秒で調整）, ポート {port}）"
+    )
+    try:
+        daemon.run()
+    finally:
+        server.shutdown()
+        print("👋 デーモンを終了しました")
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+既存の記事を現在の形式に揃える移行スクリプト（1回だけ実行）
+以前の収集スクリプトは pub_date を RSS の RFC 822 形式の文字列のまま保存していたため、
+既存の記事を Firestore のタイムスタンプに変換します。
+また、categories のない記事に categories = [category] を追加します
+（管理画面のカテゴリ絞り込み・件数は categories の array-contains で行うため）。
+さらに、生の URL から ID を作っていた以前の記事を正規化 URL の ID
+（generate_doc_id）に移し替えます（status・created_at はそのまま引き継ぎ、
+同じ記事がすでに新しい ID で登録されている場合は1件にまとめます）。
+
+使用方法:
+    python collector/migrate_news.py --dry-run   # 対象件数の確認のみ
+    python collector/migrate_news.py             # 変換を実行
+"""
+
+import argparse
+
+from firebase_admin import firestore
+
+from collector import (
+    canonicalize_url,
+    generate_doc_id,
+    initialize_firebase,
+    to_datetime,
+)
+from rss_parser import parse_timestamp
+
+
+# 1回のクエリで読み込む件数
+PAGE_SIZE = 500
+
+
+def iter_news_pages(db):
+    """news コレクションの全記事をドキュメント ID 順にページ単位で取得（移行に使うフィールドのみ）"""
+    last_doc = None
+    while True:
+        query = (
+            db.collection("news")
+            .order_by(firestore.FieldPath.document_id())
+            .select(["link", "pub_date", "category", "categories"])
+            .limit(PAGE_SIZE)
+        )
+        if last_doc is not None:
+            query = query.start_after(last_doc)
+
+        docs = list(query.stream())
+        if docs:
+            yield docs
+
+        if len(docs) < PAGE_SIZE:
+            return
+        last_doc = docs[-1]
+
+
+def build_update(data):
+    """
+    記事の更新内容を作成
+
+    Returns:
+        更新する dict（変換不要な場合は None）
+    """
+    update = {}
+    pub_date = data.get("pub_date")
+
+    if isinstance(pub_date, str):
+        update["pub_date"] = to_datetime(parse_timestamp(pub_date))
+    if not data.get("categories") and data.get("category"):
+        update["categories"] = [data["category"]]
+
+    return update or None
+
+
+def rekeyed_id(doc_id, data):
+    """
+    正規化 URL から求めたドキュメント ID を返す
+
+    Returns:
+        新しい ID（ID の付け替えが不要な場合は None）
+    """
+    link = data.get("link")
+    if not link:
+        return None
+    new_id = generate_doc_id(link)
+    return new_id if new_id != doc_id else None
+
+
+def merge_into(stored, legacy):
+    """
+    新しい ID ですでに登録されている記事へ、以前の記事の内容をまとめる更新を作成
+
+    created_at は古い方を、status は以前の記事で選択・アーカイブ済みの場合のみ引き継ぎ、
+    categories は両方を合わせます（stored にも同じ内容を反映します）。
+    """
+    update = {}
+    known = stored.get("categories") or []
+    categories = [c for c in legacy.get("categories") or [] if c not in known]
+    if categories:
+        update["categories"] = firestore.ArrayUnion(categories)
+        stored["categories"] = known + categories
+    created_at = legacy.get("created_at")
+    if created_at is not None and (
+        stored.get("created_at") is None or created_at < stored["created_at"]
+    ):
+        update["created_at"] = stored["created_at"] = created_at
+    if legacy.get("status") not in (None, "unread") and stored.get("status") in (
+        None,
+        "unread",
+    ):
+        update["status"] = stored["status"] = legacy["status"]
+    return update
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="pub_date・categories・ドキュメント ID の移行")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="対象件数の確認のみ（書き込みはしない）",
+    )
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("NewsCast - 記事の移行スクリプト（pub_date・categories・ドキュメント ID）")
+    print("=" * 50)
+    print()
+
+    db = initialize_firebase()
+    print("✅ Firebase 初期化完了\n")
+
+    bulk_writer = None if args.dry_run else db.bulk_writer()
+    collection = db.collection("news")
+    scanned = converted = unparsable = backfilled = rekeyed = merged = 0
+    # 移し先の記事（新しい ID → 内容）。同じ正規化 URL の以前の記事が複数ある場合に使用
+    moved = {}
+
+    for docs in iter_news_pages(db):
+        targets = {}
+        for doc in docs:
+            scanned += 1
+            data = doc.to_dict() or {}
+            update = build_update(data)
+
+            new_id = rekeyed_id(doc.id, data)
+            if new_id is not None:
+                targets[doc.id] = (new_id, update)
+                continue
+            if update is None:
+                continue
+
+            converted += 1
+            if "pub_date" in update and update["pub_date"] is None:
+                unparsable += 1
+            if "categories" in update:
+                backfilled += 1
+            if bulk_writer is not None:
+                bulk_writer.update(doc.reference, update)
+
+        if not targets:
+            continue
+
+        # ID を付け替える記事は全フィールドを読み込み、移し先の既存記事とまとめて取得
+        legacy_docs = {
+            snapshot.id: snapshot.to_dict() or {}
+            for snapshot in db.get_all(
+                [collection.document(doc_id) for doc_id in targets]
+            )
+        }
+        moved.update(
+            (snapshot.id, snapshot.to_dict() or {})
+            for snapshot in db.get_all(
+                [
+                    collection.document(new_id)
+                    for new_id in {new_id for new_id, _ in targets.values()}
+                    if new_id not in moved
+                ]
+            )
+            if snapshot.exists
+        )
+
+        for doc_id, (new_id, update) in targets.items():
+            legacy = {**legacy_docs.get(doc_id, {}), **(update or {})}
+            legacy["link"] = canonicalize_url(legacy["link"])
+            rekeyed += 1
+            if "pub_date" in (update or {}) and update["pub_date"] is None:
+                unparsable += 1
+
+            stored = moved.get(new_id)
+            new_ref = collection.document(new_id)
+            if stored is not None:
+                merged += 1
+                update = merge_into(stored, legacy)
+                if bulk_writer is not None and update:
+                    bulk_writer.update(new_ref, update)
+            else:
+                moved[new_id] = dict(legacy)
+                if bulk_writer is not None:
+                    bulk_writer.create(new_ref, legacy)
+
+            if bulk_writer is not None:
+                bulk_writer.delete(collection.document(doc_id))
+
+    if bulk_writer is not None:
+        bulk_writer.close()  # 全ての書き込みが完了するまで待機
+
+    if args.dry_run:
+        label, rekey_label = "⏭️ ドライラン: 変換対象", "⏭️ ドライラン: ID の付け替え対象"
+    else:
+        label, rekey_label = "🎉 変換完了", "🎉 ID の付け替え完了"
+    print(
+        f"{label} {converted}件 / 全 {scanned}件"
+        f"（categories の追加 {backfilled}件、日時を解釈できない記事 {unparsable}件）"
+    )
+    print(
+        f"{rekey_label} {rekeyed}件"
+        f"（既存の記事にまとめた記事 {merged}件）"
+    )
+    print("\n" + "=" * 50)
+    print("処理完了")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
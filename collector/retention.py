@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+news コレクションの保持期間管理スクリプト
+一定日数より古い unread / archived の記事を NDJSON（gzip）のスナップショットに
+書き出してから、BulkWriter で Firestore から削除します。
+selected の記事（動画生成待ち）は対象外です。
+
+使用方法:
+    python collector/retention.py                 # 14日より古い記事を退避・削除
+    python collector/retention.py --days 30       # 保持日数を指定
+    python collector/retention.py --dry-run       # 件数の確認のみ
+    python collector/retention.py --no-archive    # Cloud Storage に退避せずに削除
+
+スナップショットは環境変数 ARCHIVE_BUCKET の Cloud Storage
+（gs://<bucket>/archive/news/）にアップロードしてから削除します。
+ローカルのスナップショットは永続的な退避先にならないため、ARCHIVE_BUCKET が
+未設定の場合は --no-archive を指定しない限り削除しません。
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from firebase_admin import firestore
+
+from collector import initialize_firebase
+
+
+# 保持日数（これより古い記事を退避・削除）
+RETENTION_DAYS = 14
+
+# 退避・削除の対象とするステータス
+TARGET_STATUSES = ["unread", "archived"]
+
+# 1回のクエリで読み込む件数
+PAGE_SIZE = 500
+
+# スナップショットの出力先
+ARCHIVE_DIR = Path(__file__).parent / "archive"
+
+
+def iter_expired_docs(db, status, cutoff):
+    """
+    指定ステータスで cutoff より前に作成された記事を順に取得
+
+    複合インデックス (status ASC, created_at DESC) を使用し、
+    前ページ最後のスナップショットをカーソルにしてページングします。
+    """
+    last_doc = None
+    while True:
+        query = (
+            db.collection("news")
+            .where("status", "==", status)
+            .where("created_at", "<", cutoff)
+            .order_by("created_at", direction=firestore.Query.DESCENDING)
+            .limit(PAGE_SIZE)
+        )
+        if last_doc is not None:
+            query = query.start_after(last_doc)
+
+        docs = list(query.stream())
+        yield from docs
+
+        if len(docs) < PAGE_SIZE:
+            return
+        last_doc = docs[-1]
+
+
+def to_json_value(value):
+    """Firestore の値を JSON で書き出せる形に変換"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def write_snapshot(db, cutoff, snapshot_path):
+    """
+    対象の記事をスナップショットに書き出す
+
+    Returns:
+        書き出した記事の DocumentReference のリスト
+    """
+    refs = []
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with gzip.open(snapshot_path, "wt", encoding="utf-8") as f:
+        for status in TARGET_STATUSES:
+            count = 0
+            for doc in iter_expired_docs(db, status, cutoff):
+                record = {"id": doc.id, **doc.to_dict()}
+                f.write(
+                    json.dumps(record, ensure_ascii=False, default=to_json_value)
+                    + "\n"
+                )
+                refs.append(doc.reference)
+                count += 1
+            print(f"📦 status={status}: {count}件")
+
+    return refs
+
+
+def upload_snapshot(snapshot_path, bucket_name):
+    """スナップショットを Cloud Storage にアップロード"""
+    from firebase_admin import storage
+
+    bucket = storage.bucket(bucket_name)
+    blob = bucket.blob(f"archive/news/{snapshot_path.name}")
+    blob.upload_from_filename(str(snapshot_path), content_type="application/gzip")
+    print(f"☁️  アップロード完了: gs://{bucket_name}/{blob.name}")
+
+
+def delete_docs(db, refs):
+    """BulkWriter で記事をまとめて削除"""
+    bulk_writer = db.bulk_writer()
+    for ref in refs:
+        bulk_writer.delete(ref)
+    bulk_writer.close()  # 全ての削除が完了するまで待機
+
+
+def count_expired_docs(db, cutoff):
+    """退避・削除の対象件数を数える（ドライラン用）"""
+    total = 0
+    for status in TARGET_STATUSES:
+        count = sum(1 for _ in iter_expired_docs(db, status, cutoff))
+        print(f"📦 status={status}: {count}件")
+        total += count
+    return total
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="news コレクションの保持期間管理")
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=RETENTION_DAYS,
+        help=f"保持日数（デフォルト: {RETENTION_DAYS}日）",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="対象件数の確認のみ（書き出し・削除はしない）",
+    )
+    parser.add_argument(
+        "--no-archive",
+        action="store_true",
+        help="ARCHIVE_BUCKET が未設定でも削除する（スナップショットはローカルのみ）",
+    )
+    args = parser.parse_args()
+
+    bucket_name = os.getenv("ARCHIVE_BUCKET")
+    if not bucket_name and not args.dry_run and not args.no_archive:
+        print("❌ ARCHIVE_BUCKET が設定されていないため、削除を中止しました")
+        print("   Cloud Storage に退避せずに削除する場合は --no-archive を指定してください")
+        sys.exit(1)
+
+    print("=" * 50)
+    print("NewsCast - ニュース保持期間管理スクリプト")
+    print("=" * 50)
+    print()
+
+    db = initialize_firebase()
+    print("✅ Firebase 初期化完了\n")
+
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=args.days)
+    print(f"🗓️  {cutoff.strftime('%Y-%m-%d %H:%M')} (UTC) より前の記事が対象です\n")
+
+    if args.dry_run:
+        total = count_expired_docs(db, cutoff)
+        print(f"\n⏭️ ドライラン: {total}件が退避・削除の対象です")
+        return
+
+    # 1. 先にスナップショットへ書き出す（削除前に必ず退避を完了させる）
+    snapshot_path = ARCHIVE_DIR / f"news_{now.strftime('%Y%m%d_%H%M%S')}.ndjson.gz"
+    refs = write_snapshot(db, cutoff, snapshot_path)
+
+    if not refs:
+        snapshot_path.unlink(missing_ok=True)
+        print("\n✅ 対象の記事はありません")
+        return
+
+    print(f"💾 スナップショット: {snapshot_path}（{len(refs)}件）")
+
+    if bucket_name:
+        upload_snapshot(snapshot_path, bucket_name)
+    else:
+        print("⚠️ --no-archive: Cloud Storage には退避せずに削除します")
+
+    # 2. Firestore から削除
+    delete_docs(db, refs)
+
+    print(f"\n🎉 {len(refs)}件の記事を退避・削除しました")
+    print("\n" + "=" * 50)
+    print("処理完了")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+RSS のパース
+Yahoo! ニュースの RSS 2.0 は形式が決まっているため、xml.etree の
+iterparse で必要な要素（title, link, description, pubDate）だけを取り出します。
+想定外の形式やエラーの場合は feedparser にフォールバックします。
+
+環境変数 RSS_PARSER=feedparser で常に feedparser を使います。
+"""
+
+import calendar
+import gzip
+import io
+import os
+import urllib.request
+import xml.etree.ElementTree as ET
+from email.utils import mktime_tz, parsedate_tz
+
+import feedparser
+
+
+# RSS 取得のタイムアウト（秒）
+REQUEST_TIMEOUT = 15
+
+USER_AGENT = "NewsCast-Collector/1.0"
+
+# 取り出す要素（RSS の要素名 → 記事データのキー）
+ITEM_FIELDS = {
+    "title": "title",
+    "link": "link",
+    "description": "summary",
+    "pubDate": "published",
+}
+
+
+class FastParseError(ValueError):
+    """高速パーサーで扱えない RSS の場合のエラー"""
+
+
+def use_fast_parser():
+    """高速パーサーを使うか（RSS_PARSER=feedparser で無効化）"""
+    return os.getenv("RSS_PARSER", "fast") != "feedparser"
+
+
+def fetch_feed(url, timeout=REQUEST_TIMEOUT):
+    """RSS の本文を取得（gzip 転送に対応）"""
+    request = urllib.request.Request(
+        url, headers={"User-Agent": USER_AGENT, "Accept-Encoding": "gzip"}
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        body = response.read()
+        if response.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+    return body
+
+
+def parse_timestamp(value):
+    """RFC 822 形式の日時を UNIX 時間に変換（解釈できない場合は None）"""
+    parsed = parsedate_tz(value) if value else None
+    return mktime_tz(parsed) if parsed else None
+
+
+def parse_fast(body):
+    """
+    RSS 2.0 を iterparse でパース
+
+    Returns:
+        記事のリスト [{"title", "link", "summary", "published", "published_ts"}]
+
+    Raises:
+        FastParseError: RSS 2.0 でない・必須要素がない・description に HTML を含む場合
+    """
+    items = []
+    item = None
+    channel = None
+
+    try:
+        events = ET.iterparse(io.BytesIO(body), events=("start", "end"))
+        _, root = next(events)
+        if root.tag != "rss" or root.get("version") != "2.0":
+            raise FastParseError(f"RSS 2.0 ではありません: <{root.tag}>")
+
+        for event, elem in events:
+            if event == "start":
+                if elem.tag == "channel":
+                    channel = elem
+                elif elem.tag == "item":
+                    item = {"summary": "", "published": ""}
+                continue
+
+            if elem.tag == "item":
+                if "title" not in item or "link" not in item:
+                    raise FastParseError("title / link のない item があります")
+                item["published_ts"] = parse_timestamp(item["published"])
+                items.append(item)
+                item = None
+                # 処理済みの item を解放（ツリーに残さない）
+                if channel is not None:
+                    channel.remove(elem)
+            elif item is not None and elem.tag in ITEM_FIELDS:
+                item[ITEM_FIELDS[elem.tag]] = (elem.text or "").strip()
+    except ET.ParseError as e:
+        raise FastParseError(str(e)) from e
+
+    # feedparser は description の HTML をサニタイズするため、その場合は任せる
+    if any("<" in item["summary"] for item in items):
+        raise FastParseError("description に HTML が含まれています")
+
+    return items
+
+
+def parse_with_feedparser(body):
+    """feedparser でパースし、parse_fast と同じ形式で返す"""
+    feed = feedparser.parse(body)
+    return [
+        {
+            "title": entry.title,
+            "link": entry.link,
+            "summary": entry.get("summary", ""),
+            "published": entry.get("published", ""),
+            "published_ts": (
+                calendar.timegm(entry.published_parsed)
+                if entry.get("published_parsed")
+                else None
+            ),
+        }
+        for entry in feed.entries
+    ]
+
+
+def parse_feed(body):
+    """
+    RSS をパース（高速パーサーでエラーになった場合は feedparser にフォールバック）
+
+    Returns:
+        記事のリスト [{"title", "link", "summary", "published", "published_ts"}]
+    """
+    if use_fast_parser():
+        try:
+            return parse_fast(body)
+        except Exception as e:
+            print(f"⚠️  高速パーサーで解析できないため feedparser を使用します: {e}")
+    return parse_with_feedparser(body)
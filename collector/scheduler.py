@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+フィードごとのポーリング間隔の調整
+1回のポーリングで見つかった新着記事数の EWMA（指数移動平均）を記録し、
+新着が多いフィードは間隔を短く、少ないフィードは長くします。
+"""
+
+import threading
+
+
+# ポーリング間隔の下限・上限（秒）
+MIN_INTERVAL = 60
+MAX_INTERVAL = 1800
+
+# EWMA の平滑化係数（大きいほど直近のポーリング結果を重視）
+ALPHA = 0.3
+
+# 1回のポーリングで見つけたい新着記事数（これより多ければ間隔を短くする）
+TARGET_NEW_ENTRIES = 1.0
+
+# 1回の調整で間隔を変える最大倍率
+MAX_STEP = 2.0
+
+
+class AdaptiveScheduler:
+    """新着記事数の EWMA からフィードごとのポーリング間隔を決めるクラス"""
+
+    def __init__(
+        self,
+        categories,
+        base_interval,
+        min_interval=MIN_INTERVAL,
+        max_interval=MAX_INTERVAL,
+        alpha=ALPHA,
+        target=TARGET_NEW_ENTRIES,
+    ):
+        """
+        Args:
+            categories: フィードのカテゴリ
+            base_interval: 最初のポーリング間隔（秒）
+            min_interval: 間隔の下限（秒）
+            max_interval: 間隔の上限（秒）
+            alpha: EWMA の平滑化係数
+            target: 1回のポーリングで見つけたい新着記事数
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.alpha = alpha
+        self.target = target
+        self._lock = threading.Lock()
+
+        interval = self._clamp(base_interval)
+        # 最初は目標どおりの新着があるものとして開始する
+        self.state = {
+            category: {"ewma": target, "interval": interval}
+            for category in categories
+        }
+
+    def interval(self, category):
+        """フィードの現在のポーリング間隔（秒）"""
+        with self._lock:
+            return self.state[category]["interval"]
+
+    def observe(self, category, new_entries):
+        """
+        ポーリング結果を記録して間隔を調整
+
+        EWMA が目標の2倍なら間隔を半分に、半分なら2倍にします
+        （1回の変化は MAX_STEP 倍まで）。
+
+        Args:
+            category: フィードのカテゴリ
+            new_entries: 見つかった新着記事数（更新なしの場合は 0）
+
+        Returns:
+            調整後の間隔（秒）
+        """
+        with self._lock:
+            state = self.state[category]
+            state["ewma"] = self.alpha * new_entries + (1 - self.alpha) * state["ewma"]
+
+            ratio = self.target / max(state["ewma"], self.target / MAX_STEP)
+            ratio = min(max(ratio, 1 / MAX_STEP), MAX_STEP)
+            state["interval"] = self._clamp(state["interval"] * ratio)
+            return state["interval"]
+
+    def snapshot(self):
+        """フィードごとの EWMA と間隔（メトリクス用）"""
+        with self._lock:
+            return {
+                category: {
+                    "ewma": round(state["ewma"], 3),
+                    "interval": round(state["interval"], 1),
+                }
+                for category, state in self.state.items()
+            }
+
+    def _clamp(self, interval):
+        return min(max(interval, self.min_interval), self.max_interval)
@@ -29,6 +29,13 @@ export default function NewsCard({
 
   const status = statusConfig[news.status] || statusConfig.unread;
 
+  const pubDate =
+    typeof news.pub_date === "string"
+      ? news.pub_date
+      : news.pub_date?.toDate().toLocaleString("ja-JP", {
+          timeZone: "Asia/Tokyo",
+        });
+
   return (
     <div
       className={`bg-white dark:bg-gray-800 rounded-xl shadow-lg p-5 transition-all hover:shadow-xl cursor-pointer border-2 ${
@@ -47,6 +54,17 @@ export default function NewsCard({
         >
           {news.category}
         </span>
+        {/* 他カテゴリにも掲載されている場合 */}
+        {(news.categories ?? [])
+          .filter((category) => category !== news.category)
+          .map((category) => (
+            <span
+              key={category}
+              className="border border-gray-300 dark:border-gray-600 text-gray-500 dark:text-gray-400 text-xs px-2 py-0.5 rounded-full"
+            >
+              {category}
+            </span>
+          ))}
         <span
           className={`${status.color} text-xs font-medium px-2 py-0.5 rounded`}
         >
@@ -77,7 +95,7 @@ export default function NewsCard({
       {/* フッター: 日時 + リンク */}
       <div className="flex items-center justify-between">
         <div className="text-xs text-gray-500 dark:text-gray-400">
-          {news.pub_date || "日時不明"}
+          {pubDate || "日時不明"}
         </div>
         <a
           href={news.link}
@@ -2,15 +2,20 @@
 # 動画生成に関連するモジュールを提供します
 
 from .script_generator import ScriptGenerator
+from .script_model import Line, Script
 from .audio_generator import AudioGenerator
 from .audio_mixer import AudioMixer
 from .video_generator import VideoGenerator
+from .subtitle_generator import SubtitleGenerator
 from .youtube_uploader import YouTubeUploader
 
 __all__ = [
     "ScriptGenerator",
+    "Line",
+    "Script",
     "AudioGenerator",
     "AudioMixer",
     "VideoGenerator",
+    "SubtitleGenerator",
     "YouTubeUploader",
 ]
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+記事本文の取得モジュール
+選択された記事のページを並列に取得して本文を抽出し、スクリプト生成の
+プロンプトに渡します。本文があれば Google Search Grounding なしで生成できます。
+
+取得結果は URL ごとにディスクへ保存し、ETag / Last-Modified で再検証します。
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlsplit
+
+
+# Yahoo! ニュースのピックアップページから全文記事へのリンク
+ARTICLE_LINK_PATTERN = re.compile(r"https://news\.yahoo\.co\.jp/articles/[0-9a-zA-Z]+")
+
+USER_AGENT = "NewsCast-Generator/1.0"
+
+
+class _TextExtractor(HTMLParser):
+    """HTML から段落（<p>）のテキストを抽出するパーサー"""
+
+    # 中のテキストを読まない要素
+    SKIP_TAGS = {"script", "style", "noscript", "nav", "header", "footer", "aside"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs = []  # (article 要素内か, テキスト)
+        self._skip_depth = 0
+        self._article_depth = 0
+        self._current = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == "article":
+            self._article_depth += 1
+        elif tag == "p" and not self._skip_depth:
+            self._current = []
+        elif tag == "br" and self._current is not None:
+            self._current.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag == "article":
+            self._article_depth = max(self._article_depth - 1, 0)
+        elif tag == "p" and self._current is not None:
+            text = "".join(self._current).strip()
+            if text:
+                self.paragraphs.append((self._article_depth > 0, text))
+            self._current = None
+
+    def handle_data(self, data):
+        if self._current is not None and not self._skip_depth:
+            self._current.append(data)
+
+
+def extract_text(html: str) -> str:
+    """HTML から本文を抽出（<article> 内の段落があればそれだけを使う）"""
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+
+    in_article = [text for inside, text in parser.paragraphs if inside]
+    paragraphs = in_article or [text for _, text in parser.paragraphs]
+    return "\n".join(paragraphs)
+
+
+class ArticleEnricher:
+    """記事ページを並列に取得して本文を付与するクラス"""
+
+    # 同時に取得する記事数
+    MAX_WORKERS = 4
+
+    # 同じホストへのリクエスト間隔（秒）
+    HOST_INTERVAL = 1.0
+
+    # 1リクエストのタイムアウト（秒）
+    TIMEOUT = 10
+
+    # プロンプトに渡す本文の最大文字数
+    MAX_CHARS = 2000
+
+    # 再検証せずにキャッシュを使う期間（秒）: 6時間
+    FRESH_TTL = 6 * 60 * 60
+
+    # キャッシュの有効期限（秒）: 7日
+    CACHE_TTL = 7 * 24 * 60 * 60
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_workers: int = MAX_WORKERS,
+        host_interval: float = HOST_INTERVAL,
+        timeout: float = TIMEOUT,
+    ):
+        """
+        Args:
+            cache_dir: キャッシュの保存先（デフォルト: generator/cache/articles）
+            max_workers: 同時に取得する記事数
+            host_interval: 同じホストへのリクエスト間隔（秒）
+            timeout: 1リクエストのタイムアウト（秒）
+        """
+        self.cache_dir = Path(
+            cache_dir or Path(__file__).parent / "cache" / "articles"
+        )
+        self.max_workers = max_workers
+        self.host_interval = host_interval
+        self.timeout = timeout
+
+        self._host_locks: Dict[str, threading.Lock] = {}
+        self._host_last_request: Dict[str, float] = {}
+        self._locks_lock = threading.Lock()
+
+    def enrich(self, news_items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        記事に本文（body）を付与
+
+        取得・抽出に失敗した記事は body なしのまま返します。
+
+        Returns:
+            body を追加した記事のリスト（元の順序）
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            bodies = list(executor.map(self._fetch_body, news_items))
+
+        enriched = []
+        for item, body in zip(news_items, bodies):
+            if body:
+                item = {**item, "body": body[: self.MAX_CHARS]}
+            enriched.append(item)
+        return enriched
+
+    def fetch_text(self, url: str) -> str:
+        """
+        記事ページの本文を取得
+
+        ピックアップページの場合はリンク先の全文記事を取得します。
+        """
+        html = self._fetch_html(url)
+        match = ARTICLE_LINK_PATTERN.search(html)
+        if "/pickup/" in url and match:
+            html = self._fetch_html(match.group(0))
+        return extract_text(html)
+
+    def _fetch_body(self, item: Dict[str, Any]) -> Optional[str]:
+        try:
+            return self.fetch_text(item["link"]) or None
+        except Exception as e:
+            print(f"   ⚠️ 本文を取得できませんでした: {item['title']}: {e}")
+            return None
+
+    def _fetch_html(self, url: str) -> str:
+        """キャッシュを考慮して HTML を取得"""
+        cached = self._load_cache(url)
+        if cached and time.time() - cached["fetched_at"] < self.FRESH_TTL:
+            return cached["html"]
+
+        headers = {"User-Agent": USER_AGENT}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        self._wait_for_host(urlsplit(url).netloc)
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                charset = response.headers.get_content_charset() or "utf-8"
+                html = response.read().decode(charset, errors="replace")
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and cached:
+                cached["fetched_at"] = time.time()
+                self._save_cache(url, cached)
+                return cached["html"]
+            raise
+
+        self._save_cache(
+            url,
+            {
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "fetched_at": time.time(),
+                "html": html,
+            },
+        )
+        return html
+
+    def _wait_for_host(self, host: str) -> None:
+        """同じホストへのリクエストが HOST_INTERVAL 以上空くまで待機"""
+        with self._locks_lock:
+            lock = self._host_locks.setdefault(host, threading.Lock())
+
+        with lock:
+            elapsed = time.monotonic() - self._host_last_request.get(host, float("-inf"))
+            if elapsed < self.host_interval:
+                time.sleep(self.host_interval - elapsed)
+            self._host_last_request[host] = time.monotonic()
+
+    def _cache_path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+        return self.cache_dir / f"{key}.json"
+
+    def _load_cache(self, url: str) -> Optional[Dict[str, Any]]:
+        """キャッシュを取得（期限切れ・破損・別 URL の場合は None）"""
+        path = self._cache_path(url)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError):
+            path.unlink(missing_ok=True)
+            return None
+
+        if entry.get("url") != url or time.time() - entry["fetched_at"] > self.CACHE_TTL:
+            return None
+        return entry
+
+    def _save_cache(self, url: str, entry: Dict[str, Any]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._cache_path(url)
+        temp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(temp_path, path)
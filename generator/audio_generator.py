@@ -9,8 +9,12 @@ Edge TTS を使用してマルチスピーカー音声を生成します。
 import os
 import asyncio
 import tempfile
+import threading
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+
+from script_model import Line, Script
+from usage_tracker import UsageTracker
 
 try:
     import edge_tts
@@ -27,6 +31,55 @@ except ImportError:
     PYDUB_AVAILABLE = False
 
 
+# 発話間の無音（ミリ秒）
+SEGMENT_GAP_MS = 400
+
+
+def assemble_segments(segments: List[tuple]) -> tuple:
+    """
+    発話ごとの音声を無音を挟んで結合し、各発話のタイミングを記録
+
+    タイミングは結合後のサンプル位置から算出するため、
+    後段で ffprobe を使わずに正確な区切り位置が分かります。
+
+    Args:
+        segments: (Line, AudioSegment) のリスト
+
+    Returns:
+        (結合した AudioSegment, タイミング情報)
+        タイミング情報は {"duration": 秒, "lines": [...]} 形式で、
+        lines の各要素は発話の speaker/text/section/news_idx と start/end（秒）
+    """
+    combined = None
+    lines = []
+
+    for line, segment in segments:
+        if combined is None:
+            combined = segment
+            start = 0.0
+        else:
+            silence = AudioSegment.silent(
+                duration=SEGMENT_GAP_MS, frame_rate=combined.frame_rate
+            )
+            combined += silence
+            start = combined.frame_count() / combined.frame_rate
+            combined += segment
+
+        lines.append(
+            {
+                "speaker": line.speaker,
+                "text": line.text,
+                "section": line.section,
+                "news_idx": line.news_idx,
+                "start": start,
+                "end": combined.frame_count() / combined.frame_rate,
+            }
+        )
+
+    duration = combined.frame_count() / combined.frame_rate if combined else 0.0
+    return combined, {"duration": duration, "lines": lines}
+
+
 class AudioGenerator:
     """Edge TTS を使用してマルチスピーカー音声を生成するクラス"""
 
@@ -53,42 +106,40 @@ class AudioGenerator:
                 "pydub パッケージをインストールしてください: pip install pydub"
             )
 
-    def generate_audio(self, script: Dict[str, Any]) -> bytes:
+        # 直近の generate_audio で記録した発話タイミング（assemble_segments 参照）
+        self.timing = None
+
+        # 直近の generate_audio で結合した PCM（pydub.AudioSegment）。
+        # PyAV バックエンドの AudioMixer はこれを直接受け取ります
+        self.pcm = None
+
+    def generate_audio(self, script: Script) -> bytes:
         """
         スクリプト全体から音声を生成
 
         Args:
-            script: スクリプトデータ（ScriptGenerator の出力）
+            script: スクリプト（ScriptGenerator の出力）
 
         Returns:
             生成された音声データ（MP3形式）
         """
-        # 全ての発話を収集
-        all_dialogues = self._extract_all_dialogues(script)
-
-        # 各発話を音声に変換
-        return asyncio.run(self._generate_all_audio(all_dialogues))
+        # 各発話を音声に変換（イントロは intro_fixed.mp3 を使用）
+        return asyncio.run(self._generate_all_audio(script.narration))
 
-    async def _generate_all_audio(self, dialogues: List[Dict[str, str]]) -> bytes:
+    async def _generate_all_audio(self, lines: List[Line]) -> bytes:
         """全ての発話から音声を生成"""
         audio_segments = []
 
         with tempfile.TemporaryDirectory() as temp_dir:
-            for i, dialogue in enumerate(dialogues):
-                speaker = dialogue.get("speaker", "Steve")
-                text = dialogue.get("text", "")
-
-                if not text.strip():
-                    continue
-
+            for i, line in enumerate(lines):
                 voice_config = self.VOICE_CONFIG.get(
-                    speaker, self.VOICE_CONFIG["Steve"]
+                    line.speaker, self.VOICE_CONFIG["Steve"]
                 )
                 temp_file = Path(temp_dir) / f"segment_{i}.mp3"
 
                 # Edge TTS で音声生成
                 communicate = edge_tts.Communicate(
-                    text,
+                    line.text,
                     voice_config["voice"],
                     rate=voice_config["rate"],
                 )
@@ -96,19 +147,14 @@ class AudioGenerator:
 
                 # AudioSegment で読み込み
                 segment = AudioSegment.from_mp3(str(temp_file))
-                audio_segments.append(segment)
-
-                # 発話間に短い無音を追加
-                silence = AudioSegment.silent(duration=400)  # 400ms
-                audio_segments.append(silence)
+                audio_segments.append((line, segment))
 
-            # 全セグメントを結合
+            # 全セグメントを結合（発話間に短い無音を追加）
             if not audio_segments:
                 return b""
 
-            combined = audio_segments[0]
-            for segment in audio_segments[1:]:
-                combined += segment
+            combined, self.timing = assemble_segments(audio_segments)
+            self.pcm = combined
 
             # バイトデータとして出力
             output_buffer = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
@@ -123,29 +169,6 @@ class AudioGenerator:
             os.unlink(output_path)
             return audio_data
 
-    def _extract_all_dialogues(self, script: Dict[str, Any]) -> List[Dict[str, str]]:
-        """スクリプトから全ての発話を抽出（イントロは除外）"""
-        dialogues = []
-
-        # イントロはスキップ（intro_fixed.mp3 を使用）
-        # dialogues.extend(script.get("intro", []))
-
-        # 各ニュース
-        for news_item in script.get("news", []):
-            sections = news_item.get("sections", {})
-            for section_name in [
-                "introduction",
-                "vocabulary_hook",
-                "deep_dive",
-                "discussion",
-            ]:
-                dialogues.extend(sections.get(section_name, []))
-
-        # アウトロ
-        dialogues.extend(script.get("outro", []))
-
-        return dialogues
-
 
 class FallbackAudioGenerator:
     """
@@ -165,6 +188,13 @@ class FallbackAudioGenerator:
                 "google-cloud-texttospeech パッケージをインストールしてください"
             )
 
+        # 直近の generate_audio で記録した発話タイミング（assemble_segments 参照）
+        self.timing = None
+
+        # 直近の generate_audio で結合した PCM（pydub.AudioSegment）。
+        # PyAV バックエンドの AudioMixer はこれを直接受け取ります
+        self.pcm = None
+
     # 話者ごとの声の設定（高品質 Neural2 voices）
     VOICE_CONFIG = {
         "Steve": {
@@ -179,12 +209,12 @@ class FallbackAudioGenerator:
         },
     }
 
-    def generate_audio(self, script: Dict[str, Any]) -> bytes:
+    def generate_audio(self, script: Script) -> bytes:
         """
         スクリプトから音声を生成
 
         Args:
-            script: スクリプトデータ
+            script: スクリプト（ScriptGenerator の出力）
 
         Returns:
             生成された音声データ（MP3形式）
@@ -195,19 +225,14 @@ class FallbackAudioGenerator:
             raise ImportError("pydub パッケージをインストールしてください")
 
         audio_segments = []
-        dialogues = self._extract_all_dialogues(script)
-
-        for dialogue in dialogues:
-            speaker = dialogue.get("speaker", "Steve")
-            text = dialogue.get("text", "")
-
-            if not text.strip():
-                continue
 
-            voice_config = self.VOICE_CONFIG.get(speaker, self.VOICE_CONFIG["Steve"])
+        for line in script.narration:
+            voice_config = self.VOICE_CONFIG.get(
+                line.speaker, self.VOICE_CONFIG["Steve"]
+            )
 
             # SSML を構築（自然な読み上げのため）
-            ssml = f'<speak><prosody rate="{voice_config["speaking_rate"]}">{text}</prosody></speak>'
+            ssml = f'<speak><prosody rate="{voice_config["speaking_rate"]}">{line.text}</prosody></speak>'
 
             synthesis_input = self.tts.SynthesisInput(ssml=ssml)
 
@@ -232,19 +257,14 @@ class FallbackAudioGenerator:
             import io
 
             segment = AudioSegment.from_mp3(io.BytesIO(response.audio_content))
-            audio_segments.append(segment)
-
-            # 発話間に無音を追加（400ms）
-            silence = AudioSegment.silent(duration=400)
-            audio_segments.append(silence)
+            audio_segments.append((line, segment))
 
-        # 全セグメントを結合
+        # 全セグメントを結合（発話間に無音を追加）
         if not audio_segments:
             return b""
 
-        combined = audio_segments[0]
-        for segment in audio_segments[1:]:
-            combined += segment
+        combined, self.timing = assemble_segments(audio_segments)
+        self.pcm = combined
 
         # MP3として出力
         import tempfile
@@ -263,27 +283,6 @@ class FallbackAudioGenerator:
 
         return audio_data
 
-    def _extract_all_dialogues(self, script: Dict[str, Any]) -> List[Dict[str, str]]:
-        """スクリプトから全ての発話を抽出（イントロは除外）"""
-        dialogues = []
-
-        # イントロはスキップ（intro_fixed.mp3 を使用）
-        # dialogues.extend(script.get("intro", []))
-
-        for news_item in script.get("news", []):
-            sections = news_item.get("sections", {})
-            for section_name in [
-                "introduction",
-                "vocabulary_hook",
-                "deep_dive",
-                "discussion",
-            ]:
-                dialogues.extend(sections.get(section_name, []))
-
-        dialogues.extend(script.get("outro", []))
-
-        return dialogues
-
 
 class GeminiAudioGenerator:
     """
@@ -293,6 +292,9 @@ class GeminiAudioGenerator:
 
     MODEL = "gemini-2.5-flash-preview-tts"
 
+    # レート制限対策: 1分あたり10リクエストなので、リクエスト間に待機
+    REQUEST_INTERVAL = 7.0  # 7秒間隔で1分あたり約8-9リクエスト（安全マージン）
+
     # 話者ごとの声の設定
     VOICE_CONFIG = {
         "Steve": {
@@ -313,8 +315,13 @@ class GeminiAudioGenerator:
         "empathetic": "speak with empathy and warmth, in a caring tone",
     }
 
-    def __init__(self):
-        """Gemini TTS を初期化"""
+    def __init__(self, usage_tracker: Optional[UsageTracker] = None):
+        """
+        Gemini TTS を初期化
+
+        Args:
+            usage_tracker: API 使用量の記録先（None の場合は内部で作成）
+        """
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             raise ValueError("GEMINI_API_KEY 環境変数が設定されていません")
@@ -323,51 +330,177 @@ class GeminiAudioGenerator:
 
         self.client = genai.Client(api_key=api_key)
 
-    def generate_audio(self, script: Dict[str, Any]) -> bytes:
+        # 直近の generate_audio で記録した発話タイミング（assemble_segments 参照）
+        self.timing = None
+
+        # 直近の generate_audio で結合した PCM（pydub.AudioSegment）。
+        # PyAV バックエンドの AudioMixer はこれを直接受け取ります
+        self.pcm = None
+
+        # prefetch で先行生成した音声 {(voice_name, text): [音声パート]}
+        self._prefetched: Dict[tuple, List[Dict[str, Any]]] = {}
+        self._last_request_at = None
+
+        self.usage_tracker = usage_tracker or UsageTracker()
+
+    def generate_audio(self, script: Script) -> bytes:
         """
         スクリプトから音声を生成（Gemini TTS）
 
+        prefetch で先行生成済みの発話はキャッシュを使用します。
+
         Args:
-            script: スクリプトデータ
+            script: スクリプト（ScriptGenerator の出力）
 
         Returns:
             生成された音声データ（WAV形式）
         """
-        import time
-        from google.genai import types
-        from google.genai.errors import ClientError, ServerError
+        audio_segments = []
 
-        dialogues = self._extract_all_dialogues(script)
+        for line in script.narration:
+            # emotion は将来の感情制御機能で使用予定
+            # emotion_style = self.EMOTION_STYLE.get(line.emotion, self.EMOTION_STYLE["neutral"])
+            parts = self._prefetched.get(self._cache_key(line))
+            if parts is None:
+                parts = self._synthesize(line)
+
+            audio_segments.extend(dict(part, line=line) for part in parts)
 
-        if not dialogues:
+        if not audio_segments:
             return b""
 
-        audio_segments = []
+        # pydub で結合（無音を追加）
+        try:
+            from pydub import AudioSegment
+            import io
 
-        # レート制限対策: 1分あたり10リクエストなので、リクエスト間に待機
-        request_interval = 7.0  # 7秒間隔で1分あたり約8-9リクエスト（安全マージン）
-        max_retries = 5
-        base_wait = 3.0  # 基本待機時間（秒）
+            # MIMEタイプからフォーマットを判定
+            def get_format_from_mime(mime_type: str) -> str:
+                mime_to_format = {
+                    "audio/wav": "wav",
+                    "audio/x-wav": "wav",
+                    "audio/mpeg": "mp3",
+                    "audio/mp3": "mp3",
+                    "audio/ogg": "ogg",
+                    "audio/flac": "flac",
+                    "audio/L16": "raw",
+                    "audio/pcm": "raw",
+                }
+                return mime_to_format.get(mime_type, "wav")
 
-        for i, dialogue in enumerate(dialogues):
-            speaker = dialogue.get("speaker", "Steve")
-            text = dialogue.get("text", "")
-            # emotion は将来の感情制御機能で使用予定
-            # emotion = dialogue.get("emotion", "neutral")
-            # emotion_style = self.EMOTION_STYLE.get(emotion, self.EMOTION_STYLE["neutral"])
+            decoded_segments = []
+            for audio_info in audio_segments:
+                audio_data = audio_info["data"]
+                mime_type = audio_info["mime_type"]
+
+                # 空データはスキップ
+                if not audio_data or len(audio_data) < 10:
+                    print("   ⚠️ 空の音声データをスキップ")
+                    continue
+
+                audio_format = get_format_from_mime(mime_type)
+
+                try:
+                    # PCM/raw形式の場合は特別な処理が必要
+                    if audio_format == "raw" or mime_type.startswith("audio/L16"):
+                        # Gemini TTSはL16 (16-bit PCM) を返す
+                        segment = AudioSegment(
+                            data=audio_data,
+                            sample_width=2,  # 16-bit = 2 bytes
+                            frame_rate=24000,  # Gemini TTSのデフォルトサンプルレート
+                            channels=1,  # モノラル
+                        )
+                    else:
+                        segment = AudioSegment.from_file(
+                            io.BytesIO(audio_data), format=audio_format
+                        )
 
-            if not text.strip():
+                    decoded_segments.append((audio_info["line"], segment))
+                except Exception as e:
+                    print(f"   ⚠️ 音声デコードエラー: {e}")
+                    continue
+
+            if not decoded_segments:
+                return b""
+
+            # 発話間に無音を挟んで結合
+            combined, self.timing = assemble_segments(decoded_segments)
+            self.pcm = combined
+
+            output_buffer = io.BytesIO()
+            combined.export(output_buffer, format="wav")
+            return output_buffer.getvalue()
+
+        except ImportError:
+            return audio_segments[0]["data"] if audio_segments else b""
+
+    def prefetch(
+        self, lines: List[Line], cancel: Optional[threading.Event] = None
+    ) -> int:
+        """
+        発話の一部（完成したニュースブロックなど）の音声を先行生成
+
+        ストリーミングでスクリプトを生成している間に呼び出すことで、
+        残りの生成を待たずに TTS を進められます。結果は generate_audio で
+        同じ話者・テキストの発話に再利用されます。
+
+        Args:
+            lines: 先行生成する発話
+            cancel: セットされたら残りの発話を生成せずに終了する
+
+        Returns:
+            新たに生成した発話数
+        """
+        count = 0
+        for line in lines:
+            if cancel is not None and cancel.is_set():
+                break
+            key = self._cache_key(line)
+            if not line.text or key in self._prefetched:
                 continue
 
-            voice_config = self.VOICE_CONFIG.get(speaker, self.VOICE_CONFIG["Steve"])
+            self._prefetched[key] = self._synthesize(line)
+            count += 1
 
+        return count
+
+    def _cache_key(self, line: Line) -> tuple:
+        """先行生成キャッシュのキー（声とテキスト）"""
+        voice_config = self.VOICE_CONFIG.get(line.speaker, self.VOICE_CONFIG["Steve"])
+        return (voice_config["voice_name"], line.text)
+
+    def _synthesize(self, line: Line) -> List[Dict[str, Any]]:
+        """
+        1発話分の音声を生成（レート制限・リトライ付き）
+
+        Returns:
+            音声パートのリスト（data, mime_type）
+        """
+        import time
+        from google.genai import types
+        from google.genai.errors import ClientError, ServerError
+
+        max_retries = 5
+        base_wait = 3.0  # 基本待機時間（秒）
+
+        voice_name, text = self._cache_key(line)
+        parts = []
+
+        with self.usage_tracker.track(
+            "tts", self.MODEL, characters=len(text)
+        ) as record:
             # リトライロジック付き音声生成
             for retry in range(max_retries):
+                record.retries = retry
                 try:
-                    # レート制限対策: リクエスト間に待機（最初のリクエスト以外）
-                    if i > 0 and retry == 0:
-                        time.sleep(request_interval)
-
+                    # レート制限対策: 前回のリクエストから一定間隔を空ける
+                    if retry == 0 and self._last_request_at is not None:
+                        elapsed = time.monotonic() - self._last_request_at
+                        if elapsed < self.REQUEST_INTERVAL:
+                            time.sleep(self.REQUEST_INTERVAL - elapsed)
+                            record.backoff += self.REQUEST_INTERVAL - elapsed
+
+                    self._last_request_at = time.monotonic()
                     response = self.client.models.generate_content(
                         model=self.MODEL,
                         contents=text,
@@ -376,12 +509,13 @@ class GeminiAudioGenerator:
                             speech_config=types.SpeechConfig(
                                 voice_config=types.VoiceConfig(
                                     prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                                        voice_name=voice_config["voice_name"],
+                                        voice_name=voice_name,
                                     )
                                 )
                             ),
                         ),
                     )
+                    record.add_usage(response)
 
                     # 音声データを取得（MIMEタイプも保存）
                     if response.candidates and response.candidates[0].content.parts:
@@ -390,7 +524,7 @@ class GeminiAudioGenerator:
                                 mime_type = getattr(
                                     part.inline_data, "mime_type", "audio/wav"
                                 )
-                                audio_segments.append(
+                                parts.append(
                                     {
                                         "data": part.inline_data.data,
                                         "mime_type": mime_type,
@@ -410,6 +544,7 @@ class GeminiAudioGenerator:
                             f"   ⏳ レート制限 - {wait_time:.1f}秒待機後リトライ ({retry + 1}/{max_retries})"
                         )
                         time.sleep(wait_time)
+                        record.backoff += wait_time
                         if retry == max_retries - 1:
                             raise  # 最後のリトライも失敗したら例外を再送出
                     else:
@@ -424,97 +559,16 @@ class GeminiAudioGenerator:
                         f"   ⏳ サーバーエラー({error_code}) - {wait_time:.1f}秒待機後リトライ ({retry + 1}/{max_retries})"
                     )
                     time.sleep(wait_time)
+                    record.backoff += wait_time
                     if retry == max_retries - 1:
                         raise  # 最後のリトライも失敗したら例外を再送出
 
-        if not audio_segments:
-            return b""
-
-        # pydub で結合（無音を追加）
-        try:
-            from pydub import AudioSegment
-            import io
-
-            # MIMEタイプからフォーマットを判定
-            def get_format_from_mime(mime_type: str) -> str:
-                mime_to_format = {
-                    "audio/wav": "wav",
-                    "audio/x-wav": "wav",
-                    "audio/mpeg": "mp3",
-                    "audio/mp3": "mp3",
-                    "audio/ogg": "ogg",
-                    "audio/flac": "flac",
-                    "audio/L16": "raw",
-                    "audio/pcm": "raw",
-                }
-                return mime_to_format.get(mime_type, "wav")
-
-            combined = None
-            for audio_info in audio_segments:
-                audio_data = audio_info["data"]
-                mime_type = audio_info["mime_type"]
-
-                # 空データはスキップ
-                if not audio_data or len(audio_data) < 10:
-                    print("   ⚠️ 空の音声データをスキップ")
-                    continue
+        return parts
 
-                audio_format = get_format_from_mime(mime_type)
 
-                try:
-                    # PCM/raw形式の場合は特別な処理が必要
-                    if audio_format == "raw" or mime_type.startswith("audio/L16"):
-                        # Gemini TTSはL16 (16-bit PCM) を返す
-                        segment = AudioSegment(
-                            data=audio_data,
-                            sample_width=2,  # 16-bit = 2 bytes
-                            frame_rate=24000,  # Gemini TTSのデフォルトサンプルレート
-                            channels=1,  # モノラル
-                        )
-                    else:
-                        segment = AudioSegment.from_file(
-                            io.BytesIO(audio_data), format=audio_format
-                        )
-
-                    if combined is None:
-                        combined = segment
-                    else:
-                        silence = AudioSegment.silent(duration=400)
-                        combined += silence + segment
-                except Exception as e:
-                    print(f"   ⚠️ 音声デコードエラー: {e}")
-                    continue
-
-            if combined is None:
-                return b""
-
-            output_buffer = io.BytesIO()
-            combined.export(output_buffer, format="wav")
-            return output_buffer.getvalue()
-
-        except ImportError:
-            return audio_segments[0]["data"] if audio_segments else b""
-
-    def _extract_all_dialogues(self, script: Dict[str, Any]) -> List[Dict[str, str]]:
-        """スクリプトから全ての発話を抽出（イントロは除外）"""
-        dialogues = []
-
-        for news_item in script.get("news", []):
-            sections = news_item.get("sections", {})
-            for section_name in [
-                "introduction",
-                "vocabulary_hook",
-                "deep_dive",
-                "discussion",
-            ]:
-                dialogues.extend(sections.get(section_name, []))
-
-        dialogues.extend(script.get("outro", []))
-
-        return dialogues
-
-
-def get_audio_generator(engine: str = "gemini"):
+def get_audio_generator(
+    engine: str = "gemini", usage_tracker: Optional[UsageTracker] = None
+):
     """
     音声生成器を取得
 
@@ -523,12 +577,13 @@ def get_audio_generator(engine: str = "gemini"):
             - "gemini": Gemini 2.5 Flash TTS（デフォルト、高品質、感情対応）
             - "google_cloud": Google Cloud TTS（高品質）
             - "edge": Edge TTS（無料）
+        usage_tracker: Gemini API 使用量の記録先（gemini のみ使用）
 
     Returns:
         音声生成器のインスタンス
     """
     if engine == "gemini":
-        return GeminiAudioGenerator()
+        return GeminiAudioGenerator(usage_tracker=usage_tracker)
     elif engine == "google_cloud":
         return FallbackAudioGenerator()
     else:
@@ -539,28 +594,31 @@ if __name__ == "__main__":
     print("AudioGenerator モジュールが正常にロードされました")
 
     # テスト用のスクリプト
-    test_script = {
-        "intro": [
-            {
-                "speaker": "Steve",
-                "text": "Hello and welcome to NewsCast.",
-                "emotion": "neutral",
-            },
-            {
-                "speaker": "Nancy",
-                "text": "Today we have exciting news for you!",
-                "emotion": "curious",
-            },
-        ],
-        "news": [],
-        "outro": [
-            {
-                "speaker": "Steve",
-                "text": "Thank you for listening.",
-                "emotion": "neutral",
-            },
-        ],
-    }
+    test_script = Script.from_dict(
+        {
+            "intro": [
+                {
+                    "speaker": "Steve",
+                    "text": "Hello and welcome to NewsCast.",
+                    "emotion": "neutral",
+                },
+                {
+                    "speaker": "Nancy",
+                    "text": "Today we have exciting news for you!",
+                    "emotion": "curious",
+                },
+            ],
+            "news": [],
+            "outro": [
+                {
+                    "speaker": "Steve",
+                    "text": "Thank you for listening.",
+                    "emotion": "neutral",
+                },
+            ],
+        },
+        expected_news=0,
+    )
 
     try:
         generator = AudioGenerator()
@@ -4,24 +4,31 @@
 """
 音声編集モジュール
 FFmpeg を使用して音声ファイルを結合・ミキシングします。
+PyAV バックエンド（media_engine.py）を選んだ場合はプロセス内で処理します。
 """
 
 import os
+import json
 import subprocess
 import tempfile
+from functools import cached_property
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
+
+from ffmpeg_capabilities import FFmpegCapabilities, get_capabilities
+from media_engine import AudioInput, get_media_engine, write_wav
 
 
 class AudioMixer:
     """FFmpeg を使用して音声をミキシングするクラス"""
 
-    def __init__(self, assets_dir: Optional[str] = None):
+    def __init__(self, assets_dir: Optional[str] = None, backend: Optional[str] = None):
         """
         AudioMixer を初期化
 
         Args:
             assets_dir: アセットファイルが格納されているディレクトリ
+            backend: "ffmpeg" または "pyav"（None なら環境変数 MEDIA_BACKEND）
         """
         if assets_dir is None:
             # デフォルトは generator/assets ディレクトリ
@@ -30,24 +37,24 @@ class AudioMixer:
             self.assets_dir = Path(assets_dir)
 
         self.intro_path = self.assets_dir / "intro_fixed.mp3"
+        self.intro_metadata_path = self.assets_dir / "intro_fixed.json"
 
-        # FFmpeg のパスを確認
-        self._check_ffmpeg()
+        # PyAV バックエンド（None の場合は ffmpeg CLI で処理）
+        self.engine = get_media_engine(backend)
 
-    def _check_ffmpeg(self):
-        """FFmpeg がインストールされているか確認"""
-        try:
-            result = subprocess.run(
-                ["ffmpeg", "-version"],
-                capture_output=True,
-                text=True,
-            )
-            if result.returncode != 0:
-                raise RuntimeError("FFmpeg の実行に失敗しました")
-        except FileNotFoundError:
-            raise RuntimeError(
-                "FFmpeg がインストールされていません。インストールしてください。"
-            )
+    @cached_property
+    def capabilities(self) -> FFmpegCapabilities:
+        """
+        FFmpeg の機能（ffmpeg CLI で処理する場合にだけ検出する）
+
+        検出結果はキャッシュされ、2回目以降は ffmpeg を実行しません。
+        PyAV バックエンドでは参照しないため、ffmpeg が無くても動作します。
+        """
+        return get_capabilities()
+
+    @cached_property
+    def mp3_args(self) -> List[str]:
+        return self.capabilities.mp3_codec_args()
 
     def mix_audio(
         self,
@@ -66,6 +73,10 @@ class AudioMixer:
         Returns:
             出力ファイルのパス
         """
+        if self.engine is not None:
+            intro = self.intro_path if include_intro and self.intro_path.exists() else None
+            return self.engine.render_audio(output_path, main_audio_path, intro=intro)
+
         if include_intro and self.intro_path.exists():
             # イントロと本編を結合
             return self._concat_audio_files(
@@ -111,10 +122,7 @@ class AudioMixer:
                     "0",
                     "-i",
                     concat_list_path,
-                    "-c:a",
-                    "libmp3lame",
-                    "-q:a",
-                    "2",
+                    *self.mp3_args,
                     output_path,
                 ],
                 capture_output=True,
@@ -140,16 +148,16 @@ class AudioMixer:
         Returns:
             出力ファイルのパス
         """
+        if self.engine is not None:
+            return self.engine.render_audio(output_path, input_path)
+
         result = subprocess.run(
             [
                 "ffmpeg",
                 "-y",
                 "-i",
                 input_path,
-                "-c:a",
-                "libmp3lame",
-                "-q:a",
-                "2",
+                *self.mp3_args,
                 output_path,
             ],
             capture_output=True,
@@ -180,6 +188,11 @@ class AudioMixer:
         Returns:
             出力ファイルのパス
         """
+        if self.engine is not None:
+            return self.engine.render_audio(
+                output_path, speech_path, bgm=bgm_path, bgm_volume=bgm_volume
+            )
+
         # BGM を speech の長さにループし、音量を調整して合成
         result = subprocess.run(
             [
@@ -193,10 +206,7 @@ class AudioMixer:
                 bgm_path,
                 "-filter_complex",
                 f"[1:a]volume={bgm_volume}[bgm];[0:a][bgm]amix=inputs=2:duration=first:dropout_transition=3",
-                "-c:a",
-                "libmp3lame",
-                "-q:a",
-                "2",
+                *self.mp3_args,
                 output_path,
             ],
             capture_output=True,
@@ -219,18 +229,24 @@ class AudioMixer:
         Returns:
             出力ファイルのパス
         """
+        if self.engine is not None:
+            return self.engine.render_audio(output_path, input_path, normalize=True)
+
+        loudness_filter = self.capabilities.loudness_filter()
+        if loudness_filter is None:
+            print("⚠️ FFmpeg に正規化フィルタが無いため、正規化せずに変換します")
+            filter_args = []
+        else:
+            filter_args = ["-filter:a", loudness_filter]
+
         result = subprocess.run(
             [
                 "ffmpeg",
                 "-y",
                 "-i",
                 input_path,
-                "-filter:a",
-                "loudnorm",
-                "-c:a",
-                "libmp3lame",
-                "-q:a",
-                "2",
+                *filter_args,
+                *self.mp3_args,
                 output_path,
             ],
             capture_output=True,
@@ -242,6 +258,165 @@ class AudioMixer:
 
         return output_path
 
+    def render_final_audio(
+        self,
+        speech: AudioInput,
+        output_path: str,
+        bgm_path: Optional[str] = None,
+        bgm_volume: float = 0.1,
+        include_intro: bool = True,
+    ) -> str:
+        """
+        本編音声から最終音声を生成（BGM 追加 → イントロ結合 → 正規化）
+
+        PyAV バックエンドでは全ての処理を1回のデコード・エンコードで行い、
+        中間ファイルを作りません。ffmpeg バックエンドでは一時ディレクトリで
+        convert_to_mp3 → add_background_music → mix_audio → normalize_audio を順に実行します。
+
+        Args:
+            speech: 本編音声のパス、または TTS で結合した PCM（PcmAudio / pydub.AudioSegment）
+            output_path: 出力ファイルのパス
+            bgm_path: BGM ファイルのパス（None なら BGM なし）
+            bgm_volume: BGM の音量（0.0〜1.0）
+            include_intro: イントロを含めるかどうか
+
+        Returns:
+            出力ファイルのパス
+        """
+        if self.engine is not None:
+            intro = self.intro_path if include_intro and self.intro_path.exists() else None
+            return self.engine.render_audio(
+                output_path,
+                speech,
+                intro=intro,
+                bgm=bgm_path,
+                bgm_volume=bgm_volume,
+                normalize=True,
+            )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_dir = Path(temp_dir)
+            if not isinstance(speech, (str, Path)):
+                speech = write_wav(speech, temp_dir / "speech.wav")
+
+            main_audio_path = self.convert_to_mp3(str(speech), str(temp_dir / "main.mp3"))
+            if bgm_path is not None:
+                main_audio_path = self.add_background_music(
+                    main_audio_path, str(bgm_path), str(temp_dir / "bgm.mp3"), bgm_volume
+                )
+            final_audio_path = self.mix_audio(
+                main_audio_path, str(temp_dir / "final.mp3"), include_intro
+            )
+            return self.normalize_audio(final_audio_path, output_path)
+
+    def get_intro_duration(self) -> float:
+        """
+        イントロの長さを取得
+
+        create_intro.py が記録したサイドカー（intro_fixed.json）を優先し、
+        無い場合のみ ffprobe で計測します。
+
+        Returns:
+            長さ（秒）。イントロが存在しない場合は 0.0
+        """
+        if not self.intro_path.exists():
+            return 0.0
+
+        try:
+            return float(self._load_intro_metadata()["duration"])
+        except (KeyError, TypeError, ValueError):
+            return self.get_audio_duration(str(self.intro_path))
+
+    def _load_intro_metadata(self) -> Optional[Dict[str, Any]]:
+        """create_intro.py が記録したサイドカー（intro_fixed.json）を読み込む"""
+        try:
+            with open(self.intro_metadata_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def build_timeline(
+        self,
+        timing: Dict[str, Any],
+        output_path: Optional[str] = None,
+        include_intro: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        最終音声のタイムライン（マニフェスト）を構築
+
+        音声生成時に記録した発話タイミングをイントロの長さ分ずらし、
+        イントロ終了・各ニュースの開始/終了・アウトロ開始を求めます。
+        BGM 追加と正規化は長さを変えないため、この値がそのまま
+        最終音声のカット位置になります。
+
+        Args:
+            timing: 音声生成器の timing（{"duration": 秒, "lines": [...]}）
+            output_path: マニフェストの保存先（JSON）。None の場合は保存しない
+            include_intro: mix_audio でイントロを含めたかどうか
+
+        Returns:
+            タイムライン
+                - duration: 最終音声の長さ（秒）
+                - intro_end: イントロ終了時刻（秒）
+                - news: [{"index", "start", "end"}, ...]
+                - outro_start: アウトロ開始時刻（秒、アウトロが無い場合は None）
+                - lines: 各発話の speaker/text/section/news_idx/start/end
+                  （イントロの発話は section="intro"）
+        """
+        intro_end = self.get_intro_duration() if include_intro else 0.0
+
+        # イントロの発話（サイドカーに記録があれば字幕用に含める）
+        lines = []
+        intro_metadata = self._load_intro_metadata() if include_intro else None
+        if intro_metadata and self.intro_path.exists():
+            lines.extend(
+                {
+                    "speaker": line["speaker"],
+                    "text": line["text"],
+                    "section": "intro",
+                    "news_idx": None,
+                    "start": line["start"],
+                    "end": line["end"],
+                }
+                for line in intro_metadata.get("lines", [])
+            )
+
+        lines.extend(
+            {
+                **line,
+                "start": round(intro_end + line["start"], 3),
+                "end": round(intro_end + line["end"], 3),
+            }
+            for line in timing["lines"]
+        )
+
+        news: Dict[int, Dict[str, Any]] = {}
+        outro_start = None
+        for line in lines:
+            news_idx = line.get("news_idx")
+            if news_idx is not None:
+                block = news.setdefault(
+                    news_idx,
+                    {"index": news_idx, "start": line["start"], "end": line["end"]},
+                )
+                block["end"] = line["end"]
+            elif line.get("section") == "outro" and outro_start is None:
+                outro_start = line["start"]
+
+        timeline = {
+            "duration": round(intro_end + timing["duration"], 3),
+            "intro_end": round(intro_end, 3),
+            "news": [news[i] for i in sorted(news)],
+            "outro_start": outro_start,
+            "lines": lines,
+        }
+
+        if output_path:
+            with open(output_path, "w", encoding="utf-8") as f:
+                json.dump(timeline, f, ensure_ascii=False, indent=2)
+
+        return timeline
+
     def get_audio_duration(self, audio_path: str) -> float:
         """
         音声ファイルの長さを取得
@@ -252,6 +427,9 @@ class AudioMixer:
         Returns:
             長さ（秒）
         """
+        if self.engine is not None:
+            return self.engine.get_duration(audio_path)
+
         result = subprocess.run(
             [
                 "ffprobe",
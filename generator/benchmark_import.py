@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+main.py の起動時間のベンチマーク
+`python -X importtime main.py --help` を繰り返し実行し、起動の所要時間と
+import にかかった時間（上位のモジュール）を計測します。
+
+使用方法:
+    python benchmark_import.py
+    python benchmark_import.py --baseline HEAD~1     # 指定した版と比較
+    python benchmark_import.py --args --dry-run --help
+"""
+
+import re
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+
+
+GENERATOR_DIR = Path(__file__).parent
+
+# -X importtime の出力行: "import time:  self [us] | cumulative | imported package"
+IMPORTTIME_PATTERN = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+def run_once(generator_dir: Path, args: list) -> dict:
+    """
+    main.py を1回起動して計測
+
+    Returns:
+        {"wall": 起動〜終了の秒数, "imports": {モジュール: 累積 import 時間（秒）}}
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "main.py", *args],
+        cwd=generator_dir,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - started
+
+    if result.returncode != 0:
+        raise RuntimeError(f"main.py の起動に失敗しました:\n{result.stderr[-2000:]}")
+
+    # インデントのない行が main.py から直接 import されたモジュール
+    imports = {}
+    for match in IMPORTTIME_PATTERN.finditer(result.stderr):
+        _, cumulative, indent, name = match.groups()
+        if len(indent) <= 1:
+            imports[name] = int(cumulative) / 1_000_000
+
+    return {"wall": wall, "imports": imports}
+
+
+def benchmark(generator_dir: Path, args: list, repeat: int) -> dict:
+    """repeat 回起動して中央値を集計"""
+    runs = [run_once(generator_dir, args) for _ in range(repeat)]
+    last_imports = runs[-1]["imports"]
+    return {
+        "wall": statistics.median(run["wall"] for run in runs),
+        "imports": statistics.median(sum(run["imports"].values()) for run in runs),
+        "top": sorted(last_imports.items(), key=lambda item: item[1], reverse=True)[:10],
+    }
+
+
+def checkout(revision: str, directory: Path) -> Path:
+    """指定した版の generator ディレクトリを展開"""
+    archive = subprocess.run(
+        ["git", "archive", revision, "generator"],
+        cwd=GENERATOR_DIR.parent,
+        capture_output=True,
+        check=True,
+    )
+    subprocess.run(
+        ["tar", "-x", "-C", str(directory)], input=archive.stdout, check=True
+    )
+    return directory / "generator"
+
+
+def print_result(label: str, result: dict) -> None:
+    print(f"\n📊 {label}")
+    print(f"   起動時間（中央値）: {result['wall'] * 1000:.0f} ms")
+    print(f"   import 時間（中央値）: {result['imports'] * 1000:.0f} ms")
+    for name, seconds in result["top"]:
+        print(f"     {seconds * 1000:8.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="main.py の起動時間のベンチマーク")
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数")
+    parser.add_argument("--baseline", help="比較する git の版（例: HEAD~1）")
+    parser.add_argument(
+        "--args",
+        nargs=argparse.REMAINDER,
+        default=["--help"],
+        help="main.py に渡す引数（デフォルト: --help）",
+    )
+    args = parser.parse_args()
+
+    current = benchmark(GENERATOR_DIR, args.args, args.repeat)
+    print_result(f"現在の main.py {' '.join(args.args)}", current)
+
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            baseline_dir = checkout(args.baseline, Path(temp_dir))
+            baseline = benchmark(baseline_dir, args.args, args.repeat)
+        print_result(f"{args.baseline} の main.py {' '.join(args.args)}", baseline)
+        print(
+            f"\n⚡ 起動時間: {baseline['wall'] * 1000:.0f} ms → "
+            f"{current['wall'] * 1000:.0f} ms"
+            f"（{baseline['wall'] / current['wall']:.1f}倍）"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+メディアバックエンド（ffmpeg CLI / PyAV）のベンチマーク
+合成した音声・画像で、main.py のステップ 3（音声編集）とステップ 4（動画生成）を
+両方のバックエンドで実行し、所要時間と出力（サイズ・キーフレーム数）を比較します。
+
+- 音声: TTS の PCM → MP3 変換 → BGM 追加 → イントロ結合 → 正規化
+- 動画: シーンクリップのエンコード（キャッシュなし）と連結・音声の多重化
+- 動画（キャッシュあり）: クリップがキャッシュ済みの場合の連結・多重化のみ
+
+使用方法:
+    python benchmark_media.py
+    python benchmark_media.py --seconds 300 --repeat 3 --renditions 1080p 720p
+"""
+
+import math
+import time
+import array
+import shutil
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+
+from audio_mixer import AudioMixer
+from media_engine import PcmAudio, write_wav
+from video_generator import VideoGenerator
+
+
+BACKENDS = ["ffmpeg", "pyav"]
+
+# 合成する TTS 音声の形式（Gemini TTS と同じ 24kHz モノラル 16bit）
+TTS_SAMPLE_RATE = 24000
+
+INTRO_SECONDS = 10
+BGM_SECONDS = 20
+
+
+def make_pcm(seconds: int, frequency: float, rate: int = TTS_SAMPLE_RATE) -> PcmAudio:
+    """1秒ごとに 0.8秒鳴って 0.2秒休む正弦波（発話の代わり）"""
+    one_second = array.array(
+        "h",
+        (
+            int(8000 * math.sin(2 * math.pi * frequency * i / rate)) if i < rate * 0.8 else 0
+            for i in range(rate)
+        ),
+    ).tobytes()
+    return PcmAudio(one_second * seconds, rate)
+
+
+def make_assets(assets_dir: Path) -> None:
+    """イントロ・BGM の音声とシーン画像を作成"""
+    from PIL import Image
+
+    images_dir = assets_dir / "images"
+    images_dir.mkdir(parents=True)
+    colors = {
+        "hook.jpg": (25, 25, 112),
+        "news_major.png": (72, 61, 139),
+        "news_world.png": (34, 139, 34),
+        "news_business.png": (178, 34, 34),
+        "conclusion.jpg": (47, 79, 79),
+    }
+    for filename, color in colors.items():
+        Image.new("RGB", (1920, 1080), color).save(images_dir / filename)
+
+    mixer = AudioMixer(assets_dir=str(assets_dir), backend="ffmpeg")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, seconds, frequency in [
+            ("intro_fixed", INTRO_SECONDS, 660),
+            ("bgm_news", BGM_SECONDS, 220),
+        ]:
+            wav_path = Path(temp_dir) / f"{name}.wav"
+            write_wav(make_pcm(seconds, frequency, rate=44100), wav_path)
+            mixer.convert_to_mp3(str(wav_path), str(assets_dir / f"{name}.mp3"))
+
+
+def make_timeline(seconds: int) -> dict:
+    """イントロ → ニュース3件 → アウトロのタイムライン"""
+    duration = INTRO_SECONDS + seconds
+    news_length = seconds * 0.9 / 3
+    return {
+        "duration": duration,
+        "intro_end": INTRO_SECONDS,
+        "news": [
+            {"index": i, "start": INTRO_SECONDS + i * news_length} for i in range(3)
+        ],
+        "outro_start": INTRO_SECONDS + 3 * news_length,
+    }
+
+
+def measure(function, repeat: int) -> float:
+    """repeat 回実行した所要時間の中央値（秒）"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def inspect_video(path: Path) -> dict:
+    """動画のサイズ・映像のビットレート・キーフレーム数と音声の形式"""
+    import av
+
+    with av.open(str(path)) as container:
+        video = container.streams.video[0]
+        audio = container.streams.audio[0]
+        packets = [p for p in container.demux(video) if p.dts is not None]
+        video_seconds = float(sum(p.duration for p in packets) * video.time_base)
+        return {
+            "size": path.stat().st_size,
+            "video_kbps": sum(p.size for p in packets) * 8 / video_seconds / 1000,
+            "keyframes": sum(p.is_keyframe for p in packets),
+            "frames": len(packets),
+            "audio": f"{audio.codec_context.layout.name} {audio.rate}Hz"
+            f" {(audio.bit_rate or 0) // 1000}k",
+        }
+
+
+def benchmark_backend(
+    backend: str, work_dir: Path, pcm: PcmAudio, args: argparse.Namespace
+) -> dict:
+    """1つのバックエンドで音声編集・動画生成を計測"""
+    assets_dir = work_dir / "assets"
+    output_dir = work_dir / backend
+    output_dir.mkdir()
+
+    mixer = AudioMixer(assets_dir=str(assets_dir), backend=backend)
+    audio_path = output_dir / "normalized_audio.mp3"
+    audio = measure(
+        lambda: mixer.render_final_audio(
+            pcm,
+            str(audio_path),
+            bgm_path=str(assets_dir / "bgm_news.mp3"),
+            bgm_volume=0.15,
+        ),
+        args.repeat,
+    )
+
+    generator = VideoGenerator(assets_dir=str(assets_dir), backend=backend)
+    generator.scene_cache_dir = output_dir / "scenes"
+    timeline = make_timeline(args.seconds)
+    outputs = {name: str(output_dir / f"video_{name}.mp4") for name in args.renditions}
+
+    def generate_video():
+        generator.generate_video_variants(
+            audio_path=str(audio_path),
+            outputs=outputs,
+            timeline=timeline,
+            categories=["主要", "国際", "経済"],
+        )
+
+    def generate_video_cold():
+        shutil.rmtree(generator.scene_cache_dir, ignore_errors=True)
+        generate_video()
+
+    video_cold = measure(generate_video_cold, args.repeat)
+    video_warm = measure(generate_video, args.repeat)
+
+    return {
+        "音声編集": audio,
+        "動画生成（キャッシュなし）": video_cold,
+        "動画生成（キャッシュあり）": video_warm,
+        "audio_duration": mixer.get_audio_duration(str(audio_path)),
+        "videos": {name: inspect_video(Path(path)) for name, path in outputs.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="メディアバックエンドのベンチマーク")
+    parser.add_argument("--seconds", type=int, default=60, help="本編音声の長さ（秒）")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数")
+    parser.add_argument(
+        "--renditions",
+        nargs="+",
+        default=["1080p", "720p"],
+        choices=list(VideoGenerator.VIDEO_VARIANTS),
+        help="生成する動画のレンディション",
+    )
+    args = parser.parse_args()
+
+    pcm = make_pcm(args.seconds, 440)
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_dir = Path(temp_dir)
+        make_assets(work_dir / "assets")
+        for backend in BACKENDS:
+            print(f"⏱️ {backend} を計測中...")
+            results[backend] = benchmark_backend(backend, work_dir, pcm, args)
+
+    print(
+        f"\n📊 本編 {args.seconds}秒 + イントロ {INTRO_SECONDS}秒"
+        f" / {', '.join(args.renditions)}（中央値, {args.repeat}回）"
+    )
+    print(f"{'処理':<24} {'ffmpeg CLI':>12} {'PyAV':>12} {'倍率':>8}")
+    for label in ["音声編集", "動画生成（キャッシュなし）", "動画生成（キャッシュあり）"]:
+        cli, pyav = results["ffmpeg"][label], results["pyav"][label]
+        print(f"{label:<24} {cli:>11.2f}s {pyav:>11.2f}s {cli / pyav:>7.2f}x")
+    print(
+        f"\n   出力音声の長さ: ffmpeg {results['ffmpeg']['audio_duration']:.2f}秒"
+        f" / PyAV {results['pyav']['audio_duration']:.2f}秒"
+    )
+
+    print(f"\n{'出力':<16} {'サイズ':>10} {'映像':>12} {'キーフレーム':>14}  音声")
+    for backend in BACKENDS:
+        for name, video in results[backend]["videos"].items():
+            print(
+                f"{backend + ' ' + name:<16} {video['size'] / 1024:>8.0f}KB"
+                f" {video['video_kbps']:>8.0f}kb/s"
+                f" {video['keyframes']:>6}/{video['frames']:<7}  {video['audio']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+記事の自動選択（NewsRanker.rank）のベンチマーク
+合成した記事コレクションでスコアリングのレイテンシを計測します。
+Firestore には接続しません（クエリ1回分の時間は含まれません）。
+
+使用方法:
+    python benchmark_ranking.py
+    python benchmark_ranking.py --sizes 500 10000 100000 --repeat 20
+"""
+
+import time
+import random
+import argparse
+import statistics
+from datetime import datetime, timezone
+
+from news_ranker import NewsRanker
+
+
+CATEGORIES = ["主要", "国内", "国際", "経済", "エンタメ", "スポーツ", "IT"]
+
+
+def make_collection(size: int, now: float, seed: int = 0) -> list:
+    """
+    合成の記事コレクションを作成
+
+    直近 WINDOW_HOURS の間に公開された記事で、クラスタの大きさは
+    1件が大半・まれに10件以上になる分布にしています。
+    """
+    rng = random.Random(seed)
+    window = NewsRanker.WINDOW_HOURS * 60 * 60
+    items = []
+    cluster = None
+
+    for i in range(size):
+        doc_id = f"{i:032x}"
+        # 約3割の記事は直前の記事と同じクラスタ
+        if cluster is None or rng.random() > 0.3:
+            cluster = doc_id
+        items.append(
+            {
+                "id": doc_id,
+                "title": f"ニュース {i}",
+                "summary": "",
+                "link": f"https://news.yahoo.co.jp/pickup/{i}",
+                "category": rng.choice(CATEGORIES),
+                "cluster_id": cluster,
+                "pub_date": datetime.fromtimestamp(
+                    now - rng.random() * window, tz=timezone.utc
+                ),
+            }
+        )
+
+    return items
+
+
+def benchmark(size: int, repeat: int) -> dict:
+    """指定件数でのレイテンシ（ミリ秒）を計測"""
+    ranker = NewsRanker()
+    now = time.time()
+    items = make_collection(size, now)
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        ranker.rank(items, limit=3, now=now)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        "median": statistics.median(timings),
+        "p95": timings[min(int(len(timings) * 0.95), len(timings) - 1)],
+        "max": timings[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NewsRanker ベンチマーク")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[NewsRanker.MAX_CANDIDATES, 10_000, 100_000],
+        help="候補の記事数",
+    )
+    parser.add_argument("--repeat", type=int, default=10, help="計測回数")
+    args = parser.parse_args()
+
+    print(f"{'件数':>10} {'中央値(ms)':>12} {'p95(ms)':>10} {'最大(ms)':>10}")
+    for size in args.sizes:
+        result = benchmark(size, args.repeat)
+        print(
+            f"{size:>10} {result['median']:>12.2f} "
+            f"{result['p95']:>10.2f} {result['max']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
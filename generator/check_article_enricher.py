@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+article_enricher.py の動作確認
+ローカルの HTTP サーバー（http.server）で記事ページを配信し、ネットワークに
+接続せずに ArticleEnricher の次の動作を確認します。
+
+- 本文の抽出: <article> 内の <p> だけを使い、script・nav などは読まない
+- ホストごとの間隔: 並列に取得しても同じホストへのリクエストは host_interval 以上空く
+- 再検証: ETag / Last-Modified を送り、304 の場合はキャッシュの本文を使う
+
+使用方法:
+    python check_article_enricher.py
+"""
+
+import sys
+import time
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from article_enricher import ArticleEnricher
+
+
+# 同じホストへのリクエスト間隔（秒）
+HOST_INTERVAL = 0.3
+
+# 時刻の計測誤差の許容値（秒）
+TOLERANCE = 0.02
+
+ARTICLE_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>記事</title>
+<style>p { color: red; }</style></head>
+<body>
+<nav><p>メニュー</p></nav>
+<p>記事の外の段落</p>
+<article>
+  <h1>見出し</h1>
+  <p>一段落目です。</p>
+  <script>var p = "<p>スクリプト</p>";</script>
+  <p>二段落目&amp;続き<br>改行の後</p>
+  <p>   </p>
+</article>
+<footer><p>フッター</p></footer>
+</body></html>"""
+
+EXPECTED_TEXT = "一段落目です。\n二段落目&続き\n改行の後"
+
+# 再検証用のページ: パス → (ETag, Last-Modified)
+VALIDATORS = {
+    "/etag": ('"v1"', None),
+    "/last-modified": (None, "Wed, 01 Oct 2025 00:00:00 GMT"),
+}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """記事ページを配信し、受け取ったリクエストを記録するハンドラー"""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((time.monotonic(), self.path, dict(self.headers)))
+
+        etag, last_modified = VALIDATORS.get(self.path, (None, None))
+        if (etag and self.headers.get("If-None-Match") == etag) or (
+            last_modified and self.headers.get("If-Modified-Since") == last_modified
+        ):
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = ARTICLE_HTML.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        if last_modified:
+            self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # アクセスログは出力しない
+
+
+def start_server() -> ThreadingHTTPServer:
+    """フィクスチャサーバーを空いているポートで起動"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def check_extraction(server, base_url, cache_dir) -> list:
+    """<p> の抽出を確認"""
+    enricher = ArticleEnricher(cache_dir=cache_dir / "extract")
+    text = enricher.fetch_text(f"{base_url}/article")
+    if text != EXPECTED_TEXT:
+        return [f"抽出結果が異なります: {text!r}"]
+    return []
+
+
+def check_host_spacing(server, base_url, cache_dir) -> list:
+    """並列取得でも同じホストへのリクエスト間隔が空くことを確認"""
+    enricher = ArticleEnricher(
+        cache_dir=cache_dir / "spacing", max_workers=4, host_interval=HOST_INTERVAL
+    )
+    items = [
+        {"title": f"記事{i}", "link": f"{base_url}/spacing/{i}"} for i in range(4)
+    ]
+    with server.lock:
+        server.requests.clear()
+
+    enriched = enricher.enrich(items)
+
+    errors = []
+    if [item.get("body") for item in enriched] != [EXPECTED_TEXT] * len(items):
+        errors.append("本文が付与されていない記事があります")
+    if [item["link"] for item in enriched] != [item["link"] for item in items]:
+        errors.append("記事の順序が変わっています")
+
+    times = sorted(t for t, _, _ in server.requests)
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    if len(times) != len(items):
+        errors.append(f"リクエスト数が {len(times)} 件です（期待値 {len(items)} 件）")
+    if gaps and min(gaps) < HOST_INTERVAL - TOLERANCE:
+        errors.append(
+            f"リクエスト間隔が短すぎます: 最小 {min(gaps):.3f}秒"
+            f"（host_interval {HOST_INTERVAL}秒）"
+        )
+    return errors
+
+
+def check_revalidation(server, base_url, cache_dir) -> list:
+    """ETag / Last-Modified の再検証と 304 でのキャッシュ再利用を確認"""
+    errors = []
+    enricher = ArticleEnricher(cache_dir=cache_dir / "revalidate", host_interval=0)
+
+    for path, (etag, last_modified) in VALIDATORS.items():
+        url = f"{base_url}{path}"
+        first = enricher.fetch_text(url)
+
+        # FRESH_TTL 内はリクエストせずにキャッシュを使う
+        with server.lock:
+            server.requests.clear()
+        enricher.fetch_text(url)
+        if server.requests:
+            errors.append(f"{path}: FRESH_TTL 内なのにリクエストしました")
+
+        # FRESH_TTL を過ぎたら条件付きリクエストで再検証し、304 ならキャッシュを使う
+        enricher.FRESH_TTL = 0
+        cached_at = enricher._load_cache(url)["fetched_at"]
+        second = enricher.fetch_text(url)
+        enricher.FRESH_TTL = ArticleEnricher.FRESH_TTL
+
+        if len(server.requests) != 1:
+            errors.append(f"{path}: 再検証のリクエストが {len(server.requests)} 件です")
+            continue
+        _, _, headers = server.requests[0]
+        if etag and headers.get("If-None-Match") != etag:
+            errors.append(f"{path}: If-None-Match が送られていません")
+        if last_modified and headers.get("If-Modified-Since") != last_modified:
+            errors.append(f"{path}: If-Modified-Since が送られていません")
+        if second != first or second != EXPECTED_TEXT:
+            errors.append(f"{path}: 304 の後の本文がキャッシュと異なります: {second!r}")
+        if enricher._load_cache(url)["fetched_at"] <= cached_at:
+            errors.append(f"{path}: 304 の後にキャッシュの取得時刻が更新されていません")
+
+    return errors
+
+
+CHECKS = [
+    ("本文の抽出（<p>）", check_extraction),
+    ("ホストごとのリクエスト間隔", check_host_spacing),
+    ("ETag / Last-Modified の再検証（304）", check_revalidation),
+]
+
+
+def main():
+    """メイン処理"""
+    server = start_server()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"🌐 フィクスチャサーバー: {base_url}\n")
+
+    failed = 0
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name, check in CHECKS:
+                errors = check(server, base_url, Path(temp_dir))
+                if errors:
+                    failed += 1
+                    print(f"❌ {name}")
+                    for error in errors:
+                        print(f"   - {error}")
+                else:
+                    print(f"✅ {name}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print()
+    if failed:
+        print(f"❌ {failed}/{len(CHECKS)} 件の確認に失敗しました")
+        sys.exit(1)
+    print(f"🎉 {len(CHECKS)} 件の確認がすべて成功しました")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,15 @@
 イントロ音声生成スクリプト
 SteveとNancyの挨拶音声を生成し、BGMと合成してintro_fixed.mp3を作成します。
 
+発話ごとの音声は (エンジン, 声, テキスト) をキーにキャッシュし、
+変更された発話だけを再合成します。発話の組み合わせと BGM が前回と
+同じ場合は intro_fixed.mp3 を再生成しません。
+イントロの正確な長さ（書き出した MP3 を ffprobe で計測した値）は
+intro_fixed.json（サイドカー）に記録します。
+
 使用方法:
-    python create_intro.py
+    python create_intro.py           # 差分のみ再生成
+    python create_intro.py --force   # キャッシュを無視して再生成
 
 必要なパッケージ:
     pip install gTTS pydub python-dotenv
@@ -17,8 +24,12 @@ SteveとNancyの挨拶音声を生成し、BGMと合成してintro_fixed.mp3を
 
 import os
 import sys
+import json
+import hashlib
+import argparse
 import tempfile
 from pathlib import Path
+from typing import Optional
 
 # .env.local を読み込む
 from dotenv import load_dotenv
@@ -26,11 +37,18 @@ from dotenv import load_dotenv
 env_path = Path(__file__).parent.parent / ".env.local"
 load_dotenv(env_path)
 
+from usage_tracker import UsageTracker
+
 # パス設定
 ASSETS_DIR = Path(__file__).parent / "assets"
 BGM_DIR = ASSETS_DIR / "bgm"
 BGM_PATH = BGM_DIR / "bgm_main.mp3"
 OUTPUT_PATH = ASSETS_DIR / "intro_fixed.mp3"
+METADATA_PATH = ASSETS_DIR / "intro_fixed.json"
+CACHE_DIR = ASSETS_DIR / "intro_cache"
+
+# BGM の音量
+BGM_VOLUME = 0.15
 
 
 # イントロ台本（Steve と Nancy の挨拶）
@@ -62,205 +80,299 @@ INTRO_SCRIPT = [
 ]
 
 
-def generate_speech_with_gtts(script: list, output_path: str):
+# TTS エンジンの設定（フォールバック順）
+# voices: 話者 → 声の名前、gap_ms: 発話間の無音（ミリ秒）
+TTS_ENGINES = {
+    "gemini": {
+        "label": "Gemini TTS",
+        # audio_generator.py と同じ設定
+        "voices": {
+            "Steve": "Orus",  # 男性、落ち着いた声
+            "Nancy": "Kore",  # 女性、明るい声
+        },
+        "gap_ms": 400,
+    },
+    "edge": {
+        "label": "Edge TTS",
+        "voices": {
+            "Steve": "en-US-GuyNeural",  # 男性、落ち着いた声
+            "Nancy": "en-US-JennyNeural",  # 女性、明るい声
+        },
+        "gap_ms": 400,
+    },
+    "gtts": {
+        "label": "gTTS",
+        # gTTS は声を選べないため、再生速度の調整で話者を区別
+        "voices": {
+            "Steve": "en:0.95",  # 若干低い声に
+            "Nancy": "en:1.05",  # 若干高い声に
+        },
+        "gap_ms": 300,
+    },
+}
+
+
+def line_cache_key(engine: str, voice: str, text: str) -> str:
+    """発話キャッシュのキーを生成（エンジン・声・テキストのハッシュ）"""
+    payload = json.dumps([engine, voice, text], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def script_cache_keys(script: list, engine: str) -> list:
+    """台本の各発話に対応するキャッシュキーを返す"""
+    voices = TTS_ENGINES[engine]["voices"]
+    return [
+        line_cache_key(
+            engine, voices.get(item["speaker"], voices["Steve"]), item["text"]
+        )
+        for item in script
+    ]
+
+
+def file_sha256(path: Path) -> str:
+    """ファイルの SHA-256 ハッシュを計算"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_metadata(path: Path = METADATA_PATH) -> Optional[dict]:
+    """サイドカーファイル（intro_fixed.json）を読み込む"""
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_up_to_date(script: list, bgm_sha256: str) -> bool:
+    """
+    intro_fixed.mp3 が現在の台本と BGM から生成済みかを判定
+
+    前回成功したエンジンでの発話キー列・BGM ハッシュ・BGM 音量が
+    すべて一致する場合に True を返します。
+    """
+    metadata = load_metadata()
+    if metadata is None or not OUTPUT_PATH.exists():
+        return False
+
+    engine = metadata.get("engine")
+    if engine not in TTS_ENGINES:
+        return False
+
+    # speech_duration の無いサイドカーは WAV の長さを記録した古い形式（MP3 の長さと異なる）
+    return (
+        "speech_duration" in metadata
+        and metadata.get("line_keys") == script_cache_keys(script, engine)
+        and metadata.get("bgm_sha256") == bgm_sha256
+        and metadata.get("bgm_volume") == BGM_VOLUME
+    )
+
+
+def synthesize_with_gtts(text: str, voice: str):
     """
-    gTTS を使用して音声を生成
+    gTTS を使用して1発話分の音声を生成
 
     Args:
-        script: 発話リスト
-        output_path: 出力ファイルパス
+        text: 発話テキスト
+        voice: "言語:再生速度倍率" 形式の声の設定
+
+    Returns:
+        AudioSegment
     """
     from gtts import gTTS
     from pydub import AudioSegment
 
-    print("🎙️ gTTS で音声を生成中...")
-
-    # 各発話を音声に変換
-    audio_segments = []
+    lang, rate = voice.split(":")
 
     with tempfile.TemporaryDirectory() as temp_dir:
-        for i, item in enumerate(script):
-            speaker = item["speaker"]
-            text = item["text"]
-            temp_file = Path(temp_dir) / f"segment_{i}.mp3"
-
-            # gTTS で音声生成
-            tts = gTTS(text=text, lang="en", slow=False)
-            tts.save(str(temp_file))
-
-            # AudioSegment で読み込み
-            segment = AudioSegment.from_mp3(str(temp_file))
-
-            # 話者によって少し調整（Steve は低め、Nancy は高め）
-            if speaker == "Steve":
-                # 若干低い声に
-                segment = segment._spawn(
-                    segment.raw_data,
-                    overrides={"frame_rate": int(segment.frame_rate * 0.95)},
-                ).set_frame_rate(segment.frame_rate)
-            else:
-                # 若干高い声に
-                segment = segment._spawn(
-                    segment.raw_data,
-                    overrides={"frame_rate": int(segment.frame_rate * 1.05)},
-                ).set_frame_rate(segment.frame_rate)
-
-            audio_segments.append(segment)
-
-            # 発話間に短い無音を追加
-            silence = AudioSegment.silent(duration=300)  # 300ms
-            audio_segments.append(silence)
-
-            print(f"   {speaker}: OK")
+        temp_file = Path(temp_dir) / "segment.mp3"
 
-        # 全セグメントを結合
-        combined = audio_segments[0]
-        for segment in audio_segments[1:]:
-            combined += segment
+        # gTTS で音声生成
+        tts = gTTS(text=text, lang=lang, slow=False)
+        tts.save(str(temp_file))
 
-        # MP3 として保存
-        combined.export(output_path, format="mp3")
+        # AudioSegment で読み込み
+        segment = AudioSegment.from_mp3(str(temp_file))
 
-    print("✅ 音声生成完了")
+    # 話者によって少し調整（Steve は低め、Nancy は高め）
+    return segment._spawn(
+        segment.raw_data,
+        overrides={"frame_rate": int(segment.frame_rate * float(rate))},
+    ).set_frame_rate(segment.frame_rate)
 
 
-def generate_speech_with_edge_tts(script: list, output_path: str):
+def synthesize_with_edge_tts(text: str, voice: str):
     """
-    Edge TTS を使用して音声を生成（より自然な声）
+    Edge TTS を使用して1発話分の音声を生成（より自然な声）
 
     Args:
-        script: 発話リスト
-        output_path: 出力ファイルパス
+        text: 発話テキスト
+        voice: Edge TTS の声の名前
+
+    Returns:
+        AudioSegment
     """
     import asyncio
     import edge_tts
     from pydub import AudioSegment
 
-    print("🎙️ Edge TTS で音声を生成中...")
-
-    # 話者ごとの声
-    voices = {
-        "Steve": "en-US-GuyNeural",  # 男性、落ち着いた声
-        "Nancy": "en-US-JennyNeural",  # 女性、明るい声
-    }
-
-    async def generate_segment(text: str, voice: str, output_file: str):
+    async def generate_segment(output_file: str):
         communicate = edge_tts.Communicate(text, voice, rate="-10%")
         await communicate.save(output_file)
 
-    audio_segments = []
-
     with tempfile.TemporaryDirectory() as temp_dir:
-        for i, item in enumerate(script):
-            speaker = item["speaker"]
-            text = item["text"]
-            voice = voices.get(speaker, voices["Steve"])
-            temp_file = Path(temp_dir) / f"segment_{i}.mp3"
+        temp_file = Path(temp_dir) / "segment.mp3"
 
-            # Edge TTS で音声生成
-            asyncio.run(generate_segment(text, voice, str(temp_file)))
+        # Edge TTS で音声生成
+        asyncio.run(generate_segment(str(temp_file)))
 
-            # AudioSegment で読み込み
-            segment = AudioSegment.from_mp3(str(temp_file))
-            audio_segments.append(segment)
+        # AudioSegment で読み込み
+        return AudioSegment.from_mp3(str(temp_file))
 
-            # 発話間に短い無音を追加
-            silence = AudioSegment.silent(duration=400)  # 400ms
-            audio_segments.append(silence)
 
-            print(f"   {speaker}: OK")
+_gemini_client = None
 
-        # 全セグメントを結合
-        combined = audio_segments[0]
-        for segment in audio_segments[1:]:
-            combined += segment
+# Gemini TTS の使用量（main で集計を表示）
+usage_tracker = UsageTracker()
 
-        # MP3 として保存
-        combined.export(output_path, format="mp3")
 
-    print("✅ 音声生成完了")
-
-
-def generate_speech_with_gemini_tts(script: list, output_path: str):
+def synthesize_with_gemini_tts(text: str, voice: str):
     """
-    Gemini 2.5 Flash TTS を使用して音声を生成（高品質・メイン動画と同じ声）
+    Gemini 2.5 Flash TTS を使用して1発話分の音声を生成（高品質・メイン動画と同じ声）
 
     Args:
-        script: 発話リスト
-        output_path: 出力ファイルパス
+        text: 発話テキスト
+        voice: Gemini TTS の声の名前
+
+    Returns:
+        AudioSegment
     """
-    import os
+    global _gemini_client
+
     import io
     from pydub import AudioSegment
-
-    print("🎙️ Gemini TTS で音声を生成中...")
-
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        raise ValueError("GEMINI_API_KEY 環境変数が設定されていません")
-
-    from google import genai
     from google.genai import types
 
-    client = genai.Client(api_key=api_key)
-
-    # 話者ごとの声（audio_generator.py と同じ設定）
-    voices = {
-        "Steve": "Orus",  # 男性、落ち着いた声
-        "Nancy": "Kore",  # 女性、明るい声
-    }
+    if _gemini_client is None:
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY 環境変数が設定されていません")
 
-    audio_segments = []
+        from google import genai
 
-    for i, item in enumerate(script):
-        speaker = item["speaker"]
-        text = item["text"]
-        voice_name = voices.get(speaker, voices["Steve"])
+        _gemini_client = genai.Client(api_key=api_key)
 
-        # Gemini TTS で音声生成
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-preview-tts",
+    # Gemini TTS で音声生成
+    model = "gemini-2.5-flash-preview-tts"
+    with usage_tracker.track("intro_tts", model, characters=len(text)) as record:
+        response = _gemini_client.models.generate_content(
+            model=model,
             contents=text,
             config=types.GenerateContentConfig(
                 response_modalities=["AUDIO"],
                 speech_config=types.SpeechConfig(
                     voice_config=types.VoiceConfig(
                         prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                            voice_name=voice_name,
+                            voice_name=voice,
                         )
                     )
                 ),
             ),
         )
+        record.add_usage(response)
 
-        # 音声データを取得
-        if response.candidates and response.candidates[0].content.parts:
-            for part in response.candidates[0].content.parts:
-                if part.inline_data and part.inline_data.data:
-                    segment = AudioSegment.from_file(
-                        io.BytesIO(part.inline_data.data), format="wav"
-                    )
-                    audio_segments.append(segment)
+    # 音声データを取得
+    if response.candidates and response.candidates[0].content.parts:
+        for part in response.candidates[0].content.parts:
+            if part.inline_data and part.inline_data.data:
+                return AudioSegment.from_file(
+                    io.BytesIO(part.inline_data.data), format="wav"
+                )
+
+    raise ValueError("音声生成に失敗しました")
+
+
+SYNTHESIZERS = {
+    "gemini": synthesize_with_gemini_tts,
+    "edge": synthesize_with_edge_tts,
+    "gtts": synthesize_with_gtts,
+}
+
+
+def generate_speech(script: list, engine: str, output_path: str) -> dict:
+    """
+    キャッシュを利用して台本全体の音声を生成
+
+    キャッシュにない発話だけを TTS で合成し、WAV でキャッシュに保存します。
+
+    Args:
+        script: 発話リスト
+        engine: TTS エンジン名（TTS_ENGINES のキー）
+        output_path: 出力ファイルパス（WAV）
 
-                    # 発話間に短い無音を追加
-                    silence = AudioSegment.silent(duration=400)
-                    audio_segments.append(silence)
+    Returns:
+        発話キー列・長さ・各発話のタイミングを含むメタデータ
+    """
+    from pydub import AudioSegment
+
+    config = TTS_ENGINES[engine]
+    synthesize = SYNTHESIZERS[engine]
 
-        print(f"   {speaker}: OK")
+    print(f"🎙️ {config['label']} で音声を生成中...")
 
-    # 全セグメントを結合
-    if not audio_segments:
-        raise ValueError("音声生成に失敗しました")
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    keys = script_cache_keys(script, engine)
+    combined = AudioSegment.empty()
+    lines = []
+
+    for item, key in zip(script, keys):
+        speaker = item["speaker"]
+        cache_path = CACHE_DIR / f"{key}.wav"
+
+        if cache_path.exists():
+            segment = AudioSegment.from_wav(str(cache_path))
+            print(f"   {speaker}: キャッシュ")
+        else:
+            voice = config["voices"].get(speaker, config["voices"]["Steve"])
+            segment = synthesize(item["text"], voice)
+            segment.export(str(cache_path), format="wav")
+            print(f"   {speaker}: OK")
 
-    combined = audio_segments[0]
-    for segment in audio_segments[1:]:
+        # サンプル位置から正確なタイミングを記録
+        start = combined.frame_count() / combined.frame_rate if lines else 0.0
         combined += segment
+        end = combined.frame_count() / combined.frame_rate
+        lines.append(
+            {
+                "speaker": speaker,
+                "text": item["text"],
+                "start": round(start, 3),
+                "end": round(end, 3),
+            }
+        )
+
+        # 発話間に短い無音を追加
+        combined += AudioSegment.silent(
+            duration=config["gap_ms"], frame_rate=combined.frame_rate
+        )
 
-    # MP3 として保存
-    combined.export(output_path, format="mp3")
+    combined.export(output_path, format="wav")
 
     print("✅ 音声生成完了")
 
+    return {
+        "engine": engine,
+        "line_keys": keys,
+        "duration": round(combined.frame_count() / combined.frame_rate, 3),
+        "lines": lines,
+    }
+
 
 def mix_with_bgm(
     speech_path: str, bgm_path: str, output_path: str, bgm_volume: float = 0.15
@@ -307,8 +419,46 @@ def mix_with_bgm(
     print(f"✅ 合成完了: {output_path}")
 
 
+def probe_duration(path: Path) -> float:
+    """
+    ffprobe で音声ファイルの長さを計測
+
+    MP3 はエンコーダーの遅延・パディングの分だけ元の WAV より長くなるため、
+    サイドカーには書き出した intro_fixed.mp3 の実際の長さを記録します。
+    """
+    import subprocess
+
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-show_entries",
+            "format=duration",
+            "-of",
+            "default=noprint_wrappers=1:nokey=1",
+            str(path),
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    if result.returncode != 0:
+        raise RuntimeError(f"FFprobe エラー: {result.stderr}")
+
+    return round(float(result.stdout.strip()), 3)
+
+
 def main():
     """メイン処理"""
+    parser = argparse.ArgumentParser(description="NewsCast イントロ音声生成")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="変更がなくても intro_fixed.mp3 を再生成",
+    )
+    args = parser.parse_args()
+
     print("=" * 60)
     print("NewsCast イントロ音声生成スクリプト")
     print("=" * 60)
@@ -334,48 +484,62 @@ def main():
         print(f"   {item['speaker']}: {item['text']}")
     print()
 
+    # 台本・BGM に変更がなければ何もしない
+    bgm_sha256 = file_sha256(BGM_PATH)
+    if not args.force and is_up_to_date(INTRO_SCRIPT, bgm_sha256):
+        metadata = load_metadata()
+        print("✅ 台本と BGM に変更はありません。再生成をスキップします。")
+        print(f"   イントロの長さ: {metadata['duration']}秒")
+        return
+
     # 一時ファイル用ディレクトリ
     with tempfile.TemporaryDirectory() as temp_dir:
-        temp_speech = Path(temp_dir) / "speech.mp3"
+        temp_speech = Path(temp_dir) / "speech.wav"
 
         # 音声生成（Gemini TTS → Edge TTS → gTTS のフォールバック）
-        try:
-            generate_speech_with_gemini_tts(INTRO_SCRIPT, str(temp_speech))
-        except Exception as e:
-            print(f"⚠️ Gemini TTS エラー: {e}")
-            print("   Edge TTS にフォールバック...")
-
+        speech = None
+        for engine, config in TTS_ENGINES.items():
             try:
-                generate_speech_with_edge_tts(INTRO_SCRIPT, str(temp_speech))
-            except Exception as e2:
-                print(f"⚠️ Edge TTS エラー: {e2}")
-                print("   gTTS にフォールバック...")
-
-                try:
-                    generate_speech_with_gtts(INTRO_SCRIPT, str(temp_speech))
-                except Exception as e3:
-                    print(f"❌ gTTS エラー: {e3}")
-                    print()
-                    print(
-                        "音声生成に失敗しました。以下のパッケージをインストールしてください:"
-                    )
-                    print("  pip install google-genai pydub")
-                    print("  または")
-                    print("  pip install edge-tts pydub")
-                    sys.exit(1)
+                speech = generate_speech(INTRO_SCRIPT, engine, str(temp_speech))
+                break
+            except Exception as e:
+                print(f"⚠️ {config['label']} エラー: {e}")
+
+        if speech is None:
+            print()
+            print("音声生成に失敗しました。以下のパッケージをインストールしてください:")
+            print("  pip install google-genai pydub")
+            print("  または")
+            print("  pip install edge-tts pydub")
+            sys.exit(1)
 
         # BGM と合成
         mix_with_bgm(
             speech_path=str(temp_speech),
             bgm_path=str(BGM_PATH),
             output_path=str(OUTPUT_PATH),
-            bgm_volume=0.15,
+            bgm_volume=BGM_VOLUME,
         )
 
+    # サイドカーに MP3 の実際の長さと再生成判定用のハッシュを記録
+    metadata = {
+        **speech,
+        "duration": probe_duration(OUTPUT_PATH),
+        "speech_duration": speech["duration"],
+        "bgm_sha256": bgm_sha256,
+        "bgm_volume": BGM_VOLUME,
+    }
+    with open(METADATA_PATH, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+
     print()
     print("=" * 60)
     print("🎉 イントロ音声の生成が完了しました！")
     print(f"   出力ファイル: {OUTPUT_PATH}")
+    print(f"   イントロの長さ: {metadata['duration']}秒（{METADATA_PATH.name}）")
+    if usage_tracker.calls:
+        print("   API 使用量:")
+        usage_tracker.print_summary()
     print("=" * 60)
 
 
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+FFmpeg の機能（エンコーダー・フィルタ・バージョン）の検出モジュール
+`ffmpeg -version` / `-encoders` / `-filters` を1度だけ実行し、結果を
+バイナリのパスと更新時刻をキーにディスクへ保存します。
+AudioMixer / VideoGenerator はこの結果から使用するコーデックを選びます。
+"""
+
+import os
+import json
+import shutil
+import threading
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+CACHE_PATH = Path(__file__).parent / "cache" / "ffmpeg_capabilities.json"
+
+# プロセス内のキャッシュ（(パス, 更新時刻, サイズ) → FFmpegCapabilities）
+_memo: Dict[tuple, "FFmpegCapabilities"] = {}
+_memo_lock = threading.Lock()
+
+
+class FFmpegCapabilities:
+    """検出した FFmpeg の機能と、それに応じたエンコード引数"""
+
+    # MP3 エンコーダーの優先順（エンコーダー名 → 品質指定の引数）
+    MP3_ENCODERS = [
+        ("libmp3lame", ["-q:a", "2"]),
+        ("libshine", ["-b:a", "192k"]),
+        ("mp3_mf", ["-b:a", "192k"]),
+    ]
+
+    # H.264 が使えない場合も含めた映像エンコーダーの優先順（すべてソフトウェア）
+    VIDEO_ENCODERS = [
+        ("libx264", ["-tune", "stillimage"]),
+        ("libopenh264", ["-b:v", "2M"]),
+        ("mpeg4", ["-q:v", "3"]),
+    ]
+
+    # 音量の正規化フィルタの優先順
+    LOUDNESS_FILTERS = ["loudnorm", "dynaudnorm"]
+
+    def __init__(
+        self,
+        binary: str,
+        version: str,
+        encoders: List[str],
+        filters: List[str],
+    ):
+        """
+        Args:
+            binary: ffmpeg バイナリのパス
+            version: バージョン（`ffmpeg -version` の1行目）
+            encoders: 利用可能なエンコーダー名
+            filters: 利用可能なフィルタ名
+        """
+        self.binary = binary
+        self.version = version
+        self.encoders = set(encoders)
+        self.filters = set(filters)
+
+    def has_encoder(self, name: str) -> bool:
+        return name in self.encoders
+
+    def has_filter(self, name: str) -> bool:
+        return name in self.filters
+
+    def mp3_codec_args(self) -> List[str]:
+        """MP3 出力の `-c:a` 引数（libmp3lame を優先）"""
+        for name, quality in self.MP3_ENCODERS:
+            if self.has_encoder(name):
+                return ["-c:a", name, *quality]
+        raise RuntimeError("FFmpeg に MP3 エンコーダーがありません")
+
+    def video_codec_args(self) -> List[str]:
+        """静止画クリップの `-c:v` 引数（libx264 を優先）"""
+        for name, options in self.VIDEO_ENCODERS:
+            if self.has_encoder(name):
+                return ["-c:v", name, *options]
+        raise RuntimeError("FFmpeg に利用できる映像エンコーダーがありません")
+
+    def aac_codec_args(self) -> List[str]:
+        """AAC 出力の `-c:a` 引数（FFmpeg 内蔵のエンコーダー）"""
+        if not self.has_encoder("aac"):
+            raise RuntimeError("FFmpeg に AAC エンコーダーがありません")
+        return ["-c:a", "aac", "-b:a", "192k"]
+
+    def loudness_filter(self) -> Optional[str]:
+        """音量の正規化フィルタ（どれも無い場合は None）"""
+        for name in self.LOUDNESS_FILTERS:
+            if self.has_filter(name):
+                return name
+        return None
+
+    def to_dict(self) -> dict:
+        return {
+            "binary": self.binary,
+            "version": self.version,
+            "encoders": sorted(self.encoders),
+            "filters": sorted(self.filters),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FFmpegCapabilities":
+        return cls(data["binary"], data["version"], data["encoders"], data["filters"])
+
+
+def parse_encoders(output: str) -> List[str]:
+    """`ffmpeg -encoders` の出力からエンコーダー名を抽出"""
+    names = []
+    in_list = False
+    for line in output.splitlines():
+        if line.strip().startswith("------"):
+            in_list = True
+            continue
+        parts = line.split()
+        if in_list and len(parts) >= 2:
+            names.append(parts[1])
+    return names
+
+
+def parse_filters(output: str) -> List[str]:
+    """`ffmpeg -filters` の出力からフィルタ名を抽出（凡例の行は除外）"""
+    names = []
+    for line in output.splitlines():
+        parts = line.split()
+        # フィルタの行: "T.C loudnorm  A->A  説明"
+        if len(parts) >= 3 and "->" in parts[2]:
+            names.append(parts[1])
+    return names
+
+
+def _run(binary: str, option: str) -> str:
+    result = subprocess.run(
+        [binary, "-hide_banner", option],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError("FFmpeg の実行に失敗しました")
+    return result.stdout
+
+
+def _probe(binary: str) -> FFmpegCapabilities:
+    """ffmpeg を実行して機能を検出"""
+    version_output = _run(binary, "-version")
+    return FFmpegCapabilities(
+        binary=binary,
+        version=(version_output.splitlines() or [""])[0].strip(),
+        encoders=parse_encoders(_run(binary, "-encoders")),
+        filters=parse_filters(_run(binary, "-filters")),
+    )
+
+
+def get_capabilities(
+    binary: str = "ffmpeg", cache_path: Optional[Path] = None
+) -> FFmpegCapabilities:
+    """
+    FFmpeg の機能を取得
+
+    同じバイナリ（パス・更新時刻・サイズが同じ）であれば、プロセス内または
+    ディスクのキャッシュを使い、ffmpeg は実行しません。
+
+    Args:
+        binary: ffmpeg のコマンド名またはパス
+        cache_path: キャッシュの保存先（デフォルト: generator/cache/ffmpeg_capabilities.json）
+
+    Raises:
+        RuntimeError: FFmpeg がインストールされていない・実行できない場合
+    """
+    path = shutil.which(binary)
+    if path is None:
+        raise RuntimeError(
+            "FFmpeg がインストールされていません。インストールしてください。"
+        )
+    path = os.path.realpath(path)
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+
+    with _memo_lock:
+        if key in _memo:
+            return _memo[key]
+
+        cache_path = Path(cache_path or CACHE_PATH)
+        capabilities = _load_cache(cache_path, key)
+        if capabilities is None:
+            capabilities = _probe(path)
+            _save_cache(cache_path, key, capabilities)
+
+        _memo[key] = capabilities
+        return capabilities
+
+
+def _load_cache(cache_path: Path, key: tuple) -> Optional[FFmpegCapabilities]:
+    """キャッシュを取得（別のバイナリ・破損している場合は None）"""
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            entry = json.load(f)
+        if tuple(entry["key"]) != key:
+            return None
+        return FFmpegCapabilities.from_dict(entry["capabilities"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _save_cache(cache_path: Path, key: tuple, capabilities: FFmpegCapabilities) -> None:
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": list(key), "capabilities": capabilities.to_dict()}, f)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        # 書き込めなくても検出結果はそのまま使える
+        print(f"⚠️ FFmpeg の機能のキャッシュを保存できませんでした: {e}")
+
+
+if __name__ == "__main__":
+    capabilities = get_capabilities()
+    print(f"✅ {capabilities.version}")
+    print(f"   バイナリ: {capabilities.binary}")
+    print(f"   エンコーダー: {len(capabilities.encoders)}件 / フィルタ: {len(capabilities.filters)}件")
+    print(f"   MP3: {' '.join(capabilities.mp3_codec_args())}")
+    print(f"   映像: {' '.join(capabilities.video_codec_args())}")
+    print(f"   AAC: {' '.join(capabilities.aac_codec_args())}")
+    print(f"   正規化: {capabilities.loudness_filter()}")
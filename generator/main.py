@@ -11,6 +11,7 @@ import sys
 import json
 import argparse
 from pathlib import Path
+from typing import Optional
 from datetime import datetime
 
 # .env.local を読み込む
@@ -21,14 +22,9 @@ load_dotenv(env_path)
 
 import pytz
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-
-from script_generator import ScriptGenerator
-from audio_generator import get_audio_generator
-from audio_mixer import AudioMixer
-from video_generator import VideoGenerator
-from youtube_uploader import YouTubeUploader
+# firebase_admin・google.genai・googleapiclient や各ステージのモジュールは
+# 読み込みに時間がかかるため、使用する関数・ステップの中で import します
+# （--help やドライランでは不要なモジュールを読み込まない）
 
 
 # 設定
@@ -38,6 +34,9 @@ OUTPUT_DIR = Path(__file__).parent / "output"
 
 def initialize_firebase():
     """Firebase Admin SDK を初期化"""
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+
     if not firebase_admin._apps:
         # GitHub Actions 用: 環境変数から読み込み
         if os.getenv("FIREBASE_SERVICE_ACCOUNT_KEY"):
@@ -54,27 +53,72 @@ def initialize_firebase():
     return firestore.client()
 
 
-def get_selected_news(db, limit: int = 3) -> list:
+# 動画生成で使用する記事のフィールド（並び順の selected_at は取得不要）
+SELECTED_NEWS_FIELDS = [
+    "title",
+    "link",
+    "category",
+    "summary",
+    "cluster_id",
+]
+
+
+def _selected_news_query(db, limit: int):
+    """
+    status='selected' の記事を選択日時の古い順に取得するクエリ
+
+    複合インデックス (status ASC, selected_at ASC) を使用します
+    （firestore.indexes.json 参照）。同時刻はドキュメントIDで順序を確定します。
+    selected_at のない記事は対象外です（管理画面で選択すると設定されます）。
+    """
+    from firebase_admin import firestore
+
+    return (
+        db.collection("news")
+        .where("status", "==", "selected")
+        .order_by("selected_at")
+        .order_by(firestore.FieldPath.document_id())
+        .select(SELECTED_NEWS_FIELDS)
+        .limit(limit)
+    )
+
+
+def _to_news_item(doc) -> dict:
+    """スナップショットを記事の dict に変換"""
+    data = doc.to_dict()
+    data["id"] = doc.id
+    return data
+
+
+def get_selected_news(db, limit: int = 3, auto_select: bool = True) -> list:
     """
     status='selected' のニュース記事を取得
 
+    選択日時の古い順に取得するため、どの記事が使われるかは毎回同じです。
+    選択された記事が limit 件に満たない場合は、NewsRanker で直近の記事から
+    自動選択して補完します（選択済みの記事と同じクラスタの記事は選ばない）。
+
     Args:
         db: Firestore クライアント
         limit: 取得する記事数
+        auto_select: 足りない分を自動選択で補完するか
 
     Returns:
-        ニュース記事のリスト（選択された記事のみ）
+        ニュース記事のリスト（選択された記事 + 自動選択した記事）
     """
-    news_ref = db.collection("news")
-    query = news_ref.where("status", "==", "selected").limit(limit)
+    news_items = [
+        _to_news_item(doc) for doc in _selected_news_query(db, limit).stream()
+    ]
 
-    docs = query.stream()
-    news_items = []
+    if auto_select and len(news_items) < limit:
+        from news_ranker import NewsRanker
 
-    for doc in docs:
-        data = doc.to_dict()
-        data["id"] = doc.id
-        news_items.append(data)
+        ranked = NewsRanker().select(
+            db, limit=limit - len(news_items), exclude=news_items
+        )
+        if ranked:
+            print(f"🤖 選択された記事が不足しているため {len(ranked)}件 を自動選択しました")
+        news_items.extend(ranked)
 
     return news_items
 
@@ -98,10 +142,94 @@ def update_news_status(db, news_ids: list, status: str = "archived"):
     print(f"✅ {len(news_ids)} 件の記事を '{status}' に更新しました")
 
 
+def save_usage_report(db, date_str: str, result: dict):
+    """
+    API 使用量の集計を Firestore（usage_reports コレクション）に保存
+
+    Args:
+        db: Firestore クライアント
+        date_str: エピソードの日付（YYYYMMDD、ドキュメントID）
+        result: generate_and_upload_video の処理結果
+    """
+    from firebase_admin import firestore
+
+    db.collection("usage_reports").document(date_str).set(
+        {
+            "usage": result["usage"],
+            "news_ids": result["news_ids"],
+            "dry_run": result.get("dry_run", False),
+            "video_id": result.get("video_id"),
+            "created_at": firestore.SERVER_TIMESTAMP,
+        }
+    )
+    print(f"✅ API 使用量を保存しました: usage_reports/{date_str}")
+
+
+def generate_script_with_prefetch(
+    script_generator, audio_generator, news_items, **options
+):
+    """
+    スクリプトをストリーミング/分割生成し、完成したニュースブロックの音声を先行生成
+
+    options は ScriptGenerator.generate_script にそのまま渡します（stream, sharded）。
+
+    TTS はバックグラウンドの1スレッドで順番に処理し、スクリプト生成の
+    完了後に先行生成の終了を待ってから返します。再試行などで破棄された
+    ブロックの先行生成は、未着手なら取り消し、実行中なら次の発話の前に中止します。
+    """
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    from script_model import news_block_lines
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    # ニュース番号 → (先行生成の Future, 中止フラグ)
+    prefetches = {}
+
+    def on_news_block(index, block):
+        print(f"   ✅ ニュース {index + 1} の台本が完成 - 音声を先行生成します")
+        cancel = threading.Event()
+        future = executor.submit(
+            audio_generator.prefetch, news_block_lines(block, index), cancel
+        )
+        prefetches[index] = (future, cancel)
+
+    def on_discard_block(index):
+        future, cancel = prefetches.pop(index)
+        cancel.set()
+        future.cancel()
+        print(f"   🗑️ ニュース {index + 1} の台本を破棄 - 音声の先行生成を中止します")
+
+    try:
+        script = script_generator.generate_script(
+            news_items,
+            on_news_block=on_news_block,
+            on_discard_block=on_discard_block,
+            **options,
+        )
+    finally:
+        executor.shutdown(wait=True)
+
+    for future, _ in prefetches.values():
+        try:
+            future.result()
+        except Exception as e:
+            # 先行生成に失敗した発話は音声生成ステップで改めて生成される
+            print(f"   ⚠️ 音声の先行生成に失敗しました: {e}")
+
+    return script
+
+
 def generate_and_upload_video(
     news_items: list,
     dry_run: bool = False,
     use_fallback_tts: bool = False,
+    subtitle_mode: str = "soft",
+    stream_script: bool = False,
+    sharded_script: bool = False,
+    use_script_cache: bool = True,
+    enrich_articles: bool = False,
+    media_backend: Optional[str] = None,
 ) -> dict:
     """
     動画を生成して YouTube にアップロード
@@ -110,6 +238,15 @@ def generate_and_upload_video(
         news_items: ニュース記事のリスト
         dry_run: True の場合はアップロードをスキップ
         use_fallback_tts: True の場合は Google Cloud TTS を使用
+        subtitle_mode: 字幕の扱い（"soft": 多重化, "burn": 焼き込み, "none": なし）
+        stream_script: True の場合はスクリプトをストリーミング生成し、
+            完成したニュースブロックから TTS を先行生成する
+        sharded_script: True の場合はニュースごとにスクリプトを並列生成し、
+            完成したニュースブロックから TTS を先行生成する
+        use_script_cache: False の場合は生成済みスクリプトのキャッシュを使わない
+        enrich_articles: True の場合は記事ページから本文を取得してプロンプトに含める
+            （全記事の本文が取れた場合は Google Search Grounding を使わない）
+        media_backend: 音声・動画の処理系（"ffmpeg" / "pyav"、None なら環境変数 MEDIA_BACKEND）
 
     Returns:
         処理結果
@@ -125,22 +262,49 @@ def generate_and_upload_video(
     print("=" * 60)
     print()
 
+    from usage_tracker import UsageTracker
+    from audio_generator import get_audio_generator
+
+    # Gemini API の使用量（トークン数・レイテンシ・リトライ）を記録
+    usage_tracker = UsageTracker()
+
+    # デフォルトでGemini TTS（高品質・感情対応）
+    tts_engine = "edge" if use_fallback_tts else "gemini"
+    audio_generator = get_audio_generator(
+        engine=tts_engine, usage_tracker=usage_tracker
+    )
+
     # 1. スクリプト生成
     print("📝 ステップ 1/5: スクリプト生成...")
-    script_generator = ScriptGenerator()
-    script = script_generator.generate_script(news_items)
+    from script_generator import ScriptGenerator
+    from script_cache import ScriptCache
+
+    if enrich_articles:
+        from article_enricher import ArticleEnricher
+
+        news_items = ArticleEnricher().enrich(news_items)
+        enriched = sum(1 for item in news_items if item.get("body"))
+        print(f"   📄 記事本文を取得しました（{enriched}/{len(news_items)}件）")
+    script_generator = ScriptGenerator(
+        cache=ScriptCache() if use_script_cache else None,
+        usage_tracker=usage_tracker,
+    )
+    script_options = {"stream": stream_script, "sharded": sharded_script}
+    if (stream_script or sharded_script) and hasattr(audio_generator, "prefetch"):
+        script = generate_script_with_prefetch(
+            script_generator, audio_generator, news_items, **script_options
+        )
+    else:
+        script = script_generator.generate_script(news_items, **script_options)
 
     # スクリプトを保存
     script_path = OUTPUT_DIR / f"script_{date_str}.json"
     with open(script_path, "w", encoding="utf-8") as f:
-        json.dump(script, f, ensure_ascii=False, indent=2)
+        json.dump(script.data, f, ensure_ascii=False, indent=2)
     print(f"   スクリプト保存: {script_path}")
 
     # 2. 音声生成
     print("🎙️ ステップ 2/5: 音声生成...")
-    # デフォルトでGemini TTS（高品質・感情対応）
-    tts_engine = "edge" if use_fallback_tts else "gemini"
-    audio_generator = get_audio_generator(engine=tts_engine)
     audio_data = audio_generator.generate_audio(script)
 
     # 一時ファイルに保存
@@ -151,57 +315,110 @@ def generate_and_upload_video(
 
     # 3. 音声編集
     print("🎚️ ステップ 3/5: 音声編集...")
-    audio_mixer = AudioMixer()
+    from audio_mixer import AudioMixer
 
-    # MP3 に変換
-    main_audio_path = OUTPUT_DIR / f"main_audio_{date_str}.mp3"
-    audio_mixer.convert_to_mp3(str(temp_audio_path), str(main_audio_path))
+    audio_mixer = AudioMixer(backend=media_backend)
+    normalized_audio_path = OUTPUT_DIR / f"normalized_audio_{date_str}.mp3"
 
-    # ニュースセクションにBGMを追加（イントロと同じ音量 0.15）
+    # ニュースセクションの BGM（イントロと同じ音量 0.15）
     bgm_news_path = audio_mixer.assets_dir / "bgm" / "bgm_news.mp3"
-    if bgm_news_path.exists():
-        main_with_bgm_path = OUTPUT_DIR / f"main_with_bgm_{date_str}.mp3"
-        audio_mixer.add_background_music(
-            speech_path=str(main_audio_path),
-            bgm_path=str(bgm_news_path),
-            output_path=str(main_with_bgm_path),
-            bgm_volume=0.15,  # イントロと同じ音量
+    if not bgm_news_path.exists():
+        print(f"   ⚠️ BGMファイルが見つかりません: {bgm_news_path}")
+        bgm_news_path = None
+
+    if audio_mixer.engine is not None:
+        # PyAV: TTS で結合した PCM を直接受け取り、BGM 追加・イントロ結合・正規化を1パスで処理
+        speech = audio_generator.pcm
+        audio_mixer.render_final_audio(
+            speech=speech if speech is not None else str(temp_audio_path),
+            output_path=str(normalized_audio_path),
+            bgm_path=str(bgm_news_path) if bgm_news_path else None,
+            bgm_volume=0.15,
         )
-        print(f"   BGM追加: {bgm_news_path.name}")
-        main_audio_for_mix = str(main_with_bgm_path)
+        print("   PyAV で BGM 追加・イントロ結合・正規化を1パスで実行")
     else:
-        print(f"   ⚠️ BGMファイルが見つかりません: {bgm_news_path}")
+        # MP3 に変換
+        main_audio_path = OUTPUT_DIR / f"main_audio_{date_str}.mp3"
+        audio_mixer.convert_to_mp3(str(temp_audio_path), str(main_audio_path))
         main_audio_for_mix = str(main_audio_path)
 
-    # イントロと結合
-    final_audio_path = OUTPUT_DIR / f"final_audio_{date_str}.mp3"
-    audio_mixer.mix_audio(main_audio_for_mix, str(final_audio_path))
+        # ニュースセクションにBGMを追加
+        if bgm_news_path:
+            main_with_bgm_path = OUTPUT_DIR / f"main_with_bgm_{date_str}.mp3"
+            audio_mixer.add_background_music(
+                speech_path=str(main_audio_path),
+                bgm_path=str(bgm_news_path),
+                output_path=str(main_with_bgm_path),
+                bgm_volume=0.15,  # イントロと同じ音量
+            )
+            print(f"   BGM追加: {bgm_news_path.name}")
+            main_audio_for_mix = str(main_with_bgm_path)
+
+        # イントロと結合
+        final_audio_path = OUTPUT_DIR / f"final_audio_{date_str}.mp3"
+        audio_mixer.mix_audio(main_audio_for_mix, str(final_audio_path))
 
-    # 正規化
-    normalized_audio_path = OUTPUT_DIR / f"normalized_audio_{date_str}.mp3"
-    audio_mixer.normalize_audio(str(final_audio_path), str(normalized_audio_path))
+        # 正規化
+        audio_mixer.normalize_audio(str(final_audio_path), str(normalized_audio_path))
     print(f"   最終音声: {normalized_audio_path}")
 
+    # タイムライン（イントロ終了・各ニュースの区間・アウトロ開始）を出力
+    timeline = None
+    if audio_generator.timing is not None:
+        timeline_path = OUTPUT_DIR / f"timeline_{date_str}.json"
+        timeline = audio_mixer.build_timeline(
+            audio_generator.timing, output_path=str(timeline_path)
+        )
+        print(f"   タイムライン: {timeline_path}")
+
+    # 字幕（SRT / WebVTT）をタイムラインから生成
+    subtitles_path = None
+    if timeline is not None and subtitle_mode != "none":
+        from subtitle_generator import SubtitleGenerator
+
+        subtitles_path = OUTPUT_DIR / f"subtitles_{date_str}.srt"
+        SubtitleGenerator().generate(
+            timeline,
+            srt_path=str(subtitles_path),
+            vtt_path=str(OUTPUT_DIR / f"subtitles_{date_str}.vtt"),
+        )
+        print(f"   字幕: {subtitles_path}")
+
     # 4. 動画生成
     print("🎬 ステップ 4/5: 動画生成...")
-    video_generator = VideoGenerator()
+    from video_generator import VideoGenerator
+
+    video_generator = VideoGenerator(backend=media_backend)
 
     topics = [item["title"] for item in news_items]
     video_path = OUTPUT_DIR / f"newscast_{date_str}.mp4"
+    video_720p_path = OUTPUT_DIR / f"newscast_{date_str}_720p.mp4"
 
-    video_generator.generate_video(
+    # 1080p（アップロード用）と 720p（低帯域向け）を1回のエンコードで生成
+    video_generator.generate_video_variants(
         audio_path=str(normalized_audio_path),
-        output_path=str(video_path),
+        outputs={
+            "1080p": str(video_path),
+            "720p": str(video_720p_path),
+        },
         title="NewsCast",
         topics=topics,
-        script=script,
+        timeline=timeline,
+        categories=[item["category"] for item in news_items],
+        subtitles_path=str(subtitles_path) if subtitles_path else None,
+        burn_subtitles=subtitle_mode == "burn",
     )
     print(f"   動画保存: {video_path}")
+    print(f"   720p 版: {video_720p_path}")
 
-    # サムネイル生成
+    # サムネイル生成（YouTube 用 + 正方形 + Shorts 用）
     thumbnail_path = OUTPUT_DIR / f"thumbnail_{date_str}.jpg"
-    video_generator.generate_thumbnail(
-        output_path=str(thumbnail_path),
+    thumbnail_variants = video_generator.generate_thumbnail_variants(
+        outputs={
+            "landscape": str(thumbnail_path),
+            "square": str(OUTPUT_DIR / f"thumbnail_{date_str}_square.jpg"),
+            "shorts": str(OUTPUT_DIR / f"thumbnail_{date_str}_shorts.jpg"),
+        },
         title="NewsCast",
         topics=topics,
     )
@@ -210,8 +427,11 @@ def generate_and_upload_video(
     # 5. YouTube アップロード
     result = {
         "video_path": str(video_path),
+        "video_720p_path": str(video_720p_path),
         "thumbnail_path": str(thumbnail_path),
+        "thumbnail_variants": thumbnail_variants,
         "script_path": str(script_path),
+        "subtitles_path": str(subtitles_path) if subtitles_path else None,
         "topics": topics,
         "news_ids": [item["id"] for item in news_items],
     }
@@ -221,10 +441,14 @@ def generate_and_upload_video(
         result["dry_run"] = True
     else:
         print("📤 ステップ 5/5: YouTube アップロード...")
+        from youtube_uploader import YouTubeUploader
+
         uploader = YouTubeUploader()
 
         title = uploader.generate_video_title(topics, now)
-        description = uploader.generate_video_description(topics, now)
+        description = uploader.generate_video_description(
+            topics, now, vocabulary=script.vocabulary(), timeline=timeline
+        )
 
         upload_result = uploader.upload_video(
             video_path=str(video_path),
@@ -239,11 +463,21 @@ def generate_and_upload_video(
                 "NewsCast",
             ],
             thumbnail_path=str(thumbnail_path),
+            caption_path=str(subtitles_path) if subtitles_path else None,
         )
 
         result["video_id"] = upload_result["video_id"]
         result["video_url"] = upload_result["url"]
 
+    # 実行レポート（処理結果 + API 使用量）を出力
+    report_path = OUTPUT_DIR / f"run_report_{date_str}.json"
+    result["usage"] = usage_tracker.summary()
+    result["date"] = date_str
+    result["report_path"] = str(report_path)
+    usage_tracker.write_report(str(report_path), extra=result)
+    print(f"📊 API 使用量（レポート: {report_path}）:")
+    usage_tracker.print_summary()
+
     print()
     print("=" * 60)
     print("🎉 処理完了！")
@@ -265,6 +499,48 @@ def main():
         action="store_true",
         help="Edge TTS を使用（Gemini TTS の代わりに無料の Edge TTS を使う場合）",
     )
+    parser.add_argument(
+        "--subtitles",
+        choices=["soft", "burn", "none"],
+        default="soft",
+        help="字幕の扱い（soft: 字幕トラックとして多重化, burn: 映像に焼き込み, none: なし）",
+    )
+    parser.add_argument(
+        "--stream-script",
+        action="store_true",
+        help="スクリプトをストリーミング生成し、完成したニュースから音声を先行生成",
+    )
+    parser.add_argument(
+        "--sharded-script",
+        action="store_true",
+        help="ニュースごとにスクリプトを並列生成（失敗したニュースだけ再試行）",
+    )
+    parser.add_argument(
+        "--no-script-cache",
+        action="store_true",
+        help="生成済みスクリプトのキャッシュを使わずに Gemini で生成し直す",
+    )
+    parser.add_argument(
+        "--enrich-articles",
+        action="store_true",
+        help="記事ページから本文を取得してプロンプトに含める（取得できれば Grounding を省略）",
+    )
+    parser.add_argument(
+        "--media-backend",
+        choices=["ffmpeg", "pyav"],
+        default=None,
+        help="音声・動画の処理系（デフォルト: 環境変数 MEDIA_BACKEND、未設定なら ffmpeg）",
+    )
+    parser.add_argument(
+        "--record-usage",
+        action="store_true",
+        help="API 使用量の集計を Firestore（usage_reports）に保存",
+    )
+    parser.add_argument(
+        "--no-auto-select",
+        action="store_true",
+        help="選択された記事が足りない場合に自動選択で補完しない",
+    )
     parser.add_argument(
         "--skip-status-update",
         action="store_true",
@@ -282,7 +558,7 @@ def main():
 
         # 選択された記事を取得
         print("📰 選択された記事を取得中...")
-        news_items = get_selected_news(db)
+        news_items = get_selected_news(db, auto_select=not args.no_auto_select)
 
         if len(news_items) == 0:
             print("📭 選択された記事がありません。動画生成をスキップします。")
@@ -303,12 +579,22 @@ def main():
             news_items,
             dry_run=args.dry_run,
             use_fallback_tts=args.use_fallback_tts,
+            subtitle_mode=args.subtitles,
+            stream_script=args.stream_script,
+            sharded_script=args.sharded_script,
+            use_script_cache=not args.no_script_cache,
+            enrich_articles=args.enrich_articles,
+            media_backend=args.media_backend,
         )
 
         # 記事ステータスを更新
         if not args.skip_status_update and not args.dry_run:
             update_news_status(db, result["news_ids"], "archived")
 
+        # API 使用量を保存
+        if args.record_usage:
+            save_usage_report(db, result["date"], result)
+
         # 結果を表示
         print()
         print("📊 処理結果:")
@@ -0,0 +1,562 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+PyAV によるプロセス内のメディアエンジン
+AudioMixer / VideoGenerator の代替バックエンドとして、ffmpeg を子プロセスで
+起動せずに libav（PyAV）でデコード・フィルタ・エンコードを行います。
+TTS で結合した PCM をそのまま受け取れるため、中間ファイルを作りません。
+
+バックエンドは引数または環境変数 MEDIA_BACKEND（ffmpeg / pyav）で選択します。
+PyAV が無い場合や未対応の処理（字幕の多重化・焼き込みなど）は ffmpeg CLI を使います。
+"""
+
+import os
+import wave
+import importlib.util
+from contextlib import ExitStack
+from fractions import Fraction
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+
+BACKENDS = ("ffmpeg", "pyav")
+
+
+class PcmAudio:
+    """インターリーブ形式の PCM 音声（属性名は pydub.AudioSegment と同じ）"""
+
+    def __init__(
+        self,
+        raw_data: bytes,
+        frame_rate: int,
+        channels: int = 1,
+        sample_width: int = 2,
+    ):
+        """
+        Args:
+            raw_data: PCM データ
+            frame_rate: サンプルレート（Hz）
+            channels: チャンネル数（1 または 2）
+            sample_width: 1サンプルのバイト数（1, 2, 4）
+        """
+        self.raw_data = raw_data
+        self.frame_rate = frame_rate
+        self.channels = channels
+        self.sample_width = sample_width
+
+    @property
+    def duration(self) -> float:
+        """長さ（秒）"""
+        return len(self.raw_data) / (self.frame_rate * self.channels * self.sample_width)
+
+
+# 音声の入力: ファイルのパス、または PCM（PcmAudio / pydub.AudioSegment）
+AudioInput = Union[str, Path, PcmAudio]
+
+
+def write_wav(pcm: PcmAudio, output_path: str) -> str:
+    """PCM を WAV ファイルに書き出す（ffmpeg CLI に渡す場合に使用）"""
+    with wave.open(str(output_path), "wb") as f:
+        f.setnchannels(pcm.channels)
+        f.setsampwidth(pcm.sample_width)
+        f.setframerate(pcm.frame_rate)
+        f.writeframes(pcm.raw_data)
+    return str(output_path)
+
+
+def get_media_engine(backend: Optional[str] = None) -> Optional["PyAVEngine"]:
+    """
+    選択されたバックエンドのエンジンを取得
+
+    Args:
+        backend: "ffmpeg" または "pyav"（None なら環境変数 MEDIA_BACKEND、未設定なら ffmpeg）
+
+    Returns:
+        PyAVEngine（ffmpeg CLI を使う場合・PyAV が無い場合は None）
+    """
+    backend = (backend or os.environ.get("MEDIA_BACKEND") or "ffmpeg").lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"未知のメディアバックエンド: {backend}")
+    if backend == "ffmpeg":
+        return None
+
+    # av の import は重い（約0.1秒）ため、存在確認だけ先に行う
+    if importlib.util.find_spec("av") is None:
+        print("⚠️ PyAV がインストールされていないため ffmpeg CLI を使用します: pip install av")
+        return None
+    return PyAVEngine()
+
+
+class PyAVEngine:
+    """PyAV（libav）で音声・動画をプロセス内で処理するクラス"""
+
+    # エンジン内で扱う音声のサンプル形式（チャンネル数・サンプルレートは本編音声に合わせる）
+    SAMPLE_FORMAT = "fltp"
+
+    # 正規化後のサンプルレート（ffmpeg CLI で loudnorm の出力を MP3 にした場合と同じ）
+    NORMALIZED_SAMPLE_RATE = 48000
+
+    # 出力音声のビットレート（AAC・libshine。ffmpeg CLI の -b:a 192k と同じ）
+    AUDIO_BIT_RATE = 192_000
+
+    # libmp3lame の VBR 品質（ffmpeg CLI の -q:a 2 と同じ）
+    MP3_QUALITY = 2
+    FF_QP2LAMBDA = 118
+
+    # PCM を AudioFrame に分割する単位（サンプル数）
+    PCM_FRAME_SAMPLES = 4096
+
+    # sample_width → PCM のサンプル形式
+    PCM_FORMATS = {1: "u8", 2: "s16", 4: "s32"}
+
+    # エンコーダーの優先順（libav に含まれるものを使用）
+    MP3_ENCODERS = ["libmp3lame", "libshine"]
+    VIDEO_ENCODERS = [
+        ("libx264", {"tune": "stillimage"}),
+        ("libopenh264", {}),
+        ("mpeg4", {"qscale": "3"}),
+    ]
+
+    def __init__(self):
+        import av
+
+        available = av.codecs_available
+        self.mp3_codec = next((c for c in self.MP3_ENCODERS if c in available), None)
+        self.video_codec, self.video_options = next(
+            ((c, o) for c, o in self.VIDEO_ENCODERS if c in available), (None, {})
+        )
+        if self.mp3_codec is None or self.video_codec is None:
+            raise RuntimeError("PyAV に必要なエンコーダー（MP3 / H.264）がありません")
+
+    # ------------------------------------------------------------------
+    # 音声
+    # ------------------------------------------------------------------
+
+    def render_audio(
+        self,
+        output_path: str,
+        speech: AudioInput,
+        intro: Optional[AudioInput] = None,
+        bgm: Optional[AudioInput] = None,
+        bgm_volume: float = 0.1,
+        normalize: bool = False,
+    ) -> str:
+        """
+        本編音声に BGM を重ね、イントロを前に結合し、正規化して MP3 で出力
+
+        フィルタグラフ（AudioMixer の各ステップと同じフィルタ）:
+            speech ─┐
+            bgm ─ volume ─ amix ─┐
+                       intro ─ concat ─ loudnorm ─ 出力
+        全ての処理を1回のデコード・エンコードで行います。
+        出力のチャンネル数・サンプルレートは ffmpeg CLI の処理と同じく本編音声に
+        合わせます（TTS の音声ならモノラル。正規化した場合は 48kHz）。
+
+        Args:
+            output_path: 出力ファイル（MP3）のパス
+            speech: 本編音声（パスまたは PCM）
+            intro: 前に結合する音声
+            bgm: 本編の長さまでループして重ねる BGM
+            bgm_volume: BGM の音量（0.0〜1.0）
+            normalize: loudnorm で正規化するかどうか
+
+        Returns:
+            出力ファイルのパス
+        """
+        import av
+
+        graph = av.filter.Graph()
+        speech_frames = self._retime(self._audio_frames(speech))
+        speech_source, first_speech = self._add_source(graph, speech_frames)
+        layout = first_speech.layout.name
+        sample_rate = first_speech.sample_rate
+        common_format = self._common_format(layout, sample_rate)
+        node = self._chain(graph, speech_source, common_format)
+
+        bgm_source = bgm_frames = None
+        if bgm is not None:
+            bgm_frames = self._retime(self._loop(bgm))
+            bgm_source, first_bgm = self._add_source(graph, bgm_frames)
+            bgm_node = self._chain(
+                graph, bgm_source, common_format, ("volume", str(bgm_volume))
+            )
+            amix = graph.add("amix", "inputs=2:duration=first:dropout_transition=3")
+            node.link_to(amix, 0, 0)
+            bgm_node.link_to(amix, 0, 1)
+            node = amix
+
+        intro_source = intro_frames = None
+        if intro is not None:
+            intro_frames = self._retime(self._audio_frames(intro))
+            intro_source, first_intro = self._add_source(graph, intro_frames)
+            intro_node = self._chain(graph, intro_source, common_format)
+            concat = graph.add("concat", "n=2:v=0:a=1")
+            intro_node.link_to(concat, 0, 0)
+            node.link_to(concat, 0, 1)
+            node = concat
+
+        if normalize:
+            # loudnorm は 192kHz で出力するため、CLI 版と同じ 48kHz に変換する
+            sample_rate = self.NORMALIZED_SAMPLE_RATE
+            node = self._chain(graph, node, ("loudnorm", None))
+        sample_rate = self._encoder_rate(self.mp3_codec, sample_rate)
+        node = self._chain(graph, node, self._common_format(layout, sample_rate))
+
+        sink = graph.add("abuffersink")
+        node.link_to(sink)
+        graph.configure()
+
+        with av.open(str(output_path), "w") as output:
+            stream = output.add_stream(self.mp3_codec, rate=sample_rate, layout=layout)
+            if self.mp3_codec == "libmp3lame":
+                stream.codec_context.qscale = True
+                stream.codec_context.global_quality = self.MP3_QUALITY * self.FF_QP2LAMBDA
+            else:
+                stream.bit_rate = self.AUDIO_BIT_RATE
+
+            def drain():
+                for frame in self._pull(sink):
+                    frame.pts = None
+                    output.mux(stream.encode(frame))
+
+            # concat はイントロの終端まで本編を読まないため、イントロを先に流す
+            if intro_source is not None:
+                intro_source.push(first_intro)
+                for frame in intro_frames:
+                    intro_source.push(frame)
+                    drain()
+                intro_source.push(None)
+
+            # 本編と BGM は amix の入力が偏らないよう時刻順に交互に流す
+            speech_source.push(first_speech)
+            speech_time = first_speech.time + first_speech.samples / first_speech.sample_rate
+            bgm_time = 0.0
+            if bgm_source is not None:
+                bgm_source.push(first_bgm)
+                bgm_time = first_bgm.samples / first_bgm.sample_rate
+
+            for frame in speech_frames:
+                speech_source.push(frame)
+                speech_time = frame.time + frame.samples / frame.sample_rate
+                while bgm_source is not None and bgm_time < speech_time:
+                    bgm_frame = next(bgm_frames)
+                    bgm_source.push(bgm_frame)
+                    bgm_time = bgm_frame.time + bgm_frame.samples / bgm_frame.sample_rate
+                drain()
+
+            speech_source.push(None)
+            if bgm_source is not None:
+                bgm_source.push(None)
+            drain()
+            output.mux(stream.encode(None))
+
+        return str(output_path)
+
+    def get_duration(self, path: str) -> float:
+        """メディアファイルの長さ（秒）"""
+        import av
+
+        with av.open(str(path)) as container:
+            if container.duration is not None:
+                return container.duration / av.time_base
+            stream = container.streams[0]
+            return float(stream.duration * stream.time_base)
+
+    def _audio_frames(self, source: AudioInput) -> Iterator:
+        """音声の入力（パスまたは PCM）を AudioFrame に変換"""
+        import av
+
+        if isinstance(source, (str, Path)):
+            with av.open(str(source)) as container:
+                yield from container.decode(audio=0)
+            return
+
+        sample_format = self.PCM_FORMATS[source.sample_width]
+        layout = "mono" if source.channels == 1 else "stereo"
+        bytes_per_sample = source.channels * source.sample_width
+        step = self.PCM_FRAME_SAMPLES * bytes_per_sample
+        data = memoryview(source.raw_data)
+
+        for offset in range(0, len(data) - bytes_per_sample + 1, step):
+            samples = min(self.PCM_FRAME_SAMPLES, (len(data) - offset) // bytes_per_sample)
+            frame = av.AudioFrame(format=sample_format, layout=layout, samples=samples)
+            frame.planes[0].update(data[offset : offset + samples * bytes_per_sample])
+            frame.sample_rate = source.frame_rate
+            yield frame
+
+    def _loop(self, source: AudioInput) -> Iterator:
+        """音声を無限にループ（BGM 用）"""
+        while True:
+            empty = True
+            for frame in self._audio_frames(source):
+                empty = False
+                yield frame
+            if empty:
+                return
+
+    def _retime(self, frames: Iterator) -> Iterator:
+        """タイムスタンプをサンプル数の連番に振り直す（ループ時に時刻が戻らないように）"""
+        position = 0
+        for frame in frames:
+            frame.pts = position
+            frame.time_base = Fraction(1, frame.sample_rate)
+            position += frame.samples
+            yield frame
+
+    def _add_source(self, graph, frames: Iterator) -> tuple:
+        """最初のフレームの形式で abuffer を追加（(abuffer, 最初のフレーム) を返す）"""
+        first = next(frames, None)
+        if first is None:
+            raise RuntimeError("音声が空です")
+        source = graph.add_abuffer(
+            format=first.format.name,
+            sample_rate=first.sample_rate,
+            layout=first.layout.name,
+            time_base=Fraction(1, first.sample_rate),
+        )
+        return source, first
+
+    def _encoder_rate(self, codec: str, sample_rate: int) -> int:
+        """エンコーダーが対応するサンプルレートのうち最も近いもの（ffmpeg CLI と同様）"""
+        import av
+
+        rates = av.Codec(codec, "w").audio_rates
+        if not rates or sample_rate in rates:
+            return sample_rate
+        return min(rates, key=lambda rate: abs(rate - sample_rate))
+
+    def _common_format(self, layout: str, sample_rate: int) -> tuple:
+        return (
+            "aformat",
+            f"sample_fmts={self.SAMPLE_FORMAT}:sample_rates={sample_rate}"
+            f":channel_layouts={layout}",
+        )
+
+    def _chain(self, graph, node, *filters: tuple):
+        """(フィルタ名, 引数) を順に連結し、最後のフィルタを返す"""
+        for name, args in filters:
+            next_node = graph.add(name, args)
+            node.link_to(next_node)
+            node = next_node
+        return node
+
+    def _pull(self, sink) -> Iterator:
+        """フィルタグラフから取り出せるフレームを全て取得"""
+        while True:
+            try:
+                yield sink.pull()
+            except (BlockingIOError, EOFError):
+                return
+
+    # ------------------------------------------------------------------
+    # 動画
+    # ------------------------------------------------------------------
+
+    def encode_still_clip(
+        self,
+        image: Path,
+        output_path: str,
+        seconds: float,
+        size: Tuple[int, int],
+        fps: int,
+    ) -> str:
+        """
+        静止画から指定の長さのクリップをエンコード
+
+        画像のデコード・リサイズは1度だけ行い、同じフレームを繰り返しエンコードします。
+        フィルタは VideoGenerator._fit_filter と同じ（アスペクト比を保ってパディング）です。
+
+        Args:
+            image: 画像のパス
+            output_path: 出力ファイル（MP4）のパス
+            seconds: 長さ（秒）
+            size: (幅, 高さ)
+            fps: フレームレート
+
+        Returns:
+            出力ファイルのパス
+        """
+        import av
+
+        width, height = size
+        with av.open(str(image)) as container:
+            source_frame = next(container.decode(video=0))
+
+        graph = av.filter.Graph()
+        node = graph.add_buffer(
+            width=source_frame.width,
+            height=source_frame.height,
+            format=source_frame.format.name,
+            time_base=Fraction(1, fps),
+        )
+        sink = graph.add("buffersink")
+        self._chain(
+            graph,
+            node,
+            ("scale", f"{width}:{height}:force_original_aspect_ratio=decrease"),
+            ("pad", f"{width}:{height}:(ow-iw)/2:(oh-ih)/2"),
+            ("setsar", "1"),
+            ("format", "yuv420p"),
+        ).link_to(sink)
+        graph.configure()
+        node.push(source_frame)
+        frame = sink.pull()
+        # 画像のデコード結果はキーフレーム（I）扱いのままのため、そのままでは
+        # 全フレームがキーフレームになる。フレームの種類はエンコーダーに任せる
+        frame.pict_type = av.video.frame.PictureType.NONE
+        frame.key_frame = False
+
+        with av.open(str(output_path), "w", format="mp4") as output:
+            stream = output.add_stream(
+                self.video_codec, rate=fps, options=dict(self.video_options)
+            )
+            stream.width = width
+            stream.height = height
+            stream.pix_fmt = "yuv420p"
+            stream.codec_context.max_b_frames = 0
+            stream.codec_context.time_base = Fraction(1, fps)
+            # CLI 版の -video_track_timescale と同じ精度のタイムベース
+            stream.time_base = Fraction(1, fps * 512)
+
+            for index in range(round(seconds * fps)):
+                frame.pts = index
+                frame.time_base = Fraction(1, fps)
+                output.mux(stream.encode(frame))
+            output.mux(stream.encode(None))
+
+        return str(output_path)
+
+    def mux_clips(
+        self,
+        outputs: Dict[str, List[Tuple[Path, Fraction]]],
+        audio_path: str,
+        duration: float,
+    ) -> None:
+        """
+        各レンディションのクリップの映像をストリームコピーで連結し、音声を AAC で多重化
+
+        concat demuxer と同じく、各クリップは指定の長さ（outpoint）で打ち切り、
+        タイムスタンプをずらして連結します。音声のデコード・エンコードは1度だけ行い、
+        同じパケットを全ての出力に時刻順で書き込みます。AAC のチャンネル数・
+        サンプルレートは ffmpeg CLI と同じく入力の音声のままです。
+
+        Args:
+            outputs: 出力ファイル（MP4）のパス → (クリップのパス, 使用する長さ（秒）) のリスト
+            audio_path: 音声ファイルのパス
+            duration: 動画の長さ（秒）
+        """
+        import av
+
+        with av.open(str(audio_path)) as source:
+            source_audio = source.streams.audio[0].codec_context
+            layout, sample_rate = source_audio.layout.name, source_audio.sample_rate
+
+        with ExitStack() as stack:
+            targets = []
+            for output_path, clips in outputs.items():
+                output = stack.enter_context(
+                    av.open(
+                        str(output_path),
+                        "w",
+                        format="mp4",
+                        options={"movflags": "+faststart"},
+                    )
+                )
+                with av.open(str(clips[0][0])) as first:
+                    video_stream = output.add_stream_from_template(first.streams.video[0])
+                # 全ての出力で同じ設定の AAC ストリーム（エンコードは先頭の出力でのみ行う）
+                audio_stream = output.add_stream("aac", rate=sample_rate, layout=layout)
+                audio_stream.bit_rate = self.AUDIO_BIT_RATE
+                video_packets = self._clip_packets(clips, duration)
+                targets.append(
+                    [output, video_stream, audio_stream, video_packets, next(video_packets, None)]
+                )
+
+            def mux_video_until(limit):
+                for target in targets:
+                    output, video_stream, _, video_packets, video = target
+                    while video is not None and (
+                        limit is None or video.dts * video.time_base <= limit
+                    ):
+                        video.stream = video_stream
+                        output.mux(video)
+                        video = next(video_packets, None)
+                    target[4] = video
+
+            for audio in self._encode_audio(audio_path, targets[0][2], duration):
+                mux_video_until(audio.dts * audio.time_base)
+                # mux はパケットの中身を引き取るため、他の出力にはコピーを書き込む
+                for output, _, audio_stream, _, _ in targets[1:]:
+                    copy = av.Packet(bytes(audio))
+                    copy.pts, copy.dts = audio.pts, audio.dts
+                    copy.duration = audio.duration
+                    copy.time_base = audio.time_base
+                    copy.stream = audio_stream
+                    output.mux(copy)
+                targets[0][0].mux(audio)
+            mux_video_until(None)
+
+    def _clip_packets(
+        self, clips: List[Tuple[Path, Fraction]], duration: float
+    ) -> Iterator:
+        """クリップの映像パケットを outpoint で打ち切り、時刻をずらして順に返す"""
+        import av
+
+        offset = Fraction(0)
+        for clip, seconds in clips:
+            with av.open(str(clip)) as container:
+                stream = container.streams.video[0]
+                shift = round(offset / stream.time_base)
+                for packet in container.demux(stream):
+                    if packet.dts is None:
+                        continue
+                    start = packet.pts * stream.time_base
+                    if start >= seconds or offset + start >= duration:
+                        break
+                    packet.pts += shift
+                    packet.dts += shift
+                    yield packet
+            offset += seconds
+
+    def _encode_audio(self, audio_path: str, stream, duration: float) -> Iterator:
+        """音声をデコードして出力ストリームのエンコーダーでエンコード（duration 秒まで）"""
+        import av
+
+        # エンコーダーのフレーム長に揃え、タイムスタンプはサンプル数の連番にする
+        sample_rate = stream.codec_context.sample_rate
+        resampler = av.AudioResampler(
+            format=self.SAMPLE_FORMAT,
+            layout=stream.codec_context.layout.name,
+            rate=sample_rate,
+            frame_size=stream.codec_context.frame_size,
+        )
+        limit = round(duration * sample_rate)
+        position = 0
+
+        def encode(frames):
+            nonlocal position
+            for frame in frames:
+                if position >= limit:
+                    return
+                frame.pts = position
+                frame.time_base = Fraction(1, sample_rate)
+                position += frame.samples
+                yield from stream.encode(frame)
+
+        for frame in self._audio_frames(audio_path):
+            frame.pts = None
+            yield from encode(resampler.resample(frame))
+            if position >= limit:
+                break
+        yield from encode(resampler.resample(None))
+        yield from stream.encode(None)
+
+
+if __name__ == "__main__":
+    engine = get_media_engine("pyav")
+    if engine is None:
+        print("⚠️ PyAV エンジンを利用できません")
+    else:
+        print("✅ PyAV エンジンを初期化しました")
+        print(f"   MP3: {engine.mp3_codec} / 映像: {engine.video_codec}")
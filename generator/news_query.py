@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+記事の公開日時（pub_date）による期間指定のクエリ
+「昨日のニュース」「直近24時間の記事」などをインデックス付きのクエリで取得します。
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Tuple
+
+import pytz
+from firebase_admin import firestore
+
+
+# generator パッケージの日本時間は pytz で扱う（main.py・test_upload.py と同じ。
+# Windows でも tzdata なしで動作する）
+JST = pytz.timezone("Asia/Tokyo")
+
+
+def news_window_query(
+    db,
+    start: datetime,
+    end: Optional[datetime] = None,
+    status: Optional[str] = "unread",
+    fields: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+):
+    """
+    公開日時が [start, end) の記事を新しい順に取得するクエリ
+
+    status を指定した場合は複合インデックス (status ASC, pub_date DESC) を、
+    指定しない場合は pub_date の単一フィールドインデックスを使用します
+    （firestore.indexes.json 参照）。
+
+    Args:
+        db: Firestore クライアント
+        start: 期間の開始（この日時を含む）
+        end: 期間の終了（この日時を含まない。None なら現在まで）
+        status: 記事のステータス（None なら全ステータス）
+        fields: 取得するフィールド（None なら全フィールド）
+        limit: 最大件数
+    """
+    query = db.collection("news")
+    if status is not None:
+        query = query.where("status", "==", status)
+
+    query = query.where("pub_date", ">=", start)
+    if end is not None:
+        query = query.where("pub_date", "<", end)
+
+    query = query.order_by("pub_date", direction=firestore.Query.DESCENDING)
+    if fields is not None:
+        query = query.select(fields)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def last_hours_window(
+    hours: float, now: Optional[datetime] = None
+) -> Tuple[datetime, datetime]:
+    """直近 hours 時間の期間 (start, end)"""
+    now = now or datetime.now(timezone.utc)
+    return now - timedelta(hours=hours), now
+
+
+def yesterday_window(now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """日本時間で前日 0時〜当日 0時の期間 (start, end)"""
+    now = (now or datetime.now(timezone.utc)).astimezone(JST)
+    # pytz のタイムゾーンは tzinfo= に渡すと LMT（+09:19）になるため localize を使う
+    midnight = datetime(now.year, now.month, now.day)
+    return JST.localize(midnight - timedelta(days=1)), JST.localize(midnight)
+
+
+def get_news_in_window(
+    db,
+    start: datetime,
+    end: Optional[datetime] = None,
+    status: Optional[str] = "unread",
+    fields: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    公開日時が [start, end) の記事を新しい順に取得
+
+    Returns:
+        記事のリスト（id にドキュメント ID を設定）
+    """
+    news_items = []
+    for doc in news_window_query(db, start, end, status, fields, limit).stream():
+        data = doc.to_dict()
+        data["id"] = doc.id
+        news_items.append(data)
+    return news_items
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+記事の自動選択モジュール
+管理画面で選択された記事が足りない日に、直近の未読記事を
+新しさ・クラスタの大きさ（同じ出来事を報じた記事数）・カテゴリの多様性で
+スコアリングして動画に使う記事を選びます。
+
+収集時に保存した特徴量（pub_date, cluster_id）だけを使うため、
+Firestore へのアクセスはインデックス付きのクエリ1回で済み、
+スコアリングはすべてメモリ上で行います。
+"""
+
+import math
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Iterable
+
+from news_query import get_news_in_window, last_hours_window
+
+
+# スコアリングに使う記事のフィールド
+RANKING_FIELDS = [
+    "title",
+    "link",
+    "category",
+    "categories",
+    "summary",
+    "cluster_id",
+    "pub_date",
+    "created_at",
+]
+
+
+class NewsRanker:
+    """直近の記事をスコアリングして動画に使う記事を選ぶクラス"""
+
+    # 候補にする期間（時間）と最大件数
+    WINDOW_HOURS = 36
+    MAX_CANDIDATES = 500
+
+    # 新しさのスコアが半分になる経過時間（時間）
+    RECENCY_HALF_LIFE_HOURS = 12
+
+    # クラスタの大きさの重み（記事数が2倍になるごとに加算）
+    CLUSTER_WEIGHT = 0.3
+
+    # 同じカテゴリの記事を選ぶたびにスコアに掛ける係数
+    DIVERSITY_PENALTY = 0.5
+
+    def __init__(
+        self,
+        window_hours: float = WINDOW_HOURS,
+        max_candidates: int = MAX_CANDIDATES,
+    ):
+        """
+        Args:
+            window_hours: 候補にする期間（時間）
+            max_candidates: 候補として読み込む最大件数
+        """
+        self.window_hours = window_hours
+        self.max_candidates = max_candidates
+
+    def fetch_candidates(self, db, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        直近に公開された未読記事を取得
+
+        複合インデックス (status ASC, pub_date DESC) を使用します
+        （news_query.news_window_query 参照）。
+        """
+        now = now if now is not None else time.time()
+        start, end = last_hours_window(
+            self.window_hours, datetime.fromtimestamp(now, tz=timezone.utc)
+        )
+        return get_news_in_window(
+            db,
+            start,
+            end,
+            status="unread",
+            fields=RANKING_FIELDS,
+            limit=self.max_candidates,
+        )
+
+    def rank(
+        self,
+        candidates: Iterable[Dict[str, Any]],
+        limit: int = 3,
+        now: Optional[float] = None,
+        exclude_clusters: Iterable[str] = (),
+    ) -> List[Dict[str, Any]]:
+        """
+        候補の記事から上位 limit 件を選ぶ
+
+        同じクラスタの記事からは最もスコアの高い1件だけを候補にし、
+        選んだ記事と同じカテゴリの記事は DIVERSITY_PENALTY だけ減点します。
+
+        Args:
+            candidates: fetch_candidates の記事
+            limit: 選ぶ記事数
+            now: 現在時刻（UNIX 時間）
+            exclude_clusters: 既に選ばれている記事のクラスタ（選ばない）
+
+        Returns:
+            選んだ記事のリスト（score にスコアを設定）
+        """
+        now = now if now is not None else time.time()
+        excluded = set(exclude_clusters)
+        decay = math.log(2) / (self.RECENCY_HALF_LIFE_HOURS * 60 * 60)
+
+        candidates = list(candidates)
+        sizes = Counter(cluster_key(item) for item in candidates)
+
+        # クラスタごとに最もスコアの高い記事を代表にする
+        representatives: Dict[str, Dict[str, Any]] = {}
+        for item in candidates:
+            cluster = cluster_key(item)
+            if cluster in excluded:
+                continue
+
+            age = max(now - published_at(item), 0.0)
+            score = math.exp(-decay * age) + self.CLUSTER_WEIGHT * math.log2(
+                sizes[cluster]
+            )
+
+            current = representatives.get(cluster)
+            if current is None or score > current["score"]:
+                representatives[cluster] = {**item, "score": score}
+
+        # カテゴリの重複を減点しながら貪欲に選ぶ
+        remaining = sorted(
+            representatives.values(), key=lambda item: item["score"], reverse=True
+        )
+        chosen: List[Dict[str, Any]] = []
+        category_counts: Counter = Counter()
+
+        while remaining and len(chosen) < limit:
+            best_index = 0
+            best_score = -1.0
+            for i, item in enumerate(remaining):
+                # 減点なしのスコアがこれまでの最良を下回ったら以降は調べない
+                if item["score"] <= best_score:
+                    break
+                score = item["score"] * (
+                    self.DIVERSITY_PENALTY ** category_counts[item.get("category")]
+                )
+                if score > best_score:
+                    best_index, best_score = i, score
+
+            item = remaining.pop(best_index)
+            item["score"] = round(best_score, 6)
+            category_counts[item.get("category")] += 1
+            chosen.append(item)
+
+        return chosen
+
+    def select(
+        self,
+        db,
+        limit: int = 3,
+        exclude: Iterable[Dict[str, Any]] = (),
+    ) -> List[Dict[str, Any]]:
+        """
+        直近の記事を取得して上位 limit 件を選ぶ
+
+        Args:
+            db: Firestore クライアント
+            limit: 選ぶ記事数
+            exclude: 既に選ばれている記事（同じ記事・同じクラスタは選ばない）
+        """
+        exclude = list(exclude)
+        excluded_ids = {item["id"] for item in exclude}
+        candidates = [
+            item
+            for item in self.fetch_candidates(db)
+            if item["id"] not in excluded_ids
+        ]
+        return self.rank(
+            candidates,
+            limit=limit,
+            exclude_clusters=[cluster_key(item) for item in exclude],
+        )
+
+
+def cluster_key(item: Dict[str, Any]) -> str:
+    """記事のクラスタ（cluster_id がない記事は単独のクラスタ）"""
+    return item.get("cluster_id") or item["id"]
+
+
+def published_at(item: Dict[str, Any]) -> float:
+    """記事の公開時刻（UNIX 時間）。pub_date がない記事は収集時刻を使う"""
+    for field in ["pub_date", "created_at"]:
+        value = item.get(field)
+        if isinstance(value, datetime):
+            return value.timestamp()
+    return 0.0
+
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+スクリプト生成結果のキャッシュ
+同じ記事・同じ生成条件での再実行（ドライラン・ローカル開発）で
+Gemini を呼び直さないよう、生成済みスクリプトをディスクに保存します。
+"""
+
+import os
+import json
+import time
+import hashlib
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+
+class ScriptCache:
+    """生成済みスクリプトを JSON ファイルとして保存するキャッシュ"""
+
+    # 有効期限（秒）: 7日
+    DEFAULT_TTL = 7 * 24 * 60 * 60
+
+    # 保持する最大件数（超えた分は古いものから削除）
+    DEFAULT_MAX_ENTRIES = 50
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        """
+        Args:
+            cache_dir: 保存先（デフォルト: generator/cache/scripts）
+            ttl: 有効期限（秒）
+            max_entries: 保持する最大件数
+        """
+        self.cache_dir = Path(cache_dir or Path(__file__).parent / "cache" / "scripts")
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    def make_key(
+        self,
+        model: str,
+        prompt_version: str,
+        temperature: float,
+        news_items: List[Dict[str, Any]],
+    ) -> str:
+        """
+        生成条件と記事からキャッシュキーを作成
+
+        記事は ID・タイトル・概要・本文のみを使うため、選択日時などが
+        変わっても同じ記事なら同じキーになります。
+        """
+        payload = {
+            "model": model,
+            "prompt_version": prompt_version,
+            "temperature": temperature,
+            "articles": [
+                {
+                    "id": item.get("id"),
+                    "title": item.get("title"),
+                    "summary": item.get("summary"),
+                    # 本文は取得した場合のみ（本文なしのキーは従来と同じ）
+                    **({"body": item["body"]} if item.get("body") else {}),
+                }
+                for item in news_items
+            ],
+        }
+        raw = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """キャッシュを取得（期限切れ・破損している場合は None）"""
+        path = self.cache_dir / f"{key}.json"
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                path.unlink()
+                return None
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError):
+            path.unlink(missing_ok=True)
+            return None
+
+    def put(self, key: str, data: Dict[str, Any]) -> None:
+        """キャッシュを保存し、件数・期限を超えたものを削除"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.cache_dir / f"{key}.json"
+        temp_path = self.cache_dir / f"{key}.json.tmp"
+
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+        self._evict()
+
+    def _evict(self) -> None:
+        """期限切れと、最大件数を超えた古いキャッシュを削除"""
+        now = time.time()
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                mtime = path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if now - mtime > self.ttl:
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((mtime, path))
+
+        entries.sort(reverse=True)
+        for _, path in entries[self.max_entries :]:
+            path.unlink(missing_ok=True)
@@ -8,17 +8,242 @@ Gemini API を使用して英語学習者向けの対話スクリプトを生成
 
 import os
 import json
-from typing import List, Dict, Any
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Callable, Optional
 
+import httpx
 from google import genai
 from google.genai import types
+from google.genai.errors import ClientError, ServerError
+
+from script_cache import ScriptCache
+from usage_tracker import UsageTracker
+from script_model import (
+    TOP_LEVEL_KEYS,
+    Script,
+    ScriptValidationError,
+    validate_dialogues,
+    validate_news_block,
+)
+
+
+# 話者設定（全体・ニュース単位のプロンプトで共通）
+SPEAKER_GUIDE = """## 話者設定
+- **Steve（男性）**: 解説役。冷静で知識豊富。ゆっくり明確に話す。
+- **Nancy（女性）**: 聞き手役。明るく好奇心旺盛。視聴者の疑問を代弁する。"""
+
+# 各ニュースの対話フロー（4セクション）。{deep_dive_source} は背景情報の出典
+SECTION_GUIDE = """### 1. Introduction (2ターン)
+- ニュースタイトルをB1レベルの平易な英語に翻訳して紹介
+
+### 2. Vocabulary Hook (2ターン)
+- 重要な単語を1つ抽出
+- Nancy が「What does [word] mean?」と質問
+- Steve が簡潔に説明
+
+### 3. Deep Dive (3〜4ターン)
+- {deep_dive_source}を使って詳細を解説
+- なぜこのニュースが重要なのかを説明
+
+### 4. Discussion (2ターン)
+- このニュースが日本や日常生活にどう影響するかを議論
+- 二人の意見を交わす"""
+
+# エモーション制御
+EMOTION_GUIDE = """## エモーション制御
+各発話に以下のいずれかの emotion タグを付けてください：
+- neutral: 通常の説明
+- curious: 興味・質問
+- surprised: 驚き
+- empathetic: 共感"""
+
+# 出力形式の sections 部分
+SECTIONS_JSON = """{
+        "introduction": [
+          {"speaker": "Steve", "text": "...", "emotion": "neutral"},
+          {"speaker": "Nancy", "text": "...", "emotion": "curious"}
+        ],
+        "vocabulary_hook": [
+          {"speaker": "Nancy", "text": "What does [word] mean?", "emotion": "curious"},
+          {"speaker": "Steve", "text": "...", "emotion": "neutral"}
+        ],
+        "deep_dive": [
+          {"speaker": "Steve", "text": "...", "emotion": "neutral"},
+          {"speaker": "Nancy", "text": "...", "emotion": "surprised"},
+          ...
+        ],
+        "discussion": [
+          {"speaker": "Nancy", "text": "...", "emotion": "curious"},
+          {"speaker": "Steve", "text": "...", "emotion": "empathetic"}
+        ]
+      }"""
+
+
+class StreamingScriptParser:
+    """
+    ストリーミングで届くスクリプト JSON を逐次解析するパーサー
+
+    文字列・括弧の深さだけを追跡する軽量な状態機械で、
+    news 配列の要素（ニュースブロック）が閉じた時点で検証して
+    コールバックに渡します。スキーマ違反は届いた時点で
+    ScriptValidationError を送出するため、生成を途中で打ち切れます。
+    """
+
+    def __init__(
+        self,
+        on_news_block: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+        expected_news: int = 3,
+    ):
+        """
+        Args:
+            on_news_block: ニュースブロック完成時に (index, block) で呼ばれる関数
+            expected_news: 期待するニュース件数
+        """
+        self.on_news_block = on_news_block
+        self.expected_news = expected_news
+        self.news_blocks: List[Dict[str, Any]] = []
+
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._finished = False
+        self._end = None
+        # (括弧, キー, 開始位置) のスタック
+        self._stack: List[tuple] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string = None
+        self._pending_key = None
+
+    def feed(self, chunk: str) -> None:
+        """受信したテキストを追加して解析を進める"""
+        self._buffer += chunk
+
+        while self._pos < len(self._buffer) and not self._finished:
+            ch = self._buffer[self._pos]
+
+            if not self._started:
+                # 先頭の空白とコードフェンス（```json）を読み飛ばす
+                if ch.isspace():
+                    self._pos += 1
+                    continue
+                if ch == "`":
+                    newline = self._buffer.find("\n", self._pos)
+                    if newline == -1:
+                        return  # フェンス行の残りを待つ
+                    self._pos = newline + 1
+                    continue
+                if ch != "{":
+                    raise ScriptValidationError("JSON 以外のテキストが出力されました")
+                self._started = True
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._last_string = json.loads(
+                        self._buffer[self._string_start : self._pos + 1]
+                    )
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif ch == ":":
+                self._on_key(self._last_string)
+            elif ch == ",":
+                self._pending_key = None
+            elif ch in "{[":
+                self._stack.append((ch, self._pending_key, self._pos))
+                self._pending_key = None
+            elif ch in "}]":
+                self._on_close()
+
+            self._pos += 1
+
+    def finish(self) -> Script:
+        """
+        ストリーム終了時に呼び出し、スクリプト全体を返す
+
+        Returns:
+            検証済みのスクリプト
+        """
+        if not self._finished:
+            raise ScriptValidationError("JSON が途中で終了しました")
+
+        data = json.loads(self._buffer[self._end[0] : self._end[1]])
+        return Script.from_dict(data, self.expected_news)
+
+    def _on_key(self, key: Optional[str]) -> None:
+        """オブジェクトのキーを検出"""
+        if len(self._stack) == 1 and key not in TOP_LEVEL_KEYS:
+            raise ScriptValidationError(f"未知のトップレベルキー: {key}")
+        self._pending_key = key
+
+    def _on_close(self) -> None:
+        """括弧が閉じたときの処理"""
+        bracket, key, start = self._stack.pop()
+
+        if not self._stack:
+            # トップレベルのオブジェクトが完成
+            self._finished = True
+            self._end = (start, self._pos + 1)
+            return
+
+        parent_bracket, parent_key, _ = self._stack[-1]
+        if (
+            bracket == "{"
+            and parent_bracket == "["
+            and parent_key == "news"
+            and len(self._stack) == 2
+        ):
+            index = len(self.news_blocks)
+            if index >= self.expected_news:
+                raise ScriptValidationError(
+                    f"news が {self.expected_news} 件を超えています"
+                )
+
+            block = json.loads(self._buffer[start : self._pos + 1])
+            validate_news_block(block, index)
+            self.news_blocks.append(block)
+
+            if self.on_news_block:
+                self.on_news_block(index, block)
 
 
 class ScriptGenerator:
     """英語学習者向け対話スクリプトを生成するクラス"""
 
-    def __init__(self):
-        """Gemini API を初期化"""
+    # プロンプトのバージョン（プロンプトを変更したら上げる。キャッシュキーに使用）
+    PROMPT_VERSION = "1"
+
+    # 生成時の temperature
+    TEMPERATURE = 0.7
+
+    # スクリプト全体を1リクエストで生成する場合（ストリーミング・通常）の最大試行回数
+    MAX_SCRIPT_ATTEMPTS = 3
+
+    # 分割生成で1ブロック（またはイントロ/アウトロ）あたりの最大試行回数
+    MAX_SHARD_ATTEMPTS = 3
+
+    # 一時的な API エラー（429・サーバーエラー・タイムアウト）の再試行の基本待機時間（秒）
+    API_RETRY_BASE_WAIT = 3.0
+
+    def __init__(
+        self,
+        cache: Optional[ScriptCache] = None,
+        usage_tracker: Optional[UsageTracker] = None,
+    ):
+        """
+        Gemini API を初期化
+
+        Args:
+            cache: 生成結果のキャッシュ（None の場合は毎回生成）
+            usage_tracker: API 使用量の記録先（None の場合は内部で作成）
+        """
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             raise ValueError("GEMINI_API_KEY 環境変数が設定されていません")
@@ -26,8 +251,17 @@ class ScriptGenerator:
         self.client = genai.Client(api_key=api_key)
         # Gemini 2.5 Pro を使用
         self.model = "gemini-2.5-pro"
-
-    def generate_script(self, news_items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        self.cache = cache
+        self.usage_tracker = usage_tracker or UsageTracker()
+
+    def generate_script(
+        self,
+        news_items: List[Dict[str, Any]],
+        stream: bool = False,
+        on_news_block: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+        sharded: bool = False,
+        on_discard_block: Optional[Callable[[int], None]] = None,
+    ) -> Script:
         """
         ニュース記事からポッドキャストスクリプトを生成
 
@@ -37,36 +271,443 @@ class ScriptGenerator:
                 - link: 記事URL
                 - category: カテゴリ
                 - summary: 記事の要約
+                - body: 記事本文の抜粋（任意。全記事にある場合は Grounding なしで生成）
+            stream: True の場合はストリーミングで生成し、届いた順に検証する
+            on_news_block: ストリーミング・分割生成時、ニュースブロック完成ごとに
+                (index, block) で呼ばれる関数（TTS の先行生成などに使用）
+            sharded: True の場合はニュースごとに並列生成し、
+                最後にイントロ/アウトロを生成して結合する
+            on_discard_block: on_news_block に渡したブロックが使われなくなったとき
+                （ストリーミングの再試行・生成の失敗）に index で呼ばれる関数
+                （先行生成の中止などに使用）
 
         Returns:
-            生成されたスクリプト（JSON形式）
+            検証済みのスクリプト（JSON は Script.data）
         """
         if len(news_items) != 3:
             raise ValueError("ニュース記事は3件必要です")
 
+        if self.cache is None:
+            return self._generate_script(
+                news_items, stream, on_news_block, sharded, on_discard_block
+            )
+
+        cache_key = self.cache.make_key(
+            self.model, self.PROMPT_VERSION, self.TEMPERATURE, news_items
+        )
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            try:
+                script = Script.from_dict(cached)
+                print("   💾 キャッシュ済みのスクリプトを使用します")
+                return script
+            except ScriptValidationError:
+                pass  # 古い形式などは生成し直す
+
+        script = self._generate_script(
+            news_items, stream, on_news_block, sharded, on_discard_block
+        )
+        self.cache.put(cache_key, script.data)
+        return script
+
+    def _generate_script(
+        self,
+        news_items: List[Dict[str, Any]],
+        stream: bool,
+        on_news_block: Optional[Callable[[int, Dict[str, Any]], None]],
+        sharded: bool,
+        on_discard_block: Optional[Callable[[int], None]] = None,
+    ) -> Script:
+        """生成方式に応じてスクリプトを生成（キャッシュなし）"""
+        if sharded:
+            return self._generate_script_sharded(
+                news_items, on_news_block, on_discard_block
+            )
+
         prompt = self._build_prompt(news_items)
+        config = self._build_config(grounding=self._needs_grounding(news_items))
+
+        if stream:
+            return self._generate_script_stream(
+                prompt, config, on_news_block, on_discard_block
+            )
+
+        # Gemini API を呼び出し（本文がない記事があれば Google Search Grounding 付き）
+        last_error = None
+
+        with self.usage_tracker.track("script", self.model) as record:
+            for attempt in range(1, self.MAX_SCRIPT_ATTEMPTS + 1):
+                record.retries = attempt - 1
+                try:
+                    response = self.client.models.generate_content(
+                        model=self.model,
+                        contents=prompt,
+                        config=config,
+                    )
+                except (ClientError, ServerError, httpx.TimeoutException) as e:
+                    last_error = e
+                    self._wait_before_retry(
+                        "スクリプト", e, attempt, self.MAX_SCRIPT_ATTEMPTS, record
+                    )
+                    continue
+
+                record.add_usage(response)
+
+                # レスポンスからJSONを抽出
+                try:
+                    parser = StreamingScriptParser()
+                    parser.feed(response.text or "")
+                    return parser.finish()
+                except (ScriptValidationError, json.JSONDecodeError) as e:
+                    last_error = e
+                    print(
+                        f"   ⚠️ スクリプトの検証に失敗しました（{attempt}/{self.MAX_SCRIPT_ATTEMPTS}）: {e}"
+                    )
+
+            raise ScriptValidationError(f"スクリプト生成に失敗しました: {last_error}")
+
+    def _generate_script_stream(
+        self,
+        prompt: str,
+        config: types.GenerateContentConfig,
+        on_news_block: Optional[Callable[[int, Dict[str, Any]], None]],
+        on_discard_block: Optional[Callable[[int], None]] = None,
+    ) -> Script:
+        """
+        ストリーミングでスクリプトを生成
 
-        # Gemini API を呼び出し（Google Search Grounding 付き）
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                temperature=0.7,
-                max_output_tokens=8192,
-                tools=[types.Tool(google_search=types.GoogleSearch())],
+        チャンクが届くたびに構造を検証し、スキーマ違反を検出した時点で
+        生成を打ち切って再試行します。一時的な API エラー（429・サーバーエラー・
+        タイムアウト）は、分割生成と同じく指数バックオフで待機して再試行します。
+        打ち切った試行で on_news_block に渡したブロックは、再試行の前に
+        on_discard_block で破棄を通知します。
+        """
+        last_error = None
+
+        with self.usage_tracker.track("script", self.model) as record:
+            for attempt in range(1, self.MAX_SCRIPT_ATTEMPTS + 1):
+                record.retries = attempt - 1
+                parser = StreamingScriptParser(on_news_block=on_news_block)
+                last_chunk = None
+                try:
+                    stream = self.client.models.generate_content_stream(
+                        model=self.model,
+                        contents=prompt,
+                        config=config,
+                    )
+                    for chunk in stream:
+                        last_chunk = chunk
+                        if chunk.text:
+                            parser.feed(chunk.text)
+                    return parser.finish()
+                except (ScriptValidationError, json.JSONDecodeError) as e:
+                    last_error = e
+                    print(
+                        f"   ⚠️ スクリプトの検証に失敗しました（{attempt}/{self.MAX_SCRIPT_ATTEMPTS}）: {e}"
+                    )
+                    self._discard_blocks(len(parser.news_blocks), on_discard_block)
+                except (ClientError, ServerError, httpx.TimeoutException) as e:
+                    last_error = e
+                    self._discard_blocks(len(parser.news_blocks), on_discard_block)
+                    self._wait_before_retry(
+                        "スクリプト", e, attempt, self.MAX_SCRIPT_ATTEMPTS, record
+                    )
+                except Exception:
+                    self._discard_blocks(len(parser.news_blocks), on_discard_block)
+                    raise
+                finally:
+                    # usage_metadata は累計値のため、最後に受信したチャンクの値を使う
+                    record.add_usage(last_chunk)
+
+            raise ScriptValidationError(f"スクリプト生成に失敗しました: {last_error}")
+
+    def _discard_blocks(
+        self, count: int, on_discard_block: Optional[Callable[[int], None]]
+    ) -> None:
+        """on_news_block に渡した先頭 count 件のブロックの破棄を通知"""
+        if on_discard_block:
+            for index in range(count):
+                on_discard_block(index)
+
+    def _generate_script_sharded(
+        self,
+        news_items: List[Dict[str, Any]],
+        on_news_block: Optional[Callable[[int, Dict[str, Any]], None]],
+        on_discard_block: Optional[Callable[[int], None]] = None,
+    ) -> Script:
+        """
+        ニュースごとにプロンプトを分けて並列生成
+
+        各ブロックは個別にリクエストするため（本文のない記事は Grounding 付き）、
+        所要時間はおおむね最も遅い1ブロック分になります。失敗したブロックは
+        そのブロックだけを再試行します。他のブロックやイントロ/アウトロの生成に
+        最終的に失敗した場合は、on_news_block に渡したブロックの破棄を
+        on_discard_block で通知します。
+        """
+        blocks: List[Optional[Dict[str, Any]]] = [None] * len(news_items)
+        delivered: List[int] = []
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(news_items)) as executor:
+                futures = {
+                    executor.submit(self._generate_news_block, item, i): i
+                    for i, item in enumerate(news_items)
+                }
+                for future in as_completed(futures):
+                    index = futures[future]
+                    blocks[index] = future.result()
+                    print(f"   ✅ ニュース {index + 1} の台本を生成しました")
+                    if on_news_block:
+                        on_news_block(index, blocks[index])
+                        delivered.append(index)
+
+            # 完成したブロックをもとにイントロ・アウトロを生成して結合
+            frame = self._generate_with_retry(
+                "イントロ/アウトロ",
+                self._build_frame_prompt(news_items, blocks),
+                self._build_config(grounding=False, max_output_tokens=2048),
+                self._validate_frame,
+            )
+        except Exception:
+            if on_discard_block:
+                for index in delivered:
+                    on_discard_block(index)
+            raise
+
+        return Script.from_dict(
+            {
+                "metadata": frame.get("metadata", {}),
+                "intro": frame["intro"],
+                "news": blocks,
+                "outro": frame["outro"],
+            }
+        )
+
+    def _generate_news_block(self, item: Dict[str, Any], index: int) -> Dict[str, Any]:
+        """ニュース1件分のブロック（category, original_title, sections）を生成"""
+        block = self._generate_with_retry(
+            f"ニュース {index + 1}",
+            self._build_news_block_prompt(item),
+            self._build_config(
+                grounding=self._needs_grounding([item]), max_output_tokens=4096
             ),
+            lambda data: validate_news_block(data, index),
         )
+        # カテゴリ・タイトルは元記事の値で揃える
+        block["category"] = item["category"]
+        block["original_title"] = item["title"]
+        return block
+
+    def _generate_with_retry(
+        self,
+        label: str,
+        prompt: str,
+        config: types.GenerateContentConfig,
+        validate: Callable[[Any], None],
+    ) -> Dict[str, Any]:
+        """
+        JSON を1つ生成し、検証に通るまで再試行
+
+        一時的な API エラー（429・サーバーエラー・タイムアウト）も、
+        指数バックオフで待機してこのリクエストだけを再試行します。
+        """
+        last_error = None
+
+        with self.usage_tracker.track("script", self.model) as record:
+            for attempt in range(1, self.MAX_SHARD_ATTEMPTS + 1):
+                record.retries = attempt - 1
+                try:
+                    response = self.client.models.generate_content(
+                        model=self.model,
+                        contents=prompt,
+                        config=config,
+                    )
+                except (ClientError, ServerError, httpx.TimeoutException) as e:
+                    last_error = e
+                    self._wait_before_retry(
+                        label, e, attempt, self.MAX_SHARD_ATTEMPTS, record
+                    )
+                    continue
+
+                record.add_usage(response)
+                try:
+                    data = self._parse_json(response.text)
+                    validate(data)
+                    return data
+                except (ScriptValidationError, json.JSONDecodeError) as e:
+                    last_error = e
+                    print(
+                        f"   ⚠️ {label} の検証に失敗しました（{attempt}/{self.MAX_SHARD_ATTEMPTS}）: {e}"
+                    )
+
+            raise ScriptValidationError(f"{label} の生成に失敗しました: {last_error}")
+
+    def _wait_before_retry(
+        self, label: str, error: Exception, attempt: int, max_attempts: int, record
+    ) -> None:
+        """
+        一時的な API エラーなら指数バックオフで待機（待機時間は record.backoff に加算）
+
+        再試行できないエラー、または最後の試行の場合はそのまま送出します。
+        """
+        if not self._is_transient_error(error) or attempt == max_attempts:
+            raise error
+        wait_time = self.API_RETRY_BASE_WAIT * (2 ** (attempt - 1))
+        print(
+            f"   ⏳ {label} の API エラー（{error}） - {wait_time:.1f}秒待機後リトライ"
+            f"（{attempt}/{max_attempts}）"
+        )
+        time.sleep(wait_time)
+        record.backoff += wait_time
+
+    def _is_transient_error(self, error: Exception) -> bool:
+        """再試行で解消しうる API エラーか（429・サーバーエラー・タイムアウト）"""
+        if isinstance(error, ClientError):
+            error_code = getattr(error, "code", None) or getattr(
+                error, "status_code", None
+            )
+            return error_code == 429
+        return True
+
+    def _parse_json(self, text: Optional[str]) -> Any:
+        """レスポンスから JSON オブジェクトを抽出（コードフェンスや前後の文章を除去）"""
+        text = text or ""
+        start = text.find("{")
+        end = text.rfind("}")
+        if start == -1 or end < start:
+            raise ScriptValidationError("JSON が出力されませんでした")
+        return json.loads(text[start : end + 1])
+
+    def _validate_frame(self, data: Any) -> None:
+        """イントロ/アウトロ生成結果を検証"""
+        if not isinstance(data, dict):
+            raise ScriptValidationError("イントロ/アウトロがオブジェクトではありません")
+        validate_dialogues(data.get("intro"), "intro")
+        validate_dialogues(data.get("outro"), "outro")
+
+    def _build_config(
+        self, grounding: bool = True, max_output_tokens: int = 8192
+    ) -> types.GenerateContentConfig:
+        """生成設定（grounding=True の場合は Google Search Grounding 付き）"""
+        return types.GenerateContentConfig(
+            temperature=self.TEMPERATURE,
+            max_output_tokens=max_output_tokens,
+            tools=(
+                [types.Tool(google_search=types.GoogleSearch())] if grounding else None
+            ),
+        )
+
+    def _needs_grounding(self, news_items: List[Dict[str, Any]]) -> bool:
+        """本文（body）のない記事があれば Google Search で背景を補う"""
+        return not all(item.get("body") for item in news_items)
+
+    def _section_guide(self, news_items: List[Dict[str, Any]]) -> str:
+        """対話フローの説明（Deep Dive の情報源は Grounding の有無に合わせる）"""
+        if self._needs_grounding(news_items):
+            source = "Google検索で得た背景情報"
+        else:
+            source = "記事本文（抜粋）の内容"
+        return SECTION_GUIDE.format(deep_dive_source=source)
+
+    def _format_body(self, item: Dict[str, Any], indent: str = "") -> str:
+        """プロンプトに入れる本文の行（本文がない場合は空文字列）"""
+        if not item.get("body"):
+            return ""
+        body = item["body"].replace("\n", " ")
+        return f"\n{indent}- 本文（抜粋）: {body}"
+
+    def _build_news_block_prompt(self, item: Dict[str, Any]) -> str:
+        """ニュース1件分のプロンプトを構築（分割生成用）"""
+        return f"""
+あなたは英語学習者（B1レベル）向けのポッドキャスト台本ライターです。
+以下の日本のニュース1件について、ポッドキャストの1コーナー分（150〜200語）の対話台本を英語で作成してください。
+番組のイントロとアウトロは別に作成するため、挨拶や締めの言葉は不要です。
+
+## ニューストピック
+**{item['title']}**
+- カテゴリ: {item['category']}
+- 記事URL: {item['link']}
+- 概要: {item.get('summary', 'なし')}{self._format_body(item)}
+
+{SPEAKER_GUIDE}
 
-        # レスポンスからJSONを抽出
-        text = response.text
-        text = (
-            text.replace("```json\n", "")
-            .replace("```\n", "")
-            .replace("```", "")
-            .strip()
+## 対話フロー構造（必須）
+
+以下の4つのセクションを必ず含めてください：
+
+{self._section_guide([item])}
+
+## 制約条件
+- B1レベルの英語を使用（高校生向けの語彙）
+- 各発話: 最大30語、1〜2文
+- 総語数: 150〜200語
+- 自然な会話の流れ
+
+{EMOTION_GUIDE}
+
+## 出力形式（JSON）
+
+```json
+{{
+  "sections": {SECTIONS_JSON}
+}}
+```
+
+JSONのみを出力してください。追加のテキストは不要です。
+"""
+
+    def _build_frame_prompt(
+        self, news_items: List[Dict[str, Any]], blocks: List[Dict[str, Any]]
+    ) -> str:
+        """完成したニュースブロックをつなぐイントロ/アウトロのプロンプトを構築"""
+        news_section = "\n".join(
+            [
+                f"{i + 1}. {item['title']}（{item['category']}）\n"
+                f"   - 冒頭の発話: {block['sections']['introduction'][0]['text']}"
+                for i, (item, block) in enumerate(zip(news_items, blocks))
+            ]
         )
 
-        return json.loads(text)
+        return f"""
+あなたは英語学習者（B1レベル）向けのポッドキャスト台本ライターです。
+以下の3つのニュースを扱う回の、番組冒頭のイントロと締めのアウトロを英語で作成してください。
+各ニュースの本編は作成済みです。
+
+## ニュース（放送順）
+{news_section}
+
+{SPEAKER_GUIDE}
+
+## 制約条件
+- イントロ: 2ターン。今日の3つのトピックを簡潔に予告する
+- アウトロ: 2ターン。内容を振り返り、視聴者に挨拶する
+- B1レベルの英語、各発話は最大30語
+- metadata.topics には各ニュースの英語の短いトピック名を入れる
+
+{EMOTION_GUIDE}
+
+## 出力形式（JSON）
+
+```json
+{{
+  "metadata": {{
+    "duration_est": <分数>,
+    "total_words": <総語数>,
+    "topics": ["トピック1", "トピック2", "トピック3"]
+  }},
+  "intro": [
+    {{"speaker": "Steve", "text": "...", "emotion": "neutral"}},
+    {{"speaker": "Nancy", "text": "...", "emotion": "neutral"}}
+  ],
+  "outro": [
+    {{"speaker": "Steve", "text": "...", "emotion": "neutral"}},
+    {{"speaker": "Nancy", "text": "...", "emotion": "neutral"}}
+  ]
+}}
+```
+
+JSONのみを出力してください。追加のテキストは不要です。
+"""
 
     def _build_prompt(self, news_items: List[Dict[str, Any]]) -> str:
         """Gemini 用のプロンプトを構築"""
@@ -77,6 +718,7 @@ class ScriptGenerator:
                 f"   - カテゴリ: {item['category']}\n"
                 f"   - 記事URL: {item['link']}\n"
                 f"   - 概要: {item.get('summary', 'なし')}"
+                f"{self._format_body(item, '   ')}"
                 for i, item in enumerate(news_items)
             ]
         )
@@ -88,29 +730,13 @@ class ScriptGenerator:
 ## ニューストピック
 {news_section}
 
-## 話者設定
-- **Steve（男性）**: 解説役。冷静で知識豊富。ゆっくり明確に話す。
-- **Nancy（女性）**: 聞き手役。明るく好奇心旺盛。視聴者の疑問を代弁する。
+{SPEAKER_GUIDE}
 
 ## 各ニュースの対話フロー構造（必須）
 
 各ニュースについて、以下の4つのセクションを必ず含めてください：
 
-### 1. Introduction (2ターン)
-- ニュースタイトルをB1レベルの平易な英語に翻訳して紹介
-
-### 2. Vocabulary Hook (2ターン)
-- 重要な単語を1つ抽出
-- Nancy が「What does [word] mean?」と質問
-- Steve が簡潔に説明
-
-### 3. Deep Dive (3〜4ターン)
-- Google検索で得た背景情報を使って詳細を解説
-- なぜこのニュースが重要なのかを説明
-
-### 4. Discussion (2ターン)
-- このニュースが日本や日常生活にどう影響するかを議論
-- 二人の意見を交わす
+{self._section_guide(news_items)}
 
 ## 制約条件
 - B1レベルの英語を使用（高校生向けの語彙）
@@ -118,12 +744,7 @@ class ScriptGenerator:
 - 総語数: 500〜650語
 - 自然な会話の流れ
 
-## エモーション制御
-各発話に以下のいずれかの emotion タグを付けてください：
-- neutral: 通常の説明
-- curious: 興味・質問
-- surprised: 驚き
-- empathetic: 共感
+{EMOTION_GUIDE}
 
 ## 出力形式（JSON）
 
@@ -142,25 +763,7 @@ class ScriptGenerator:
     {{
       "category": "{news_items[0]["category"]}",
       "original_title": "{news_items[0]["title"]}",
-      "sections": {{
-        "introduction": [
-          {{"speaker": "Steve", "text": "...", "emotion": "neutral"}},
-          {{"speaker": "Nancy", "text": "...", "emotion": "curious"}}
-        ],
-        "vocabulary_hook": [
-          {{"speaker": "Nancy", "text": "What does [word] mean?", "emotion": "curious"}},
-          {{"speaker": "Steve", "text": "...", "emotion": "neutral"}}
-        ],
-        "deep_dive": [
-          {{"speaker": "Steve", "text": "...", "emotion": "neutral"}},
-          {{"speaker": "Nancy", "text": "...", "emotion": "surprised"}},
-          ...
-        ],
-        "discussion": [
-          {{"speaker": "Nancy", "text": "...", "emotion": "curious"}},
-          {{"speaker": "Steve", "text": "...", "emotion": "empathetic"}}
-        ]
-      }}
+      "sections": {SECTIONS_JSON}
     }},
     // news[1], news[2] も同様の構造
   ],
@@ -199,4 +802,4 @@ if __name__ == "__main__":
         },
     ]
     script = generator.generate_script(test_news)
-    print(json.dumps(script, indent=2, ensure_ascii=False))
+    print(json.dumps(script.data, indent=2, ensure_ascii=False))
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+スクリプトモデル
+ScriptGenerator が出力した JSON を一度だけ検証し、
+発話をフラットな Line のリストとして保持します。
+音声生成・タイムライン・字幕・動画説明文はこのリストを参照します。
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional
+
+
+# 各ニュースに必須のセクション（読み上げ順）
+NEWS_SECTIONS = ["introduction", "vocabulary_hook", "deep_dive", "discussion"]
+
+# スクリプトのトップレベルに許可するキー
+TOP_LEVEL_KEYS = {"metadata", "intro", "news", "outro"}
+
+# Vocabulary Hook の質問文（プロンプトで "What does [word] mean?" を指定）
+VOCABULARY_PATTERN = re.compile(r"what does [\"'“]?(.+?)[\"'”]? mean\?", re.IGNORECASE)
+
+
+class ScriptValidationError(ValueError):
+    """生成されたスクリプトがスキーマに合わない場合の例外"""
+
+
+@dataclass(frozen=True, slots=True)
+class Line:
+    """1つの発話"""
+
+    speaker: str
+    text: str
+    emotion: str = "neutral"
+    # "intro" / NEWS_SECTIONS のいずれか / "outro"
+    section: str = ""
+    # ニュースのインデックス（ニュース以外は None）
+    news_idx: Optional[int] = None
+
+
+def validate_dialogues(dialogues: Any, where: str) -> None:
+    """発話リスト（[{"speaker", "text", "emotion"}, ...]）を検証"""
+    if not isinstance(dialogues, list) or not dialogues:
+        raise ScriptValidationError(f"{where} が空、またはリストではありません")
+
+    for i, dialogue in enumerate(dialogues):
+        if not isinstance(dialogue, dict):
+            raise ScriptValidationError(f"{where}[{i}] がオブジェクトではありません")
+        if not isinstance(dialogue.get("speaker"), str):
+            raise ScriptValidationError(f"{where}[{i}].speaker がありません")
+        if not isinstance(dialogue.get("text"), str):
+            raise ScriptValidationError(f"{where}[{i}].text がありません")
+
+
+def validate_news_block(block: Any, index: int) -> None:
+    """news[index] の構造（sections.* の発話リスト）を検証"""
+    where = f"news[{index}]"
+    if not isinstance(block, dict):
+        raise ScriptValidationError(f"{where} がオブジェクトではありません")
+
+    sections = block.get("sections")
+    if not isinstance(sections, dict):
+        raise ScriptValidationError(f"{where}.sections がありません")
+
+    for section_name in NEWS_SECTIONS:
+        validate_dialogues(
+            sections.get(section_name), f"{where}.sections.{section_name}"
+        )
+
+
+def validate_script(script: Any, expected_news: int = 3) -> None:
+    """スクリプト全体の構造を検証"""
+    if not isinstance(script, dict):
+        raise ScriptValidationError("スクリプトがオブジェクトではありません")
+
+    unknown = set(script) - TOP_LEVEL_KEYS
+    if unknown:
+        raise ScriptValidationError(f"未知のトップレベルキー: {sorted(unknown)}")
+
+    news = script.get("news")
+    if not isinstance(news, list) or len(news) != expected_news:
+        raise ScriptValidationError(f"news は {expected_news} 件必要です")
+
+    for i, block in enumerate(news):
+        validate_news_block(block, i)
+
+    if "intro" in script:
+        validate_dialogues(script["intro"], "intro")
+    validate_dialogues(script.get("outro"), "outro")
+
+
+def _to_line(dialogue: Dict[str, Any], section: str, news_idx: Optional[int]) -> Line:
+    """発話の dict を Line に変換"""
+    return Line(
+        speaker=dialogue["speaker"],
+        text=dialogue["text"].strip(),
+        emotion=dialogue.get("emotion") or "neutral",
+        section=section,
+        news_idx=news_idx,
+    )
+
+
+def news_block_lines(block: Dict[str, Any], news_idx: int) -> List[Line]:
+    """
+    ニュースブロック1件分の発話を読み上げ順の Line に変換
+
+    ストリーミング生成で完成したブロックを先行して TTS に渡す場合にも使用します。
+    """
+    sections = block["sections"]
+    return [
+        _to_line(dialogue, section_name, news_idx)
+        for section_name in NEWS_SECTIONS
+        for dialogue in sections[section_name]
+    ]
+
+
+class Script:
+    """検証済みのスクリプトと発話のフラットなテーブル"""
+
+    __slots__ = ("data", "lines")
+
+    def __init__(self, data: Dict[str, Any], lines: List[Line]):
+        """
+        Args:
+            data: ScriptGenerator が出力した JSON（保存用にそのまま保持）
+            lines: 全発話（イントロ → 各ニュース → アウトロの順）
+        """
+        self.data = data
+        self.lines = lines
+
+    @classmethod
+    def from_dict(cls, data: Any, expected_news: int = 3) -> "Script":
+        """
+        JSON を検証して Script を作成
+
+        Raises:
+            ScriptValidationError: スキーマに合わない場合
+        """
+        validate_script(data, expected_news)
+
+        lines = [_to_line(d, "intro", None) for d in data.get("intro", [])]
+        for news_idx, block in enumerate(data["news"]):
+            lines.extend(news_block_lines(block, news_idx))
+        lines.extend(_to_line(d, "outro", None) for d in data["outro"])
+
+        return cls(data, lines)
+
+    @property
+    def narration(self) -> List[Line]:
+        """音声生成の対象となる発話（イントロは intro_fixed.mp3 を使うため除外）"""
+        return [line for line in self.lines if line.section != "intro" and line.text]
+
+    @property
+    def topics(self) -> List[str]:
+        """metadata.topics（英語のトピック名）"""
+        return list(self.data.get("metadata", {}).get("topics", []))
+
+    def vocabulary(self) -> List[str]:
+        """各ニュースの Vocabulary Hook で取り上げた単語"""
+        words = {}
+        for line in self.lines:
+            if line.section != "vocabulary_hook" or line.news_idx in words:
+                continue
+            match = VOCABULARY_PATTERN.search(line.text)
+            if match:
+                words[line.news_idx] = match.group(1).strip()
+        return list(words.values())
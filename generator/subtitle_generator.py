@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+字幕生成モジュール
+音声生成時に記録した発話タイミングから SRT / WebVTT 字幕を生成します。
+"""
+
+from typing import Optional, List, Dict, Any
+
+
+class SubtitleGenerator:
+    """タイムラインから字幕ファイルを生成するクラス"""
+
+    # 1つの字幕を画面に出す最短時間（秒）
+    MIN_CUE_DURATION = 0.8
+
+    # 1行あたりの最大文字数（超える場合は単語境界で改行）
+    MAX_LINE_LENGTH = 42
+
+    def build_cues(self, timeline: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        タイムラインの発話から字幕キューを作成
+
+        Args:
+            timeline: AudioMixer.build_timeline のタイムライン
+
+        Returns:
+            キューのリスト（start/end は秒、text は改行済みの字幕テキスト）
+        """
+        lines = [line for line in timeline.get("lines", []) if line["text"].strip()]
+        cues = []
+
+        for i, line in enumerate(lines):
+            start = float(line["start"])
+            end = max(float(line["end"]), start + self.MIN_CUE_DURATION)
+
+            # 最短表示時間で延ばした場合も次の発話とは重ねない
+            if i + 1 < len(lines):
+                end = min(end, float(lines[i + 1]["start"]))
+
+            cues.append(
+                {
+                    "start": start,
+                    "end": end,
+                    "speaker": line.get("speaker"),
+                    "text": self._wrap(line["text"].strip()),
+                }
+            )
+
+        return cues
+
+    def generate(
+        self,
+        timeline: Dict[str, Any],
+        srt_path: Optional[str] = None,
+        vtt_path: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        タイムラインから SRT / WebVTT ファイルを生成
+
+        Args:
+            timeline: AudioMixer.build_timeline のタイムライン
+            srt_path: SRT の出力パス（None の場合は出力しない）
+            vtt_path: WebVTT の出力パス（None の場合は出力しない）
+
+        Returns:
+            生成したキューのリスト
+        """
+        cues = self.build_cues(timeline)
+
+        if srt_path:
+            with open(srt_path, "w", encoding="utf-8") as f:
+                f.write(self.to_srt(cues))
+
+        if vtt_path:
+            with open(vtt_path, "w", encoding="utf-8") as f:
+                f.write(self.to_vtt(cues))
+
+        return cues
+
+    def to_srt(self, cues: List[Dict[str, Any]]) -> str:
+        """キューを SRT 形式の文字列に変換"""
+        blocks = []
+        for i, cue in enumerate(cues, 1):
+            start = self._format_timestamp(cue["start"], ",")
+            end = self._format_timestamp(cue["end"], ",")
+            blocks.append(f"{i}\n{start} --> {end}\n{cue['text']}\n")
+        return "\n".join(blocks)
+
+    def to_vtt(self, cues: List[Dict[str, Any]]) -> str:
+        """キューを WebVTT 形式の文字列に変換（話者は voice タグで付与）"""
+        blocks = ["WEBVTT\n"]
+        for cue in cues:
+            start = self._format_timestamp(cue["start"], ".")
+            end = self._format_timestamp(cue["end"], ".")
+            text = cue["text"]
+            if cue.get("speaker"):
+                text = f"<v {cue['speaker']}>{text}"
+            blocks.append(f"{start} --> {end}\n{text}\n")
+        return "\n".join(blocks)
+
+    def _format_timestamp(self, seconds: float, separator: str) -> str:
+        """秒を HH:MM:SS,mmm（SRT）/ HH:MM:SS.mmm（WebVTT）形式に変換"""
+        total_ms = int(round(max(seconds, 0.0) * 1000))
+        hours, rest = divmod(total_ms, 3_600_000)
+        minutes, rest = divmod(rest, 60_000)
+        secs, ms = divmod(rest, 1000)
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{ms:03d}"
+
+    def _wrap(self, text: str) -> str:
+        """長い発話を単語境界で最大2行に折り返す"""
+        if len(text) <= self.MAX_LINE_LENGTH:
+            return text
+
+        # できるだけ中央に近い空白で分割
+        middle = len(text) // 2
+        spaces = [i for i, ch in enumerate(text) if ch == " "]
+        if not spaces:
+            return text
+        split_at = min(spaces, key=lambda i: abs(i - middle))
+        return f"{text[:split_at]}\n{text[split_at + 1:]}"
+
+
+if __name__ == "__main__":
+    # テスト用
+    test_timeline = {
+        "lines": [
+            {"speaker": "Steve", "text": "Hello and welcome.", "start": 0.0, "end": 1.2},
+            {
+                "speaker": "Nancy",
+                "text": "Today we have three interesting news stories from Japan for you!",
+                "start": 1.6,
+                "end": 4.9,
+            },
+        ]
+    }
+    generator = SubtitleGenerator()
+    cues = generator.build_cues(test_timeline)
+    print(generator.to_srt(cues))
+    print(generator.to_vtt(cues))
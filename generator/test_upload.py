@@ -55,8 +55,11 @@ def main():
     if args.video:
         video_path = Path(args.video)
     else:
-        # 最新の動画ファイルを検索
-        video_files = sorted(output_dir.glob("newscast_*.mp4"), reverse=True)
+        # 最新の動画ファイルを検索（720p 版などのレンディションは除外）
+        video_files = sorted(
+            (p for p in output_dir.glob("newscast_*.mp4") if p.stem.count("_") == 1),
+            reverse=True,
+        )
         if not video_files:
             print("❌ 動画ファイルが見つかりません")
             return 1
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Gemini API 使用量の記録モジュール
+呼び出しごとのトークン数・TTS 文字数・レイテンシ・リトライ回数・
+バックオフ待機時間を記録し、ステージ別・エピソード全体で集計します。
+"""
+
+import json
+import time
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import List, Dict, Any, Optional
+
+
+# モデルごとの料金（USD / 100万トークン、概算）
+# 料金改定時はここを更新してください
+PRICING = {
+    "gemini-2.5-pro": {"input": 1.25, "output": 10.0},
+    "gemini-2.5-flash-preview-tts": {"input": 0.50, "output": 10.0},
+}
+
+
+@dataclass
+class CallRecord:
+    """1回の API 呼び出し（リトライを含む）の記録"""
+
+    stage: str
+    model: str
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    thoughts_tokens: int = 0
+    total_tokens: int = 0
+    # TTS に渡したテキストの文字数
+    characters: int = 0
+    # 待機時間（backoff）を除いた所要時間（秒）
+    latency: float = 0.0
+    retries: int = 0
+    # リトライ・レート制限で待機した秒数
+    backoff: float = 0.0
+    error: Optional[str] = None
+
+    def add_usage(self, response: Any) -> None:
+        """レスポンスの usage_metadata をトークン数に加算"""
+        usage = getattr(response, "usage_metadata", None)
+        if usage is None:
+            return
+        self.prompt_tokens += getattr(usage, "prompt_token_count", None) or 0
+        self.output_tokens += getattr(usage, "candidates_token_count", None) or 0
+        self.thoughts_tokens += getattr(usage, "thoughts_token_count", None) or 0
+        self.total_tokens += getattr(usage, "total_token_count", None) or 0
+
+    @property
+    def cost(self) -> float:
+        """概算費用（USD）。思考トークンは出力として課金"""
+        price = PRICING.get(self.model)
+        if price is None:
+            return 0.0
+        output = self.output_tokens + self.thoughts_tokens
+        return (
+            self.prompt_tokens * price["input"] + output * price["output"]
+        ) / 1_000_000
+
+
+class UsageTracker:
+    """API 呼び出しの記録を集めて集計するクラス（スレッドセーフ）"""
+
+    # 集計する数値項目
+    FIELDS = [
+        "prompt_tokens",
+        "output_tokens",
+        "thoughts_tokens",
+        "total_tokens",
+        "characters",
+        "latency",
+        "retries",
+        "backoff",
+    ]
+
+    def __init__(self):
+        self.calls: List[CallRecord] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def track(self, stage: str, model: str, characters: int = 0):
+        """
+        1回の呼び出しを記録するコンテキストマネージャ
+
+        with ブロック内で record.add_usage(response) や record.retries /
+        record.backoff を更新すると、終了時にレイテンシと共に記録されます。
+
+        Args:
+            stage: ステージ名（"script", "tts", "intro_tts" など）
+            model: モデル名
+            characters: TTS に渡すテキストの文字数
+        """
+        record = CallRecord(stage=stage, model=model, characters=characters)
+        started = time.monotonic()
+        try:
+            yield record
+        except Exception as e:
+            record.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record.latency = max(time.monotonic() - started - record.backoff, 0.0)
+            with self._lock:
+                self.calls.append(record)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        ステージ別・全体の集計を返す
+
+        Returns:
+            {"stages": {stage: {...}}, "total": {...}}
+            各集計は calls, errors, cost_usd と FIELDS の合計
+        """
+        with self._lock:
+            calls = list(self.calls)
+
+        stages: Dict[str, Dict[str, Any]] = {}
+        for record in calls:
+            stage = stages.setdefault(record.stage, self._empty_totals())
+            self._accumulate(stage, record)
+
+        total = self._empty_totals()
+        for record in calls:
+            self._accumulate(total, record)
+
+        return {"stages": stages, "total": total}
+
+    def write_report(self, path: str, extra: Optional[Dict[str, Any]] = None) -> None:
+        """
+        集計と呼び出しごとの記録を JSON に出力
+
+        Args:
+            path: 出力先
+            extra: レポートに含める追加情報（処理結果など）
+        """
+        with self._lock:
+            calls = [asdict(record) for record in self.calls]
+
+        report = dict(extra or {})
+        report["usage"] = self.summary()
+        report["calls"] = calls
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+
+    def print_summary(self) -> None:
+        """ステージ別の集計を表示"""
+        summary = self.summary()
+        for name, stage in summary["stages"].items():
+            print(
+                f"   {name}: {stage['calls']}回, {stage['total_tokens']} tokens, "
+                f"{stage['characters']}文字, {stage['latency']:.1f}秒, "
+                f"リトライ {stage['retries']}回 / 待機 {stage['backoff']:.1f}秒, "
+                f"${stage['cost_usd']:.4f}"
+            )
+
+    def _empty_totals(self) -> Dict[str, Any]:
+        totals: Dict[str, Any] = {"calls": 0, "errors": 0, "cost_usd": 0.0}
+        totals.update({field: 0 for field in self.FIELDS})
+        return totals
+
+    def _accumulate(self, totals: Dict[str, Any], record: CallRecord) -> None:
+        totals["calls"] += 1
+        totals["errors"] += 1 if record.error else 0
+        totals["cost_usd"] = round(totals["cost_usd"] + record.cost, 6)
+        for field in self.FIELDS:
+            totals[field] += getattr(record, field)
+        totals["latency"] = round(totals["latency"], 3)
+        totals["backoff"] = round(totals["backoff"], 3)
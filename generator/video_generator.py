@@ -7,18 +7,27 @@ FFmpeg を使用して静止画と音声から動画を生成します。
 """
 
 import os
+import json
+import math
+import hashlib
 import subprocess
 import tempfile
+from functools import cached_property
+from fractions import Fraction
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
+from ffmpeg_capabilities import FFmpegCapabilities, get_capabilities
+from media_engine import get_media_engine
+
 try:
-    from PIL import Image, ImageDraw, ImageFont
+    from PIL import Image, ImageDraw, ImageFont, ImageOps
 except ImportError:
     Image = None
     ImageDraw = None
     ImageFont = None
+    ImageOps = None
 
 
 class VideoGenerator:
@@ -29,19 +38,69 @@ class VideoGenerator:
     VIDEO_HEIGHT = 1080
     FPS = 30
 
-    # イントロの長さ（秒）
+    # イントロの長さ（秒）: intro_fixed.json が無い場合のフォールバック
     INTRO_DURATION = 35.0
 
+    # 動画のレンディション（名前: (幅, 高さ)）
+    VIDEO_VARIANTS = {
+        "1080p": (1920, 1080),
+        "720p": (1280, 720),
+    }
+
+    # カテゴリ別のシーン画像（assets/images 内のファイル名）
+    # 無い場合はメイン背景（news_major.png）、それも無ければイントロの画像（hook.jpg）を使用
+    CATEGORY_IMAGES = {
+        "主要": "news_major.png",
+        "国内": "news_domestic.png",
+        "国際": "news_world.png",
+        "経済": "news_business.png",
+        "エンタメ": "news_entertainment.png",
+        "スポーツ": "news_sports.png",
+        "IT": "news_it.png",
+    }
+
+    # シーンクリップの長さの刻み（秒）: この単位に切り上げてエンコード・キャッシュ
+    SCENE_BUCKET_SECONDS = 5.0
+
+    # サムネイルのバリエーション（名前: (幅, 高さ)）
+    THUMBNAIL_VARIANTS = {
+        "landscape": (1280, 720),  # YouTube 推奨
+        "square": (1080, 1080),
+        "shorts": (1080, 1920),
+    }
+
+    # サムネイルのレイアウト基準サイズ（この座標系で配置してスケール）
+    THUMBNAIL_BASE_SIZE = (1280, 720)
+
+    # 日本語対応フォントの候補
+    JAPANESE_FONTS = [
+        "C:/Windows/Fonts/YuGothB.ttc",  # Yu Gothic Bold
+        "C:/Windows/Fonts/YuGothM.ttc",  # Yu Gothic Medium
+        "C:/Windows/Fonts/meiryob.ttc",  # Meiryo Bold
+        "C:/Windows/Fonts/meiryo.ttc",  # Meiryo
+        "C:/Windows/Fonts/msgothic.ttc",  # MS Gothic
+        "C:/Windows/Fonts/NotoSansJP-Bold.ttf",
+        "/usr/share/fonts/truetype/noto/NotoSansCJK-Bold.ttc",  # Linux
+    ]
+
+    # 英語フォントの候補
+    ENGLISH_FONTS = [
+        "C:/Windows/Fonts/arialbd.ttf",  # Arial Bold
+        "C:/Windows/Fonts/arial.ttf",  # Arial
+        "arial.ttf",
+    ]
+
     # 背景色（グラデーション用）
     BG_COLOR_START = (25, 25, 112)  # Midnight Blue
     BG_COLOR_END = (72, 61, 139)  # Dark Slate Blue
 
-    def __init__(self, assets_dir: Optional[str] = None):
+    def __init__(self, assets_dir: Optional[str] = None, backend: Optional[str] = None):
         """
         VideoGenerator を初期化
 
         Args:
             assets_dir: アセットファイルが格納されているディレクトリ
+            backend: "ffmpeg" または "pyav"（None なら環境変数 MEDIA_BACKEND）
         """
         if assets_dir is None:
             self.assets_dir = Path(__file__).parent / "assets"
@@ -52,25 +111,52 @@ class VideoGenerator:
         self.background_image = self.assets_dir / "background.jpg"
         self.intro_bg_image = self.assets_dir / "images" / "hook.jpg"
         self.main_bg_image = self.assets_dir / "images" / "news_major.png"
+        self.outro_bg_image = self.assets_dir / "images" / "conclusion.jpg"
+
+        # エンコード済みシーンクリップのキャッシュ
+        self.scene_cache_dir = Path(__file__).parent / "cache" / "scenes"
 
-        # FFmpeg のパスを確認
-        self._check_ffmpeg()
+        # イントロの長さ（create_intro.py が記録したサイドカーから取得）
+        self.intro_duration = self._load_intro_duration()
+
+        # PyAV バックエンド（None の場合は ffmpeg CLI で処理）
+        self.engine = get_media_engine(backend)
 
         # PIL が利用可能か確認
         self.pil_available = Image is not None
 
-    def _check_ffmpeg(self):
-        """FFmpeg がインストールされているか確認"""
+        # 読み込み済みフォントのキャッシュ（(候補, サイズ) → フォント）
+        self._font_cache: Dict[tuple, Any] = {}
+
+        # 警告済みの見つからないシーン画像（警告は画像ごとに1度だけ）
+        self._missing_scene_images: set = set()
+
+    @cached_property
+    def capabilities(self) -> FFmpegCapabilities:
+        """
+        FFmpeg の機能（ffmpeg CLI で処理する場合にだけ検出する）
+
+        検出結果はキャッシュされ、2回目以降は ffmpeg を実行しません。
+        PyAV バックエンドでは字幕を扱う場合を除き参照しないため、ffmpeg が無くても動作します。
+        """
+        return get_capabilities()
+
+    @cached_property
+    def video_args(self) -> List[str]:
+        return self.capabilities.video_codec_args()
+
+    @cached_property
+    def aac_args(self) -> List[str]:
+        return self.capabilities.aac_codec_args()
+
+    def _load_intro_duration(self) -> float:
+        """intro_fixed.json からイントロの正確な長さを読み込む"""
+        metadata_path = self.assets_dir / "intro_fixed.json"
         try:
-            result = subprocess.run(
-                ["ffmpeg", "-version"],
-                capture_output=True,
-                text=True,
-            )
-            if result.returncode != 0:
-                raise RuntimeError("FFmpeg の実行に失敗しました")
-        except FileNotFoundError:
-            raise RuntimeError("FFmpeg がインストールされていません")
+            with open(metadata_path, "r", encoding="utf-8") as f:
+                return float(json.load(f)["duration"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return self.INTRO_DURATION
 
     def generate_video(
         self,
@@ -79,6 +165,10 @@ class VideoGenerator:
         title: str = "NewsCast",
         topics: Optional[List[str]] = None,
         script: Optional[Dict[str, Any]] = None,
+        timeline: Optional[Dict[str, Any]] = None,
+        categories: Optional[List[str]] = None,
+        subtitles_path: Optional[str] = None,
+        burn_subtitles: bool = False,
     ) -> str:
         """
         音声から動画を生成
@@ -88,50 +178,191 @@ class VideoGenerator:
             output_path: 出力動画ファイルのパス
             title: 動画タイトル
             topics: ニューストピックのリスト（サムネイルに表示）
-            script: スクリプトデータ（字幕生成用）
+            script: スクリプトデータ（互換性のため残しています。字幕は subtitles_path で指定）
+            timeline: AudioMixer.build_timeline のタイムライン（カット位置に使用）
+            categories: 各ニュースのカテゴリ（ニュースごとの背景切り替えに使用）
+            subtitles_path: 字幕ファイル（SRT）のパス
+            burn_subtitles: True の場合は字幕を焼き込み、False の場合はソフト字幕として多重化
 
         Returns:
             出力動画ファイルのパス
         """
-        # 音声の長さを取得
-        duration = self._get_audio_duration(audio_path)
+        self.generate_video_variants(
+            audio_path=audio_path,
+            outputs={"1080p": output_path},
+            title=title,
+            topics=topics,
+            timeline=timeline,
+            categories=categories,
+            subtitles_path=subtitles_path,
+            burn_subtitles=burn_subtitles,
+        )
+        return output_path
 
-        # イントロ用・メイン用の両方の背景があれば切り替え動画を生成
-        if self.intro_bg_image.exists() and self.main_bg_image.exists():
-            return self._generate_video_with_background_switch(
-                audio_path=audio_path,
-                output_path=output_path,
-                duration=duration,
+    def _resolve_timing(
+        self,
+        audio_path: str,
+        timeline: Optional[Dict[str, Any]] = None,
+    ) -> tuple:
+        """
+        動画の長さとイントロ終了時刻を決定
+
+        タイムラインがあればその値をそのまま使い（ffprobe 不要）、
+        無い場合は音声の長さを計測してサイドカーのイントロ長を使います。
+
+        Returns:
+            (動画の長さ, イントロ終了時刻)（秒）
+        """
+        if timeline is not None:
+            return float(timeline["duration"]), float(timeline["intro_end"])
+
+        return self._get_audio_duration(audio_path), self.intro_duration
+
+    def _plan_scenes(
+        self,
+        timeline: Optional[Dict[str, Any]],
+        categories: Optional[List[str]] = None,
+    ) -> Optional[List[tuple]]:
+        """
+        タイムラインからシーン（背景画像と区間）の一覧を作成
+
+        イントロ → 各ニュース（カテゴリ別画像）→ アウトロ の順に区間を割り当て、
+        同じ画像が続く区間は1つにまとめます。
+
+        Returns:
+            (画像パス, 開始秒, 終了秒) のリスト。
+            タイムラインにニュース区間が無い、または必要な画像が無い場合は None
+        """
+        if not timeline or not timeline.get("news"):
+            return None
+        if not self.intro_bg_image.exists():
+            return None
+
+        duration = float(timeline["duration"])
+        news_blocks = timeline["news"]
+        categories = categories or []
+
+        # 区間の境界: イントロ終了 → 各ニュース開始 → アウトロ開始 → 終了
+        boundaries = [(0.0, self.intro_bg_image)]
+        for i, block in enumerate(news_blocks):
+            start = timeline["intro_end"] if i == 0 else block["start"]
+            index = block.get("index", i)
+            category = categories[index] if index < len(categories) else None
+            image = self._get_scene_image(category)
+            if image is None:
+                return None
+            boundaries.append((float(start), image))
+
+        if timeline.get("outro_start") is not None:
+            outro_image = (
+                self.outro_bg_image
+                if self.outro_bg_image.exists()
+                else boundaries[-1][1]
             )
+            boundaries.append((float(timeline["outro_start"]), outro_image))
+
+        scenes = []
+        for i, (start, image) in enumerate(boundaries):
+            end = boundaries[i + 1][0] if i + 1 < len(boundaries) else duration
+            if end <= start:
+                continue
+            if scenes and scenes[-1][0] == image:
+                scenes[-1] = (image, scenes[-1][1], end)
+            else:
+                scenes.append((image, start, end))
+
+        return scenes
+
+    def _get_scene_image(self, category: Optional[str]) -> Optional[Path]:
+        """カテゴリ別のシーン画像を取得（無ければメイン背景、それも無ければイントロの画像）"""
+        filename = self.CATEGORY_IMAGES.get(category or "")
+        candidates = [self.assets_dir / "images" / filename] if filename else []
+        candidates += [self.main_bg_image, self.intro_bg_image]
+
+        for image in candidates:
+            if image.exists():
+                return image
+            self._warn_missing_scene_image(image)
+        return None
+
+    def _warn_missing_scene_image(self, image: Path) -> None:
+        """見つからないシーン画像を1度だけ警告"""
+        if image in self._missing_scene_images:
+            return
+        self._missing_scene_images.add(image)
+        print(f"⚠️ シーン画像がありません: {image}（代わりの画像を使用します）")
+
+    def _get_scene_clip(self, image: Path, seconds: float, size: tuple) -> Path:
+        """
+        静止画のシーンクリップを取得（無ければエンコードしてキャッシュ）
 
-        # 従来の単一背景での動画生成
-        background_path = self._get_or_create_background(title, topics)
+        クリップは SCENE_BUCKET_SECONDS 単位に切り上げた長さでエンコードし、
+        (画像, 更新時刻, サイズ, 長さの刻み, エンコーダー) をキーに再利用します。
+        全クリップを同じ設定でエンコードするため、concat demuxer で
+        ストリームコピーのまま連結できます。
+
+        Args:
+            image: 背景画像のパス
+            seconds: 必要な長さ（秒）
+            size: (幅, 高さ)
+
+        Returns:
+            クリップのパス
+        """
+        bucket = self.SCENE_BUCKET_SECONDS
+        clip_seconds = max(1, math.ceil(seconds / bucket)) * bucket
+        width, height = size
+
+        key_source = json.dumps(
+            [
+                str(Path(image).resolve()),
+                os.path.getmtime(image),
+                width,
+                height,
+                self.FPS,
+                clip_seconds,
+                self._clip_encoder_key(),
+            ]
+        )
+        key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()[:24]
+
+        self.scene_cache_dir.mkdir(parents=True, exist_ok=True)
+        clip_path = self.scene_cache_dir / f"{key}.mp4"
+        if clip_path.exists():
+            return clip_path
+
+        # 書き込み途中のファイルをキャッシュとして使わないよう一時名で出力
+        temp_path = self.scene_cache_dir / f"{key}.tmp.mp4"
+        if self.engine is not None:
+            self.engine.encode_still_clip(image, temp_path, clip_seconds, size, self.FPS)
+            os.replace(temp_path, clip_path)
+            return clip_path
 
-        # 動画を生成
         result = subprocess.run(
             [
                 "ffmpeg",
                 "-y",
                 "-loop",
                 "1",
+                "-framerate",
+                str(self.FPS),
                 "-i",
-                background_path,
-                "-i",
-                audio_path,
-                "-c:v",
-                "libx264",
-                "-tune",
-                "stillimage",
-                "-c:a",
-                "aac",
-                "-b:a",
-                "192k",
+                str(image),
+                "-vf",
+                self._fit_filter(width, height),
+                "-t",
+                str(clip_seconds),
+                *self.video_args,
+                "-bf",
+                "0",
                 "-pix_fmt",
                 "yuv420p",
-                "-shortest",
-                "-t",
-                str(duration),
-                output_path,
+                "-r",
+                str(self.FPS),
+                "-video_track_timescale",
+                str(self.FPS * 512),
+                "-an",
+                str(temp_path),
             ],
             capture_output=True,
             text=True,
@@ -140,47 +371,234 @@ class VideoGenerator:
         if result.returncode != 0:
             raise RuntimeError(f"FFmpeg エラー: {result.stderr}")
 
-        # 一時ファイルを削除
-        if not self.background_image.exists() and os.path.exists(background_path):
-            os.unlink(background_path)
+        os.replace(temp_path, clip_path)
+        return clip_path
 
-        return output_path
+    def _clip_encoder_key(self) -> list:
+        """シーンクリップのキャッシュキーに含めるエンコード設定"""
+        if self.engine is not None:
+            return ["pyav", self.engine.video_codec, self.engine.video_options]
+        return self.video_args
 
-    def _generate_video_with_background_switch(
+    def _generate_video_from_scenes(
         self,
         audio_path: str,
-        output_path: str,
+        outputs: Dict[str, str],
+        scenes: List[tuple],
         duration: float,
-    ) -> str:
+        subtitles_path: Optional[str] = None,
+        burn_subtitles: bool = False,
+    ) -> None:
         """
-        イントロとメインで背景を切り替える動画を生成
+        キャッシュ済みシーンクリップを concat demuxer で連結して動画を生成
+
+        通常は映像をストリームコピーし、エンコードするのは音声だけです。
+        字幕を焼き込む場合のみ、基準サイズのクリップを連結した映像に
+        字幕を描画して1回だけエンコードします。
+        区間の境界はフレーム単位に丸めてから各クリップの outpoint に
+        変換するため、区間数が増えてもずれが累積しません。
 
         Args:
             audio_path: 音声ファイルのパス
-            output_path: 出力動画ファイルのパス
+            outputs: レンディション名 → 出力パス
+            scenes: _plan_scenes の戻り値
             duration: 動画の長さ（秒）
+            subtitles_path: 字幕ファイル（SRT）のパス
+            burn_subtitles: 字幕を焼き込むかどうか
+        """
+        # PyAV: クリップの連結と音声の多重化をプロセス内で行う（字幕は ffmpeg CLI）
+        if self.engine is not None and not subtitles_path:
+            self.engine.mux_clips(
+                {
+                    output_path: self._scene_clips(scenes, self.VIDEO_VARIANTS[name])
+                    for name, output_path in outputs.items()
+                },
+                audio_path,
+                duration,
+            )
+            print(f"   シーン連結: {len(scenes)}シーン（PyAV・映像はストリームコピー）")
+            return
+
+        concat_lists = []
+        try:
+            if subtitles_path and burn_subtitles:
+                concat_list = self._write_scene_concat_list(
+                    scenes, (self.VIDEO_WIDTH, self.VIDEO_HEIGHT)
+                )
+                concat_lists.append(concat_list)
+                self._run_encode(
+                    input_args=["-f", "concat", "-safe", "0", "-i", concat_list],
+                    filter_complex="[0:v]null[v]",
+                    audio_path=audio_path,
+                    outputs=outputs,
+                    duration=duration,
+                    subtitles_path=subtitles_path,
+                    burn_subtitles=True,
+                )
+                print(f"   シーン連結: {len(scenes)}シーン（字幕焼き込み）")
+                return
+
+            input_args = []
+            for name in outputs:
+                concat_list = self._write_scene_concat_list(
+                    scenes, self.VIDEO_VARIANTS[name]
+                )
+                concat_lists.append(concat_list)
+                input_args += ["-f", "concat", "-safe", "0", "-i", concat_list]
+
+            audio_index = len(concat_lists)
+            extra_inputs = ["-i", audio_path]
+            if subtitles_path:
+                extra_inputs += ["-i", subtitles_path]
+
+            output_args = []
+            for i, output_path in enumerate(outputs.values()):
+                output_args += [
+                    "-map",
+                    f"{i}:v",
+                    "-map",
+                    f"{audio_index}:a",
+                ]
+                if subtitles_path:
+                    output_args += self._soft_subtitle_args(audio_index + 1)
+                output_args += [
+                    "-c:v",
+                    "copy",
+                    *self.aac_args,
+                    "-t",
+                    str(duration),
+                    "-movflags",
+                    "+faststart",
+                    output_path,
+                ]
+
+            result = subprocess.run(
+                ["ffmpeg", "-y", *input_args, *extra_inputs] + output_args,
+                capture_output=True,
+                text=True,
+            )
+
+            if result.returncode != 0:
+                raise RuntimeError(f"FFmpeg エラー: {result.stderr}")
+        finally:
+            # 一時ファイルを削除
+            for concat_list in concat_lists:
+                os.unlink(concat_list)
+
+        print(f"   シーン連結: {len(scenes)}シーン（映像はストリームコピー）")
+
+    def _scene_clips(self, scenes: List[tuple], size: tuple) -> List[tuple]:
+        """
+        指定サイズのシーンクリップを取得
 
         Returns:
-            出力動画ファイルのパス
+            (クリップのパス, 使用する長さ（秒, Fraction）) のリスト
+        """
+        clips = []
+        for image, start, end in scenes:
+            start_frame = round(start * self.FPS)
+            end_frame = round(end * self.FPS)
+            if end_frame <= start_frame:
+                continue
+            seconds = Fraction(end_frame - start_frame, self.FPS)
+            clips.append((self._get_scene_clip(image, float(seconds), size), seconds))
+        return clips
+
+    def _write_scene_concat_list(self, scenes: List[tuple], size: tuple) -> str:
+        """
+        指定サイズのシーンクリップを並べた concat リストを一時ファイルに書き出す
+
+        Returns:
+            concat リストのパス
+        """
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".txt", delete=False, encoding="utf-8"
+        ) as f:
+            for clip, seconds in self._scene_clips(scenes, size):
+                escaped_path = str(clip).replace("'", "'\\''")
+                f.write(f"file '{escaped_path}'\n")
+                f.write(f"outpoint {float(seconds):.6f}\n")
+            return f.name
+
+    def _fit_filter(self, width: int, height: int) -> str:
+        """アスペクト比を保って指定サイズに収める（余白はパディング）フィルタ"""
+        return (
+            f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1"
+        )
+
+    def _build_switch_filter(self, intro_duration: float) -> str:
+        """
+        イントロ→メインの背景切り替えフィルタを構築（出力ラベル [v]）
+
+        FFmpeg フィルタ複合処理:
+        1. イントロ背景をリサイズ
+        2. メイン背景をリサイズ
+        3. イントロを最初の intro_duration 秒間表示、その後メインに切り替え
         """
-        intro_duration = min(self.INTRO_DURATION, duration)
-
-        # FFmpeg フィルタ複合処理:
-        # 1. イントロ背景をリサイズ
-        # 2. メイン背景をリサイズ
-        # 3. イントロを最初の35秒間表示、その後メインに切り替え
-        filter_complex = (
-            f"[0:v]scale={self.VIDEO_WIDTH}:{self.VIDEO_HEIGHT}:force_original_aspect_ratio=decrease,"
-            f"pad={self.VIDEO_WIDTH}:{self.VIDEO_HEIGHT}:(ow-iw)/2:(oh-ih)/2,setsar=1[intro];"
-            f"[1:v]scale={self.VIDEO_WIDTH}:{self.VIDEO_HEIGHT}:force_original_aspect_ratio=decrease,"
-            f"pad={self.VIDEO_WIDTH}:{self.VIDEO_HEIGHT}:(ow-iw)/2:(oh-ih)/2,setsar=1[main];"
+        fit = self._fit_filter(self.VIDEO_WIDTH, self.VIDEO_HEIGHT)
+        return (
+            f"[0:v]{fit}[intro];"
+            f"[1:v]{fit}[main];"
             f"[main][intro]overlay=0:0:enable='lt(t,{intro_duration})'[v]"
         )
 
-        result = subprocess.run(
-            [
-                "ffmpeg",
-                "-y",
+    def generate_video_variants(
+        self,
+        audio_path: str,
+        outputs: Dict[str, str],
+        title: str = "NewsCast",
+        topics: Optional[List[str]] = None,
+        timeline: Optional[Dict[str, Any]] = None,
+        categories: Optional[List[str]] = None,
+        subtitles_path: Optional[str] = None,
+        burn_subtitles: bool = False,
+    ) -> Dict[str, str]:
+        """
+        複数解像度の動画を1回の FFmpeg 実行で生成
+
+        背景画像のデコードと合成は1度だけ行い、split フィルタで
+        各レンディションのエンコーダに分配します。
+        字幕は同じ FFmpeg 実行の中で多重化（ソフト字幕）または
+        焼き込み（同じ映像エンコード内）するため、追加のエンコードは発生しません。
+
+        Args:
+            audio_path: 音声ファイルのパス
+            outputs: レンディション名（VIDEO_VARIANTS のキー）→ 出力パス
+            title: 動画タイトル（背景を動的生成する場合に使用）
+            topics: ニューストピックのリスト（背景を動的生成する場合に使用）
+            timeline: AudioMixer.build_timeline のタイムライン（カット位置に使用）
+            categories: 各ニュースのカテゴリ（ニュースごとの背景切り替えに使用）
+            subtitles_path: 字幕ファイル（SRT）のパス
+            burn_subtitles: True の場合は字幕を焼き込み、False の場合はソフト字幕として多重化
+
+        Returns:
+            レンディション名 → 出力動画ファイルのパス
+        """
+        unknown = set(outputs) - set(self.VIDEO_VARIANTS)
+        if unknown:
+            raise ValueError(f"未知の動画レンディション: {', '.join(sorted(unknown))}")
+
+        duration, intro_end = self._resolve_timing(audio_path, timeline)
+
+        # タイムラインとシーン画像が揃っていればクリップ連結で生成
+        scenes = self._plan_scenes(timeline, categories)
+        if scenes:
+            self._generate_video_from_scenes(
+                audio_path=audio_path,
+                outputs=outputs,
+                scenes=scenes,
+                duration=duration,
+                subtitles_path=subtitles_path,
+                burn_subtitles=burn_subtitles,
+            )
+            return dict(outputs)
+
+        # 背景の入力とフィルタ（出力ラベル [v]）を構築
+        temp_background = None
+        if self.intro_bg_image.exists() and self.main_bg_image.exists():
+            intro_duration = min(intro_end, duration)
+            input_args = [
                 "-loop",
                 "1",
                 "-i",
@@ -189,28 +607,108 @@ class VideoGenerator:
                 "1",
                 "-i",
                 str(self.main_bg_image),
-                "-i",
-                audio_path,
-                "-filter_complex",
-                filter_complex,
+            ]
+            filter_complex = self._build_switch_filter(intro_duration)
+            print(f"   背景切り替え: {intro_duration}秒でイントロ→メインに切り替え")
+        else:
+            background_path = self._get_or_create_background(title, topics)
+            if not self.background_image.exists():
+                temp_background = background_path
+            input_args = ["-loop", "1", "-i", background_path]
+            filter_complex = (
+                f"[0:v]{self._fit_filter(self.VIDEO_WIDTH, self.VIDEO_HEIGHT)}[v]"
+            )
+
+        try:
+            self._run_encode(
+                input_args=input_args,
+                filter_complex=filter_complex,
+                audio_path=audio_path,
+                outputs=outputs,
+                duration=duration,
+                subtitles_path=subtitles_path,
+                burn_subtitles=burn_subtitles,
+            )
+        finally:
+            # 一時ファイルを削除
+            if temp_background and os.path.exists(temp_background):
+                os.unlink(temp_background)
+
+        return dict(outputs)
+
+    def _run_encode(
+        self,
+        input_args: List[str],
+        filter_complex: str,
+        audio_path: str,
+        outputs: Dict[str, str],
+        duration: float,
+        subtitles_path: Optional[str] = None,
+        burn_subtitles: bool = False,
+    ) -> None:
+        """
+        映像フィルタ（出力ラベル [v]）を各レンディションにエンコード
+
+        Args:
+            input_args: 映像入力の引数
+            filter_complex: [v] を出力するフィルタグラフ
+            audio_path: 音声ファイルのパス
+            outputs: レンディション名 → 出力パス
+            duration: 動画の長さ（秒）
+            subtitles_path: 字幕ファイル（SRT）のパス
+            burn_subtitles: 字幕を焼き込むかどうか
+        """
+        audio_index = input_args.count("-i")
+        extra_inputs = ["-i", audio_path]
+
+        source_label = "[v]"
+        subtitle_index = None
+        if subtitles_path and burn_subtitles:
+            # 焼き込み: split の前に1度だけ描画し、同じ映像エンコードで出力
+            filter_complex += (
+                f";[v]subtitles={self._escape_filter_path(subtitles_path)}[vsub]"
+            )
+            source_label = "[vsub]"
+        elif subtitles_path:
+            # ソフト字幕: 入力として追加し、各出力に mov_text として多重化
+            subtitle_index = audio_index + 1
+            extra_inputs += ["-i", subtitles_path]
+
+        # split で各レンディションへ分配（元サイズと同じものはスケールしない）
+        names = list(outputs)
+        split_labels = "".join(f"[s{i}]" for i in range(len(names)))
+        filter_complex += f";{source_label}split={len(names)}{split_labels}"
+
+        output_args = []
+        for i, name in enumerate(names):
+            width, height = self.VIDEO_VARIANTS[name]
+            label = f"[s{i}]"
+            if (width, height) != (self.VIDEO_WIDTH, self.VIDEO_HEIGHT):
+                label = f"[o{i}]"
+                filter_complex += f";[s{i}]scale={width}:{height}{label}"
+
+            output_args += [
                 "-map",
-                "[v]",
+                label,
                 "-map",
-                "2:a",
-                "-c:v",
-                "libx264",
-                "-tune",
-                "stillimage",
-                "-c:a",
-                "aac",
-                "-b:a",
-                "192k",
+                f"{audio_index}:a",
+            ]
+            if subtitle_index is not None:
+                output_args += self._soft_subtitle_args(subtitle_index)
+            output_args += [
+                *self.video_args,
+                *self.aac_args,
                 "-pix_fmt",
                 "yuv420p",
                 "-t",
                 str(duration),
-                output_path,
-            ],
+                outputs[name],
+            ]
+
+        result = subprocess.run(
+            ["ffmpeg", "-y", *input_args, *extra_inputs]
+            + ["-filter_complex", filter_complex]
+            + output_args,
             capture_output=True,
             text=True,
         )
@@ -218,8 +716,26 @@ class VideoGenerator:
         if result.returncode != 0:
             raise RuntimeError(f"FFmpeg エラー: {result.stderr}")
 
-        print(f"   背景切り替え: {intro_duration}秒でイントロ→メインに切り替え")
-        return output_path
+    def _soft_subtitle_args(self, subtitle_index: int) -> List[str]:
+        """ソフト字幕（mov_text）を多重化する出力引数"""
+        return [
+            "-map",
+            f"{subtitle_index}:s",
+            "-c:s",
+            "mov_text",
+            "-metadata:s:s:0",
+            "language=eng",
+        ]
+
+    def _escape_filter_path(self, path: str) -> str:
+        """フィルタグラフ内で使うファイルパスをエスケープ"""
+        escaped = (
+            str(path)
+            .replace("\\", "/")
+            .replace(":", "\\:")
+            .replace("'", "'\\\\\\''")
+        )
+        return f"'{escaped}'"
 
     def _get_or_create_background(
         self,
@@ -338,6 +854,9 @@ class VideoGenerator:
 
     def _get_audio_duration(self, audio_path: str) -> float:
         """音声ファイルの長さを取得"""
+        if self.engine is not None:
+            return self.engine.get_duration(audio_path)
+
         result = subprocess.run(
             [
                 "ffprobe",
@@ -375,17 +894,78 @@ class VideoGenerator:
         Returns:
             出力ファイルのパス
         """
+        outputs = self.generate_thumbnail_variants(
+            outputs={"landscape": output_path},
+            title=title,
+            topics=topics,
+        )
+        return outputs["landscape"]
+
+    def generate_thumbnail_variants(
+        self,
+        outputs: Dict[str, str],
+        title: str,
+        topics: Optional[List[str]] = None,
+    ) -> Dict[str, str]:
+        """
+        複数サイズのサムネイル画像をまとめて生成
+
+        背景画像のデコードは1度だけ行い、各サイズへ切り抜き・縮小して描画します。
+
+        Args:
+            outputs: バリエーション名（THUMBNAIL_VARIANTS のキー）→ 出力パス
+            title: 動画タイトル
+            topics: ニューストピックのリスト
+
+        Returns:
+            バリエーション名 → 出力ファイルのパス
+        """
         if not self.pil_available:
             raise RuntimeError("PIL がインストールされていません")
 
-        # サムネイルサイズ（YouTube推奨: 1280x720）
-        width, height = 1280, 720
+        unknown = set(outputs) - set(self.THUMBNAIL_VARIANTS)
+        if unknown:
+            raise ValueError(
+                f"未知のサムネイルバリエーション: {', '.join(sorted(unknown))}"
+            )
 
-        # メイン背景画像があれば使用、なければグラデーション
+        # メイン背景画像があれば1度だけデコード
+        background = None
         if self.main_bg_image.exists():
-            img = Image.open(self.main_bg_image)
-            img = img.resize((width, height), Image.Resampling.LANCZOS)
-            img = img.convert("RGB")
+            with Image.open(self.main_bg_image) as src:
+                background = src.convert("RGB")
+
+        for name, output_path in outputs.items():
+            size = self.THUMBNAIL_VARIANTS[name]
+            img = self._render_thumbnail(background, size, title, topics)
+            img.save(output_path, "JPEG", quality=95)
+
+        return dict(outputs)
+
+    def _render_thumbnail(
+        self,
+        background: Optional["Image.Image"],
+        size: tuple,
+        title: str,
+        topics: Optional[List[str]] = None,
+    ) -> "Image.Image":
+        """
+        指定サイズのサムネイルを描画
+
+        レイアウトは THUMBNAIL_BASE_SIZE（1280x720）の座標系で定義し、
+        出力サイズに合わせて拡縮・中央寄せします。
+        """
+        width, height = size
+        base_width, base_height = self.THUMBNAIL_BASE_SIZE
+        scale = min(width / base_width, height / base_height)
+        offset_y = int((height - base_height * scale) / 2)
+
+        def px(value: float) -> int:
+            return max(1, int(value * scale))
+
+        if background is not None:
+            # アスペクト比を保って切り抜き・縮小
+            img = ImageOps.fit(background, (width, height), Image.Resampling.LANCZOS)
             # 半透明オーバーレイを追加して文字を読みやすく
             overlay = Image.new("RGB", (width, height), (0, 0, 40))
             img = Image.blend(img, overlay, 0.4)
@@ -408,55 +988,26 @@ class VideoGenerator:
 
         draw = ImageDraw.Draw(img)
 
-        # 日本語対応フォントを探す
-        japanese_fonts = [
-            "C:/Windows/Fonts/YuGothB.ttc",  # Yu Gothic Bold
-            "C:/Windows/Fonts/YuGothM.ttc",  # Yu Gothic Medium
-            "C:/Windows/Fonts/meiryob.ttc",  # Meiryo Bold
-            "C:/Windows/Fonts/meiryo.ttc",  # Meiryo
-            "C:/Windows/Fonts/msgothic.ttc",  # MS Gothic
-            "C:/Windows/Fonts/NotoSansJP-Bold.ttf",
-            "/usr/share/fonts/truetype/noto/NotoSansCJK-Bold.ttc",  # Linux
-        ]
-
-        english_fonts = [
-            "C:/Windows/Fonts/arialbd.ttf",  # Arial Bold
-            "C:/Windows/Fonts/arial.ttf",  # Arial
-            "arial.ttf",
-        ]
-
-        # タイトル用フォント（英語）
-        title_font = ImageFont.load_default()
-        for font_path in english_fonts:
-            try:
-                title_font = ImageFont.truetype(font_path, 80)
-                break
-            except (OSError, IOError):
-                continue
-
-        # トピック用フォント（日本語対応）
-        topic_font = ImageFont.load_default()
-        for font_path in japanese_fonts:
-            try:
-                topic_font = ImageFont.truetype(font_path, 36)
-                break
-            except (OSError, IOError):
-                continue
+        # タイトル用フォント（英語）・トピック用フォント（日本語対応）
+        title_font = self._load_font(self.ENGLISH_FONTS, px(80))
+        topic_font = self._load_font(self.JAPANESE_FONTS, px(36))
 
         # タイトルを描画（中央上部）
         title_bbox = draw.textbbox((0, 0), title, font=title_font)
         title_width = title_bbox[2] - title_bbox[0]
         title_x = (width - title_width) // 2
-        title_y = 80
+        title_y = offset_y + px(80)
 
         # タイトルの影
-        draw.text((title_x + 3, title_y + 3), title, fill=(0, 0, 0), font=title_font)
+        draw.text(
+            (title_x + px(3), title_y + px(3)), title, fill=(0, 0, 0), font=title_font
+        )
         # タイトル本体（白）
         draw.text((title_x, title_y), title, fill=(255, 255, 255), font=title_font)
 
         # トピックを描画（日本語対応）
         if topics:
-            y_offset = 220
+            y_offset = offset_y + px(220)
             for i, topic in enumerate(topics[:3]):
                 # トピックテキストを短縮（絵文字は使わず番号付きに）
                 if len(topic) > 35:
@@ -469,7 +1020,7 @@ class VideoGenerator:
                 topic_x = (width - topic_width) // 2
 
                 # 背景ボックス
-                box_padding = 15
+                box_padding = px(15)
                 box_left = topic_x - box_padding
                 box_top = y_offset - box_padding // 2
                 box_right = topic_x + topic_width + box_padding
@@ -482,7 +1033,7 @@ class VideoGenerator:
                 box_draw = ImageDraw.Draw(box_overlay)
                 box_draw.rounded_rectangle(
                     [box_left, box_top, box_right, box_bottom],
-                    radius=10,
+                    radius=px(10),
                     fill=(0, 0, 0, 150),
                 )
                 img = Image.alpha_composite(img.convert("RGBA"), box_overlay).convert(
@@ -497,27 +1048,36 @@ class VideoGenerator:
                     fill=(255, 255, 255),
                     font=topic_font,
                 )
-                y_offset += 70
+                y_offset += px(70)
 
         # 日付を描画（右下）
         date_text = datetime.now().strftime("%Y.%m.%d")
-        try:
-            date_font_small = ImageFont.truetype(english_fonts[0], 40)
-        except (OSError, IOError):
-            date_font_small = ImageFont.load_default()
+        date_font_small = self._load_font(self.ENGLISH_FONTS[:1], px(40))
 
         date_bbox = draw.textbbox((0, 0), date_text, font=date_font_small)
         date_width = date_bbox[2] - date_bbox[0]
         draw.text(
-            (width - date_width - 40, height - 70),
+            (width - date_width - px(40), height - px(70)),
             date_text,
             fill=(255, 255, 255),
             font=date_font_small,
         )
 
-        img.save(output_path, "JPEG", quality=95)
-
-        return output_path
+        return img
+
+    def _load_font(self, candidates: List[str], size: int):
+        """候補リストから最初に読み込めたフォントを返す（同じ組み合わせはキャッシュ）"""
+        key = (tuple(candidates), size)
+        if key not in self._font_cache:
+            font = ImageFont.load_default()
+            for font_path in candidates:
+                try:
+                    font = ImageFont.truetype(font_path, size)
+                    break
+                except (OSError, IOError):
+                    continue
+            self._font_cache[key] = font
+        return self._font_cache[key]
 
 
 if __name__ == "__main__":
@@ -7,25 +7,66 @@ YouTube Data API v3 を使用して動画をアップロードします。
 """
 
 import os
+import json
 import pickle
+import hashlib
 from pathlib import Path
 from typing import Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
 from googleapiclient.http import MediaFileUpload
 from googleapiclient.errors import HttpError
 
 
+# ディスカバリードキュメントの配置先（ここにあれば googleapiclient 同梱版より優先）
+DISCOVERY_DIR = Path(__file__).parent / "assets" / "discovery"
+
+# アクセストークンのキャッシュ（有効期限内なら再実行時にリフレッシュしない）
+TOKEN_CACHE_PATH = Path(__file__).parent / "cache" / "youtube_token.json"
+
+# 有効期限までこの秒数を切ったトークンは使わない
+TOKEN_EXPIRY_MARGIN = 5 * 60
+
+# 読み込み済みのディスカバリードキュメント（プロセス内で共有）
+_discovery_documents: Dict[str, Dict[str, Any]] = {}
+
+
+def load_discovery_document(service: str, version: str) -> Dict[str, Any]:
+    """
+    ディスカバリードキュメントをローカルから読み込む（ネットワークには接続しない）
+
+    DISCOVERY_DIR/<service>.<version>.json があればそれを、なければ
+    googleapiclient に同梱の静的ドキュメントを使い、パース結果を使い回します。
+    """
+    name = f"{service}.{version}"
+    if name not in _discovery_documents:
+        path = DISCOVERY_DIR / f"{name}.json"
+        if path.exists():
+            content = path.read_text(encoding="utf-8")
+        else:
+            content = discovery_cache.get_static_doc(service, version)
+        if content is None:
+            raise ValueError(f"ディスカバリードキュメントが見つかりません: {name}")
+        _discovery_documents[name] = json.loads(content)
+    return _discovery_documents[name]
+
+
 class YouTubeUploader:
     """YouTube に動画をアップロードするクラス"""
 
     # OAuth 2.0 スコープ
     SCOPES = ["https://www.googleapis.com/auth/youtube.upload"]
 
+    # 字幕（captions）のアップロードに必要なスコープ
+    # 環境変数 YOUTUBE_CAPTIONS_ENABLED=true の場合のみ要求します（トークン作成時も同じ）
+    # （このスコープを許可していないリフレッシュトークンでは更新に失敗するため）
+    CAPTION_SCOPE = "https://www.googleapis.com/auth/youtube.force-ssl"
+
     # YouTube API サービス名とバージョン
     API_SERVICE_NAME = "youtube"
     API_VERSION = "v3"
@@ -38,7 +79,15 @@ class YouTubeUploader:
             credentials_path: OAuth 認証情報ファイルのパス
         """
         self.credentials_path = credentials_path
-        self.youtube = self._get_authenticated_service()
+        self._youtube = None
+        self._credentials = None
+
+    @property
+    def youtube(self):
+        """認証済みの YouTube サービス（最初に API を呼ぶ時に作成）"""
+        if self._youtube is None:
+            self._youtube = self._get_authenticated_service()
+        return self._youtube
 
     def _get_authenticated_service(self):
         """認証済みの YouTube サービスを取得"""
@@ -66,9 +115,9 @@ class YouTubeUploader:
                 "token.pickle ファイルを generator ディレクトリに配置してください。"
             )
 
-        return build(
-            self.API_SERVICE_NAME,
-            self.API_VERSION,
+        self._credentials = credentials
+        return build_from_document(
+            load_discovery_document(self.API_SERVICE_NAME, self.API_VERSION),
             credentials=credentials,
         )
 
@@ -87,14 +136,84 @@ class YouTubeUploader:
             token_uri="https://oauth2.googleapis.com/token",
             client_id=client_id,
             client_secret=client_secret,
-            scopes=self.SCOPES,  # scopes を追加
+            scopes=self._get_scopes(),  # scopes を追加
         )
 
+        # 有効期限内のアクセストークンがキャッシュにあればリフレッシュしない
+        cache_key = self._token_cache_key(client_id, refresh_token, credentials.scopes)
+        cached = self._load_cached_token(cache_key)
+        if cached is not None:
+            credentials.token, credentials.expiry = cached
+            return credentials
+
         # トークンをリフレッシュ
         credentials.refresh(Request())
+        self._save_cached_token(cache_key, credentials)
 
         return credentials
 
+    def _token_cache_key(self, client_id: str, refresh_token: str, scopes) -> str:
+        """認証情報ごとのキャッシュキー（リフレッシュトークンそのものは保存しない）"""
+        raw = json.dumps([client_id, refresh_token, sorted(scopes or [])])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _load_cached_token(self, cache_key: str):
+        """
+        キャッシュからアクセストークンを取得
+
+        Returns:
+            (token, expiry)。ない・期限が近い・別の認証情報の場合は None
+        """
+        try:
+            with open(TOKEN_CACHE_PATH, encoding="utf-8") as f:
+                cached = json.load(f)
+            expiry = datetime.fromisoformat(cached["expiry"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+        # google-auth の expiry は UTC の naive datetime
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        remaining = expiry - now
+        if cached.get("key") != cache_key or remaining < timedelta(
+            seconds=TOKEN_EXPIRY_MARGIN
+        ):
+            return None
+        return cached["token"], expiry
+
+    def _save_cached_token(self, cache_key: str, credentials: Credentials) -> None:
+        """アクセストークンと有効期限を保存（本人のみ読み書き可能）"""
+        if not credentials.token or credentials.expiry is None:
+            return
+        TOKEN_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(TOKEN_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "key": cache_key,
+                    "token": credentials.token,
+                    "expiry": credentials.expiry.isoformat(),
+                },
+                f,
+            )
+
+    def _get_scopes(self) -> list:
+        """要求する OAuth スコープを取得（字幕アップロードが有効なら追加）"""
+        if os.getenv("YOUTUBE_CAPTIONS_ENABLED", "").lower() == "true":
+            return self.SCOPES + [self.CAPTION_SCOPE]
+        return list(self.SCOPES)
+
+    @property
+    def captions_enabled(self) -> bool:
+        """認証情報に字幕のアップロードに必要なスコープ（CAPTION_SCOPE）があるか"""
+        if self._youtube is None:
+            self._youtube = self._get_authenticated_service()
+        scopes = (
+            getattr(self._credentials, "granted_scopes", None)
+            or getattr(self._credentials, "scopes", None)
+            or []
+        )
+        return self.CAPTION_SCOPE in scopes
+
     def upload_video(
         self,
         video_path: str,
@@ -104,6 +223,7 @@ class YouTubeUploader:
         category_id: str = "27",  # Education カテゴリ
         privacy_status: str = "public",
         thumbnail_path: Optional[str] = None,
+        caption_path: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         動画を YouTube にアップロード
@@ -116,6 +236,7 @@ class YouTubeUploader:
             category_id: カテゴリID（27 = Education）
             privacy_status: 公開設定（public, unlisted, private）
             thumbnail_path: サムネイル画像のパス
+            caption_path: 字幕ファイル（SRT / WebVTT）のパス
 
         Returns:
             アップロード結果（video_id, url など）
@@ -167,6 +288,16 @@ class YouTubeUploader:
             if thumbnail_path and os.path.exists(thumbnail_path):
                 self.set_thumbnail(video_id, thumbnail_path)
 
+            # 字幕をアップロード（スコープが許可されている場合のみ）
+            if caption_path and os.path.exists(caption_path):
+                if self.captions_enabled:
+                    self.upload_caption(video_id, caption_path)
+                else:
+                    print(
+                        "ℹ️ 字幕のアップロードをスキップしました"
+                        "（YOUTUBE_CAPTIONS_ENABLED=true で youtube.force-ssl を許可したトークンが必要です）"
+                    )
+
             return {
                 "video_id": video_id,
                 "url": video_url,
@@ -202,10 +333,56 @@ class YouTubeUploader:
             print(f"⚠️ サムネイル設定エラー: {e}")
             return False
 
+    def upload_caption(
+        self,
+        video_id: str,
+        caption_path: str,
+        language: str = "en",
+        name: str = "English",
+    ) -> bool:
+        """
+        動画に字幕トラックを追加
+
+        youtube.force-ssl スコープが必要です（CAPTION_SCOPE を参照）。
+
+        Args:
+            video_id: 動画ID
+            caption_path: 字幕ファイル（SRT / WebVTT）のパス
+            language: 字幕の言語コード
+            name: 字幕トラック名
+
+        Returns:
+            成功したかどうか
+        """
+        try:
+            self.youtube.captions().insert(
+                part="snippet",
+                body={
+                    "snippet": {
+                        "videoId": video_id,
+                        "language": language,
+                        "name": name,
+                        "isDraft": False,
+                    }
+                },
+                media_body=MediaFileUpload(
+                    caption_path, mimetype="application/octet-stream"
+                ),
+            ).execute()
+
+            print(f"✅ 字幕設定完了: {video_id}")
+            return True
+
+        except HttpError as e:
+            print(f"⚠️ 字幕設定エラー: {e}")
+            return False
+
     def generate_video_description(
         self,
         topics: list,
         date: Optional[datetime] = None,
+        vocabulary: Optional[list] = None,
+        timeline: Optional[dict] = None,
     ) -> str:
         """
         動画の説明文を生成
@@ -213,6 +390,8 @@ class YouTubeUploader:
         Args:
             topics: ニューストピックのリスト
             date: 動画の日付
+            vocabulary: 各ニュースで取り上げた単語（Script.vocabulary）
+            timeline: AudioMixer.build_timeline のタイムライン（チャプターに使用）
 
         Returns:
             説明文
@@ -224,6 +403,13 @@ class YouTubeUploader:
 
         topics_text = "\n".join([f"📰 {topic}" for topic in topics])
 
+        extra_sections = ""
+        if vocabulary:
+            vocabulary_text = "\n".join([f"📖 {word}" for word in vocabulary])
+            extra_sections += f"\n📝 今日の単語:\n{vocabulary_text}\n"
+        if timeline:
+            extra_sections += f"\n⏱️ チャプター:\n{self._format_chapters(timeline, topics)}\n"
+
         description = f"""
 🎧 NewsCast - {date_str}
 
@@ -232,7 +418,7 @@ Steve と Nancy が日本の最新ニュースを分かりやすく英語で解
 
 📌 今日のトピック:
 {topics_text}
-
+{extra_sections}
 ---
 
 🔔 チャンネル登録お願いします！
@@ -242,6 +428,22 @@ Steve と Nancy が日本の最新ニュースを分かりやすく英語で解
 """
         return description.strip()
 
+    def _format_chapters(self, timeline: dict, topics: list) -> str:
+        """タイムラインから YouTube のチャプター（0:00 始まり）を生成"""
+        chapters = [(0.0, "Intro")]
+        for news in timeline.get("news", []):
+            index = news["index"]
+            label = topics[index] if index < len(topics) else f"News {index + 1}"
+            chapters.append((news["start"], label))
+        if timeline.get("outro_start") is not None:
+            chapters.append((timeline["outro_start"], "Outro"))
+
+        lines = []
+        for seconds, label in chapters:
+            minutes, secs = divmod(int(seconds), 60)
+            lines.append(f"{minutes}:{secs:02d} {label}")
+        return "\n".join(lines)
+
     def generate_video_title(
         self,
         topics: list,
@@ -276,8 +478,11 @@ def create_oauth_token():
 
     client_secrets.json を用意して実行すると、
     ブラウザで認証後に token.pickle が生成されます。
+    字幕もアップロードする場合は YOUTUBE_CAPTIONS_ENABLED=true を設定して実行し、
+    表示されたリフレッシュトークンで YOUTUBE_REFRESH_TOKEN を更新してください。
     """
-    SCOPES = ["https://www.googleapis.com/auth/youtube.upload"]
+    # 実行時と同じスコープを要求（YOUTUBE_CAPTIONS_ENABLED=true なら字幕用を追加）
+    SCOPES = YouTubeUploader()._get_scopes()
 
     credentials_path = Path(__file__).parent / "client_secrets.json"
     token_path = Path(__file__).parent / "token.pickle"